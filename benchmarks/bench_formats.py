@@ -0,0 +1,82 @@
+# coding: utf-8
+"""
+Compares the built-in format checkers from :mod:`jsl.formats` with
+naive regex-based implementations.
+
+Usage: ``PYTHONPATH=. python benchmarks/bench_formats.py [number]``
+"""
+import re
+import sys
+import datetime
+import timeit
+
+from jsl import formats
+from jsl._compat import urlsplit
+
+
+_NAIVE_OFFSET = re.compile(r'^(.*?)([Zz]|[+-]\d+:\d+)$')
+_NAIVE_EMAIL = re.compile(
+    r"^[a-zA-Z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[a-zA-Z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+    r"@(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]*[a-zA-Z0-9])?\.)*"
+    r"[a-zA-Z0-9](?:[a-zA-Z0-9-]*[a-zA-Z0-9])?$")
+
+
+def naive_date_time(value):
+    match = _NAIVE_OFFSET.match(value)
+    if match is None:
+        return False
+    local = match.group(1).replace('t', 'T')
+    for format in ('%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S'):
+        try:
+            datetime.datetime.strptime(local, format)
+        except ValueError:
+            continue
+        return True
+    return False
+
+
+def naive_ipv4(value):
+    parts = value.split('.')
+    if len(parts) != 4:
+        return False
+    for part in parts:
+        if not part.isdigit() or (len(part) > 1 and part[0] == '0') or int(part) > 255:
+            return False
+    return True
+
+
+def naive_email(value):
+    return _NAIVE_EMAIL.match(value) is not None
+
+
+def naive_uri(value):
+    parts = urlsplit(value)
+    return bool(parts.scheme) and not any(c.isspace() or c in '<>"{}|\\^`' for c in value)
+
+
+CASES = [
+    ('date-time', formats.check_date_time, naive_date_time,
+     ['2016-05-11T12:30:00Z', '2016-05-11T12:30:00.123456+03:00', '2016-13-11T12:30:00Z']),
+    ('ipv4', formats.check_ipv4, naive_ipv4,
+     ['127.0.0.1', '255.255.255.255', '256.1.1.1']),
+    ('email', formats.check_email, naive_email,
+     ['user@example.com', 'first.last+tag@mail.example.co.uk', 'not-an-email']),
+    ('uri', formats.check_uri, naive_uri,
+     ['http://example.com/path?q=1#frag', 'urn:isbn:0451450523', '/not/a/uri']),
+]
+
+
+def main(number=100000):
+    print('{0:<10} {1:>12} {2:>12} {3:>8}'.format('format', 'fast, us', 'naive, us', 'speedup'))
+    for name, fast, naive, values in CASES:
+        for value in values:
+            assert fast(value) == naive(value), (name, value)
+        fast_time = min(timeit.repeat(lambda: [fast(v) for v in values], number=number, repeat=3))
+        naive_time = min(timeit.repeat(lambda: [naive(v) for v in values], number=number, repeat=3))
+        per_call = 1e6 / (number * len(values))
+        print('{0:<10} {1:>12.3f} {2:>12.3f} {3:>7.2f}x'.format(
+            name, fast_time * per_call, naive_time * per_call, naive_time / fast_time))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -19,4 +19,4 @@ __version_info__ = tuple(int(i) for i in __version__.split('.'))
 from .document import Document, ALL_OF, INLINE, ANY_OF, ONE_OF
 from .fields import *
 from .roles import *
-from .exceptions import SchemaGenerationException
+from .exceptions import SchemaGenerationException, ValidationError
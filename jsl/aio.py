@@ -0,0 +1,107 @@
+# coding: utf-8
+"""
+Coroutines that validate instances and generate schemas without blocking
+the :mod:`asyncio` event loop for long. Requires Python 3.5+.
+
+Instances that consist of more than :data:`DEFAULT_THRESHOLD` values (see
+:func:`configure`) and schema generation are offloaded to an executor;
+smaller instances are validated right in the event loop, since running them
+in an executor would cost more than validating them.
+"""
+import asyncio
+import functools
+
+from .roles import DEFAULT_ROLE
+from .validation import COLLECT_ALL
+
+
+__all__ = [
+    'DEFAULT_THRESHOLD', 'configure', 'get_schema', 'get_validator',
+    'is_valid', 'get_errors', 'validate',
+]
+
+#: A default number of values (objects, arrays and scalars, counting nested ones)
+#: an instance must exceed to be validated in an executor.
+DEFAULT_THRESHOLD = 1000
+
+_executor = None
+_threshold = DEFAULT_THRESHOLD
+
+
+def configure(executor=None, threshold=DEFAULT_THRESHOLD):
+    """Configures offloading.
+
+    :param executor:
+        A :class:`concurrent.futures.Executor` to run long computations in.
+        If ``None``, the default executor of the event loop is used.
+    :param int threshold:
+        A number of values an instance must exceed to be validated in the executor.
+        ``0`` offloads every validation.
+    """
+    global _executor, _threshold
+    if threshold < 0:
+        raise ValueError('threshold must not be negative')
+    _executor = executor
+    _threshold = threshold
+
+
+def _exceeds(value, threshold):
+    """Returns ``True`` if ``value`` consists of more than ``threshold`` values.
+    Stops counting as soon as the threshold is exceeded.
+    """
+    count = 0
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        count += 1
+        if isinstance(value, dict):
+            value = value.values()
+        elif not isinstance(value, (list, tuple)):
+            if count > threshold:
+                return True
+            continue
+        if count + len(stack) + len(value) > threshold:
+            return True
+        stack.extend(value)
+    return False
+
+
+async def _offload(func, *args, **kwargs):
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+async def _run(func, instance, *args, **kwargs):
+    if _exceeds(instance, _threshold):
+        return await _offload(func, instance, *args, **kwargs)
+    return func(instance, *args, **kwargs)
+
+
+async def get_schema(document_cls, role=DEFAULT_ROLE, ordered=False):
+    """Generates a schema in the executor. See :meth:`.Document.get_schema`."""
+    return await _offload(document_cls.get_schema, role=role, ordered=ordered)
+
+
+async def get_validator(document_cls, role=DEFAULT_ROLE):
+    """Returns a cached validator or compiles one in the executor.
+    See :meth:`.Document.get_validator`.
+    """
+    validator = document_cls._cache.get(('validator', role))
+    if validator is None:
+        validator = await _offload(document_cls.get_validator, role=role)
+    return validator
+
+
+async def is_valid(validator, instance, partial=False):
+    """See :meth:`.Validator.is_valid`."""
+    return await _run(validator.is_valid, instance, partial=partial)
+
+
+async def get_errors(validator, instance, mode=COLLECT_ALL, partial=False):
+    """See :meth:`.Validator.get_errors`."""
+    return await _run(validator.get_errors, instance, mode=mode, partial=partial)
+
+
+async def validate(validator, instance, partial=False):
+    """See :meth:`.Validator.validate`."""
+    return await _run(validator.validate, instance, partial=partial)
@@ -0,0 +1,156 @@
+# coding: utf-8
+"""
+Schema bundles: many pre-generated schemas in a single file with random access.
+
+A bundle consists of a header, the schemas serialized to compact JSON one
+after another, and an index mapping pairs (definition id, role) to the offsets
+and sizes of the schemas. :class:`SchemaBundle` memory-maps a bundle and only
+reads the index when it's opened; a schema is read (and parsed, if requested)
+when it's looked up, so the schemas that are never used are never loaded.
+"""
+import json
+import mmap
+import struct
+
+from .roles import DEFAULT_ROLE
+
+
+__all__ = ['BundleWriter', 'SchemaBundle', 'write_bundle']
+
+_MAGIC = b'JSLB'
+_FORMAT_VERSION = 1
+# magic, format version, index offset, index size
+_HEADER = struct.Struct('<4sHQQ')
+
+
+def _dumps(schema):
+    return json.dumps(schema, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+class BundleWriter(object):
+    """Writes a bundle to a binary file object opened for writing.
+    The bundle is complete after :meth:`close` is called.
+
+    :param fp: A file object that supports ``seek``.
+    """
+
+    def __init__(self, fp):
+        self._fp = fp
+        self._index = {}
+        fp.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, 0, 0))
+        self._offset = _HEADER.size
+
+    def add(self, definition_id, role, schema):
+        """Adds a schema.
+
+        :param str definition_id: A definition id.
+        :param str role: A role.
+        :param schema: A schema or its JSON serialization encoded in UTF-8.
+        :type schema: dict or bytes
+        :raises: :class:`ValueError` if a schema with the same key is already added
+        """
+        key = (definition_id, role)
+        if key in self._index:
+            raise ValueError(u'{0!r} is already added'.format(key))
+        data = schema if isinstance(schema, bytes) else _dumps(schema)
+        self._fp.write(data)
+        self._index[key] = (self._offset, len(data))
+        self._offset += len(data)
+
+    def add_document(self, document_cls, roles=(DEFAULT_ROLE,)):
+        """Adds the schemas of ``document_cls`` for ``roles``, keyed by
+        the definition ids of the document for the roles.
+        """
+        for role in roles:
+            self.add(document_cls.get_definition_id(role=role), role,
+                     document_cls.get_schema(role=role))
+
+    def close(self):
+        """Writes the index and the header."""
+        index = _dumps([[definition_id, role, offset, size]
+                        for (definition_id, role), (offset, size) in sorted(self._index.items())])
+        self._fp.write(index)
+        self._fp.seek(0)
+        self._fp.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, self._offset, len(index)))
+        self._fp.seek(0, 2)
+
+
+def write_bundle(path, documents, roles=(DEFAULT_ROLE,)):
+    """Writes a bundle of the schemas of ``documents`` for every role of ``roles``.
+
+    :param str path: A path to the bundle file.
+    :param documents: An iterable of documents.
+    :param roles: An iterable of roles.
+    """
+    roles = list(roles)
+    with open(path, 'wb') as fp:
+        writer = BundleWriter(fp)
+        for document_cls in documents:
+            writer.add_document(document_cls, roles=roles)
+        writer.close()
+
+
+class SchemaBundle(object):
+    """A memory-mapped bundle of schemas. Can be used as a context manager
+    that closes the bundle.
+
+    :param str path: A path to the bundle file.
+    :raises: :class:`ValueError` if the file is not a bundle
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as fp:
+            self._mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mm) < _HEADER.size:
+                raise ValueError(u'{0} is not a schema bundle'.format(path))
+            magic, format_version, index_offset, index_size = \
+                _HEADER.unpack(self._mm[:_HEADER.size])
+            if magic != _MAGIC:
+                raise ValueError(u'{0} is not a schema bundle'.format(path))
+            if format_version != _FORMAT_VERSION:
+                raise ValueError(u'{0} has unsupported format version {1}'.format(
+                    path, format_version))
+            index = json.loads(
+                self._mm[index_offset:index_offset + index_size].decode('utf-8'))
+        except Exception:
+            self._mm.close()
+            raise
+        self._index = dict(((definition_id, role), (offset, size))
+                           for definition_id, role, offset, size in index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        """Iterates over pairs (definition id, role)."""
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def get_bytes(self, definition_id, role=DEFAULT_ROLE):
+        """Returns the JSON serialization of a schema encoded in UTF-8.
+
+        :raises: :class:`KeyError` if there is no such schema
+        :rtype: bytes
+        """
+        offset, size = self._index[(definition_id, role)]
+        return self._mm[offset:offset + size]
+
+    def get_schema(self, definition_id, role=DEFAULT_ROLE):
+        """Returns a schema parsed from :meth:`get_bytes`.
+
+        :raises: :class:`KeyError` if there is no such schema
+        :rtype: dict
+        """
+        return json.loads(self.get_bytes(definition_id, role=role).decode('utf-8'))
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,195 @@
+# coding: utf-8
+"""
+Command-line interface::
+
+    python -m jsl validate package.module:Document --role response data.jsonl --jobs 8
+
+validates every line of a `JSON Lines <http://jsonlines.org/>`_ file against
+a document. The file is memory-mapped and split into ranges of whole lines
+that are validated in parallel by worker processes. Errors are printed in
+line order as ``<file>:<line>: <message>``. On Python 2.6, the command requires
+the `argparse <https://pypi.python.org/pypi/argparse>`_ package.
+"""
+from __future__ import print_function
+
+import json
+import mmap
+import multiprocessing
+import sys
+
+from .roles import DEFAULT_ROLE
+from ._compat import text_type
+
+
+__all__ = ['load_document', 'validate_jsonl', 'main']
+
+#: A number of ranges per worker process. More ranges than processes
+#: even out the load when some parts of a file are slower to validate.
+_RANGES_PER_JOB = 4
+
+
+def load_document(spec):
+    """Imports a document by its ``module:name`` specification.
+
+    :param str spec: A string such as ``"package.module:Document"``.
+    :raises: :class:`ValueError`, :class:`ImportError`, :class:`AttributeError`
+    """
+    module_name, _, name = spec.partition(':')
+    if not module_name or not name:
+        raise ValueError(u'{0!r} is not of the form module:name'.format(spec))
+    __import__(module_name)
+    rv = sys.modules[module_name]
+    for part in name.split('.'):
+        rv = getattr(rv, part)
+    return rv
+
+
+def _to_pointer(path):
+    return u''.join(u'/' + text_type(part).replace(u'~', u'~0').replace(u'/', u'~1')
+                    for part in path)
+
+
+def _format_error(error):
+    if error.path:
+        return u'{0} (at {1})'.format(error.message, _to_pointer(error.path))
+    return text_type(error.message)
+
+
+def _split(mm, size, count):
+    """Splits ``mm`` into at most ``count`` ranges of whole lines.
+
+    :rtype: list of ``(start, end)`` tuples
+    """
+    boundaries = [0]
+    for i in range(1, count):
+        newline = mm.find(b'\n', max(size * i // count, boundaries[-1]))
+        if newline == -1:
+            break
+        if newline + 1 < size and newline + 1 > boundaries[-1]:
+            boundaries.append(newline + 1)
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _validate_range(args):
+    """Validates the lines of the ``[start, end)`` range of a file.
+
+    :returns:
+        a tuple of a number of lines in the range and a list of
+        ``(line_number, message)`` tuples, line numbers counted from 1
+        within the range
+    """
+    path, document_cls, role, start, end = args
+    validator = document_cls.get_validator(role=role)
+    errors = []
+    line_number = 0
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            pos = start
+            while pos < end:
+                newline = mm.find(b'\n', pos, end)
+                if newline == -1:
+                    newline = end
+                line = mm[pos:newline]
+                pos = newline + 1
+                line_number += 1
+                if not line.strip():
+                    continue
+                try:
+                    instance = json.loads(line.decode('utf-8'))
+                except ValueError as e:
+                    errors.append((line_number, u'Invalid JSON: {0}'.format(e)))
+                    continue
+                for error in validator.get_errors(instance):
+                    errors.append((line_number, _format_error(error)))
+        finally:
+            mm.close()
+    return line_number, errors
+
+
+def validate_jsonl(path, document_cls, role=DEFAULT_ROLE, jobs=1):
+    """Validates every non-blank line of a JSON Lines file against ``document_cls``.
+
+    :param str path: A path to the file.
+    :param document_cls: A document. Must be importable by worker processes.
+    :type document_cls: subclass of :class:`.Document`
+    :param str role: A role.
+    :param int jobs: A number of worker processes. If 1, lines are validated in
+                     the current process.
+    :raises: :class:`IOError` or :class:`OSError` if the file can not be read
+    :returns: an iterable of ``(line_number, message)`` tuples, ordered by line number
+    """
+    # the file is opened right away, so that errors are raised by the call
+    with open(path, 'rb') as f:
+        f.seek(0, 2)
+        size = f.tell()
+        if not size:
+            return iter(())
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            ranges = _split(mm, size, jobs * _RANGES_PER_JOB if jobs > 1 else 1)
+        finally:
+            mm.close()
+    tasks = [(path, document_cls, role, start, end) for start, end in ranges]
+    return _iter_errors(tasks, jobs)
+
+
+def _iter_errors(tasks, jobs):
+    if jobs > 1:
+        pool = multiprocessing.Pool(min(jobs, len(tasks)))
+        try:
+            results = pool.imap(_validate_range, tasks)
+            offset = 0
+            for line_count, errors in results:
+                for line_number, message in errors:
+                    yield offset + line_number, message
+                offset += line_count
+        finally:
+            pool.terminate()
+    else:
+        line_count, errors = _validate_range(tasks[0])
+        for error in errors:
+            yield error
+
+
+def _make_parser():
+    # argparse is not in the standard library of Python 2.6
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m jsl')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+    validate = subparsers.add_parser(
+        'validate', help='validate a JSON Lines file against a document')
+    validate.add_argument('document', help='a document to validate against, module:name')
+    validate.add_argument('path', help='a JSON Lines file')
+    validate.add_argument('--role', default=DEFAULT_ROLE, help='a role')
+    validate.add_argument('--jobs', '-j', type=int, default=1,
+                          help='a number of worker processes, 0 for the number of CPUs')
+    return parser
+
+
+def main(argv=None):
+    """Runs the command-line interface.
+
+    :returns: an exit status: 0 if all the lines are valid, 1 otherwise
+    """
+    parser = _make_parser()
+    args = parser.parse_args(argv)
+    try:
+        document_cls = load_document(args.document)
+    except (ValueError, ImportError, AttributeError) as e:
+        parser.error(u'can not load {0}: {1}'.format(args.document, e))
+    jobs = args.jobs or multiprocessing.cpu_count()
+    if jobs < 0:
+        parser.error(u'--jobs must not be negative')
+    try:
+        errors = validate_jsonl(args.path, document_cls, role=args.role, jobs=jobs)
+    except (IOError, OSError) as e:
+        parser.error(u'can not read {0}: {1}'.format(args.path, e))
+    status = 0
+    for line_number, message in errors:
+        print(u'{0}:{1}: {2}'.format(args.path, line_number, message))
+        status = 1
+    return status
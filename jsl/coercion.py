@@ -0,0 +1,290 @@
+# coding: utf-8
+"""
+Coercion of string values (e.g., query string parameters or form fields)
+to the types of the fields.
+
+A document is compiled into a tree of converting functions once, so
+coercing an instance does not interpret the fields again. Only the parts
+of an instance that may contain values to convert are visited.
+"""
+import datetime
+import re
+
+from .document import Document
+from .formats import parse_date_time
+from .roles import DEFAULT_ROLE
+from .validation import (compile_validator, _EnumNode, _NullNode, _BooleanNode, _StringNode,
+                         _NumberNode, _ArrayNode, _ObjectNode, _OfNode, _DocumentNode)
+from ._compat import iteritems, string_types
+
+
+__all__ = ['compile_coercion']
+
+_INTEGER = re.compile(r'-?(?:0|[1-9][0-9]*)\Z')
+_NUMBER = re.compile(r'-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][+-]?[0-9]+)?\Z')
+_BOOLEANS = {'true': True, 'false': False, '1': True, '0': False}
+_NULLS = frozenset(['', 'null'])
+# returned by converters if a value can not be converted
+_INVALID = object()
+
+
+class _FixedOffset(datetime.tzinfo):
+    """A time zone with a fixed offset from UTC in minutes."""
+
+    def __init__(self, offset):
+        self._offset = datetime.timedelta(minutes=offset)
+        self._offset_minutes = offset
+
+    def utcoffset(self, dt):
+        return self._offset
+
+    def dst(self, dt):
+        return datetime.timedelta(0)
+
+    def tzname(self, dt):
+        sign = '-' if self._offset_minutes < 0 else '+'
+        return 'UTC{0}{1:02d}:{2:02d}'.format(sign, *divmod(abs(self._offset_minutes), 60))
+
+    def __reduce__(self):
+        return _FixedOffset, (self._offset_minutes,)
+
+
+_UTC = _FixedOffset(0)
+_time_zones = {0: _UTC}
+
+
+def _to_int(value):
+    if _INTEGER.match(value):
+        return int(value)
+    return _INVALID
+
+
+def _to_number(value):
+    match = _NUMBER.match(value)
+    if match is None:
+        return _INVALID
+    if match.group(1) is None and match.group(2) is None:
+        return int(value)
+    return float(value)
+
+
+def _to_bool(value):
+    return _BOOLEANS.get(value.lower(), _INVALID)
+
+
+def _to_null(value):
+    return None if value in _NULLS else _INVALID
+
+
+def _to_date_time(value):
+    parsed = parse_date_time(value)
+    if parsed is None:
+        return _INVALID
+    year, month, day, hour, minute, second, microsecond, utc_offset = parsed
+    if second == 60:
+        # a leap second is not representable
+        return _INVALID
+    tz = _time_zones.get(utc_offset)
+    if tz is None:
+        tz = _time_zones[utc_offset] = _FixedOffset(utc_offset)
+    return datetime.datetime(year, month, day, hour, minute, second, microsecond, tz)
+
+
+def _scalar(convert):
+    """Makes a coercion function of a function that converts strings."""
+    def coerce(value):
+        if isinstance(value, string_types):
+            converted = convert(value)
+            if converted is not _INVALID:
+                return converted
+        return value
+    coerce.convert = convert
+    return coerce
+
+
+class _Compiler(object):
+    """Compiles validator nodes into coercion functions. Returns ``None`` for
+    the nodes which values are left as they are.
+    """
+
+    def __init__(self, parse_dates):
+        self.parse_dates = parse_dates
+        self._documents = {}
+
+    def compile(self, node):
+        if isinstance(node, _DocumentNode):
+            return self._compile_document(node)
+        elif isinstance(node, _EnumNode):
+            return self.compile(node.node)
+        elif isinstance(node, _NumberNode):
+            return _scalar(_to_int if node.integer else _to_number)
+        elif isinstance(node, _BooleanNode):
+            return _scalar(_to_bool)
+        elif isinstance(node, _NullNode):
+            return _scalar(_to_null)
+        elif isinstance(node, _StringNode):
+            if self.parse_dates and node.format == 'date-time':
+                return _scalar(_to_date_time)
+            return None
+        elif isinstance(node, _ArrayNode):
+            return self._compile_array(node)
+        elif isinstance(node, _ObjectNode):
+            return self._compile_object(node)
+        elif isinstance(node, _OfNode):
+            return self._compile_of(node)
+        return None
+
+    def _compile_document(self, node):
+        if node in self._documents:
+            return self._documents[node]
+        # the function of the contents is compiled after the document function is
+        # created, since the contents may refer to the document
+        contents = []
+        self._documents[node] = lambda value: contents[0](value)
+        coerce = self.compile(node.node)
+        if coerce is None:
+            coerce = _identity
+        contents.append(coerce)
+        return self._documents[node]
+
+    def _compile_array(self, node):
+        items = node.items
+        if isinstance(items, tuple):
+            coercions = [self.compile(item) or _identity for item in items]
+            additional_items = node.additional_items
+            if additional_items is True or additional_items is False:
+                additional = _identity
+            else:
+                additional = self.compile(additional_items) or _identity
+            if all(c is _identity for c in coercions) and additional is _identity:
+                return None
+            n = len(coercions)
+
+            def coerce(value):
+                if not isinstance(value, list):
+                    return value
+                return ([c(item) for c, item in zip(coercions, value)] +
+                        [additional(item) for item in value[n:]])
+            return coerce
+        elif items is not None:
+            coerce_item = self.compile(items)
+            if coerce_item is None:
+                return None
+
+            def coerce(value):
+                if not isinstance(value, list):
+                    return value
+                return [coerce_item(item) for item in value]
+            return coerce
+        return None
+
+    def _compile_object(self, node):
+        coercions = {}
+        for key, property_node in iteritems(node.properties):
+            coerce_property = self.compile(property_node)
+            if coerce_property is not None:
+                coercions[key] = coerce_property
+        patterns = []
+        for pattern, property_node in node.pattern_properties:
+            coerce_property = self.compile(property_node)
+            if coerce_property is not None:
+                patterns.append((pattern, coerce_property))
+        additional = None
+        if not isinstance(node.additional_properties, bool):
+            additional = self.compile(node.additional_properties)
+        if not coercions and not patterns and additional is None:
+            return None
+        declared = frozenset(node.properties)
+
+        def coerce_value(key, value):
+            coerce_property = coercions.get(key)
+            if coerce_property is not None:
+                return coerce_property(value)
+            if key in declared:
+                return value
+            # like a validator, applies the first matching pattern
+            for pattern, coerce_property in patterns:
+                if pattern.search(key) is not None:
+                    return coerce_property(value)
+            if additional is not None:
+                return additional(value)
+            return value
+
+        if not patterns and additional is None:
+            get = coercions.get
+
+            def coerce(value):
+                if not isinstance(value, dict):
+                    return value
+                return dict((k, get(k, _identity)(v)) for k, v in iteritems(value))
+        else:
+            def coerce(value):
+                if not isinstance(value, dict):
+                    return value
+                return dict((k, coerce_value(k, v)) for k, v in iteritems(value))
+        return coerce
+
+    def _compile_of(self, node):
+        coercions = [self.compile(nested_node) for nested_node in node.nodes]
+        coercions = [c for c in coercions if c is not None]
+        if not coercions:
+            return None
+        if len(coercions) == 1:
+            return coercions[0]
+        if node.keyword == 'allOf':
+            # an instance is of all the alternatives
+            def coerce(value):
+                for coerce_alternative in coercions:
+                    value = coerce_alternative(value)
+                return value
+            return coerce
+        converters = [getattr(c, 'convert', None) for c in coercions]
+        if None in converters:
+            # objects or arrays: use the first alternative that changes the value
+            def coerce(value):
+                for coerce_alternative in coercions:
+                    coerced = coerce_alternative(value)
+                    if coerced != value or type(coerced) is not type(value):
+                        return coerced
+                return value
+            return coerce
+
+        # scalars: the first successful conversion in the order of the alternatives
+        def convert(value):
+            for convert_alternative in converters:
+                converted = convert_alternative(value)
+                if converted is not _INVALID:
+                    return converted
+            return _INVALID
+        return _scalar(convert)
+
+
+def _identity(value):
+    return value
+
+
+def compile_coercion(field_or_document, role=DEFAULT_ROLE, parse_dates=False):
+    """Compiles a coercion of instances.
+
+    Strings are converted according to the fields: integers for :class:`.IntField`,
+    integers or floats for :class:`.NumberField`, ``True`` for ``"true"`` and ``"1"``
+    and ``False`` for ``"false"`` and ``"0"`` for :class:`.BooleanField`, ``None``
+    for ``""`` and ``"null"`` for :class:`.NullField` and, if ``parse_dates`` is set,
+    :class:`datetime.datetime` for :class:`.DateTimeField`. Strings that can not be converted are left as they
+    are, so that validation reports them. For the fields with several alternatives
+    (e.g., :class:`.OneOfField`), the first successful conversion is used.
+
+    :param field_or_document: A field or a document.
+    :type field_or_document: :class:`.BaseField` or subclass of :class:`.Document`
+    :param str role: A role.
+    :param bool parse_dates:
+        Whether to convert date-time strings. Date-times are not strings anymore,
+        so coerced instances with them can not be validated. Off by default.
+    :raises: :class:`.SchemaGenerationException`
+    :returns: a function that takes an instance and returns a coerced copy of it
+    """
+    if isinstance(field_or_document, type) and issubclass(field_or_document, Document):
+        node = field_or_document.get_validator(role=role)._node
+    else:
+        node = compile_validator(field_or_document, role=role)._node
+    return _Compiler(parse_dates).compile(node) or _identity
@@ -0,0 +1,264 @@
+# coding: utf-8
+"""
+Vectorized validation of columnar data with NumPy.
+
+Requires `NumPy <http://www.numpy.org/>`_ 1.13 or later to be installed.
+"""
+from .roles import DEFAULT_ROLE
+from .validation import (_DocumentNode, _ObjectNode, _EnumNode, _NumberNode, _StringNode,
+                         _BooleanNode, _NullNode, _in_enum)
+from ._compat import iteritems, string_types, integer_types
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+__all__ = ['ColumnarValidator', 'ColumnarResult']
+
+
+def _is_string(value):
+    return isinstance(value, string_types)
+
+
+def _is_bool(value):
+    return value is True or value is False
+
+
+def _is_null(value):
+    return value is None
+
+
+def _is_number(value):
+    return isinstance(value, integer_types + (float,)) and not _is_bool(value)
+
+
+def _elementwise(function, column):
+    return numpy.frompyfunc(function, 1, 1)(column).astype(bool)
+
+
+def _to_array(column):
+    """Converts ``column`` to an array. Unlike :func:`numpy.asarray`, never converts
+    values of different types to a common type (``[1, 'a']`` is not turned into
+    ``['1', 'a']``): such columns get the ``object`` dtype.
+    """
+    if isinstance(column, numpy.ndarray):
+        return column
+    column = list(column)
+    if len(set(map(type, column))) == 1:
+        try:
+            array = numpy.asarray(column)
+        except OverflowError:
+            pass
+        else:
+            if array.ndim == 1:
+                return array
+    array = numpy.empty(len(column), dtype=object)
+    array[:] = column
+    return array
+
+
+class ColumnarResult(object):
+    """A result of :meth:`.ColumnarValidator.validate`.
+
+    :param invalid_rows: A boolean mask of invalid rows.
+    :param dict violations:
+        A dictionary mapping column names to numbers of rows that are invalid because
+        of the column values (or their absence). Violations of ``min_properties`` and
+        ``max_properties`` are counted under the ``None`` key.
+    """
+
+    def __init__(self, invalid_rows, violations):
+        self.invalid_rows = invalid_rows  #:
+        self.violations = violations  #:
+
+    @property
+    def is_valid(self):
+        """Whether all the rows are valid."""
+        return not self.invalid_rows.any()
+
+    @property
+    def invalid_count(self):
+        """A number of invalid rows."""
+        return int(self.invalid_rows.sum())
+
+
+class ColumnarValidator(object):
+    """Validates rows of a document that are stored as columns: a mapping from
+    property names to NumPy arrays (or lists) of equal length. Instead of
+    looping over rows, every constraint is checked for a whole column at once.
+
+    Only the documents which properties are :class:`.NumberField`, :class:`.IntField`,
+    :class:`.BooleanField`, :class:`.NullField` and :class:`.StringField` are supported.
+    Columns with ``object`` dtype are checked for types element-wise.
+
+    :param document_cls: A document.
+    :type document_cls: subclass of :class:`.Document`
+    :param str role: A role.
+    :raises: :class:`TypeError` if the document has unsupported fields
+    """
+
+    def __init__(self, document_cls, role=DEFAULT_ROLE):
+        if numpy is None:  # pragma: no cover
+            raise ImportError('ColumnarValidator requires NumPy to be installed')
+        node = document_cls.get_validator(role=role)._node
+        if isinstance(node, _DocumentNode):
+            node = node.node
+        if isinstance(node, _EnumNode) or not isinstance(node, _ObjectNode):
+            raise TypeError(u'{0!r} can not be validated by columns'.format(document_cls))
+        if node.pattern_properties or not isinstance(node.additional_properties, bool):
+            raise TypeError(u'{0!r} can not be validated by columns: pattern or additional '
+                            u'properties are described by fields'.format(document_cls))
+        self._columns = {}
+        for key, property_node in iteritems(node.properties):
+            enum = None
+            if isinstance(property_node, _EnumNode):
+                enum = property_node
+                property_node = property_node.node
+            if not isinstance(property_node, (_NumberNode, _StringNode, _BooleanNode, _NullNode)):
+                raise TypeError(u'Property {0!r} of {1!r} can not be validated by columns'.format(
+                    key, document_cls))
+            self._columns[key] = (property_node, enum)
+        self._required = node.required
+        self._additional_properties = node.additional_properties
+        self._min_properties = node.min_properties
+        self._max_properties = node.max_properties
+        self.document_cls = document_cls  #:
+        self.role = role  #:
+
+    def validate(self, columns):
+        """Validates the rows stored in ``columns``.
+
+        :param dict columns: A mapping from property names to arrays of equal length.
+        :rtype: :class:`.ColumnarResult`
+        """
+        if not columns:
+            raise ValueError('At least one column is required')
+        arrays = dict((key, _to_array(column)) for key, column in iteritems(columns))
+        lengths = set(len(array) for array in arrays.values())
+        if len(lengths) != 1:
+            raise ValueError('Columns must be of equal length')
+        length, = lengths
+
+        invalid_rows = numpy.zeros(length, dtype=bool)
+        violations = {}
+
+        def report(key, bad):
+            count = int(bad.sum())
+            if count:
+                violations[key] = violations.get(key, 0) + count
+                invalid_rows[...] |= bad
+
+        for key in self._required:
+            if key not in arrays:
+                report(key, numpy.ones(length, dtype=bool))
+        for key, array in iteritems(arrays):
+            if key in self._columns:
+                node, enum = self._columns[key]
+                report(key, self._check_column(node, enum, array))
+            elif not self._additional_properties:
+                report(key, numpy.ones(length, dtype=bool))
+        if self._min_properties is not None and len(arrays) < self._min_properties:
+            report(None, numpy.ones(length, dtype=bool))
+        if self._max_properties is not None and len(arrays) > self._max_properties:
+            report(None, numpy.ones(length, dtype=bool))
+        return ColumnarResult(invalid_rows, violations)
+
+    def _check_column(self, node, enum, array):
+        if isinstance(node, _NumberNode):
+            bad = self._check_number_column(node, array)
+        elif isinstance(node, _StringNode):
+            bad = self._check_string_column(node, array)
+        elif isinstance(node, _BooleanNode):
+            if array.dtype.kind == 'b':
+                bad = numpy.zeros(len(array), dtype=bool)
+            elif array.dtype.kind == 'O':
+                bad = ~_elementwise(_is_bool, array)
+            else:
+                bad = numpy.ones(len(array), dtype=bool)
+        else:
+            if array.dtype.kind == 'O':
+                bad = ~_elementwise(_is_null, array)
+            else:
+                bad = numpy.ones(len(array), dtype=bool)
+        if enum is not None:
+            bad |= self._check_enum_column(enum._get_enum(), array)
+        return bad
+
+    def _check_enum_column(self, enum, array):
+        # numpy.isin compares values of different types (True equals 1 and
+        # 1 equals '1' in a string array), so only the choices of the
+        # column type are compared, as the row validator does
+        kind = array.dtype.kind
+        if kind == 'O':
+            return ~_elementwise(lambda value: _in_enum(value, enum), array)
+        if kind == 'b':
+            choices = [choice for choice in enum if _is_bool(choice)]
+        elif kind in 'iuf':
+            choices = [choice for choice in enum if _is_number(choice)]
+        elif kind == 'U':
+            choices = [choice for choice in enum if _is_string(choice)]
+        else:
+            return numpy.ones(len(array), dtype=bool)
+        return ~numpy.isin(array, choices)
+
+    def _check_number_column(self, node, array):
+        kind = array.dtype.kind
+        integer = node.integer
+        if kind in 'iu' or (kind == 'f' and not integer):
+            bad = numpy.zeros(len(array), dtype=bool)
+            values = array
+        elif kind == 'O':
+            types = node.types
+
+            def is_number(value):
+                return isinstance(value, types) and not _is_bool(value)
+
+            bad = ~_elementwise(is_number, array)
+            values = numpy.where(bad, 0, array).astype(float if not integer else object)
+        else:
+            return numpy.ones(len(array), dtype=bool)
+
+        if node.minimum is not None:
+            if node.exclusive_minimum:
+                bad |= numpy.asarray(values <= node.minimum, dtype=bool)
+            else:
+                bad |= numpy.asarray(values < node.minimum, dtype=bool)
+        if node.maximum is not None:
+            if node.exclusive_maximum:
+                bad |= numpy.asarray(values >= node.maximum, dtype=bool)
+            else:
+                bad |= numpy.asarray(values > node.maximum, dtype=bool)
+        if node.multiple_of is not None:
+            multiple_of = node.multiple_of
+            if isinstance(multiple_of, float) or values.dtype.kind == 'f':
+                quotient = numpy.asarray(values / multiple_of, dtype=float)
+                bad |= quotient != numpy.trunc(quotient)
+            else:
+                bad |= numpy.asarray(values % multiple_of != 0, dtype=bool)
+        return bad
+
+    def _check_string_column(self, node, array):
+        kind = array.dtype.kind
+        if kind == 'U':
+            bad = numpy.zeros(len(array), dtype=bool)
+            strings = array
+        elif kind == 'O':
+            bad = ~_elementwise(_is_string, array)
+            strings = numpy.where(bad, u'', array).astype(numpy.str_)
+        else:
+            return numpy.ones(len(array), dtype=bool)
+
+        if node.min_length is not None or node.max_length is not None:
+            lengths = numpy.char.str_len(strings)
+            if node.min_length is not None:
+                bad |= lengths < node.min_length
+            if node.max_length is not None:
+                bad |= lengths > node.max_length
+        if node.pattern is not None:
+            search = node.pattern.search
+            bad |= ~_elementwise(lambda value: search(value) is not None, strings)
+        if node.format_checker is not None:
+            bad |= ~_elementwise(node.format_checker, strings)
+        return bad
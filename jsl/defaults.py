@@ -0,0 +1,209 @@
+# coding: utf-8
+"""
+Filling instances with the default values of fields.
+
+A document or a field is compiled for a role into a plan which only lists the
+properties that have defaults and the nested objects that may contain such
+properties, so applying it visits nothing else.
+"""
+import copy
+
+from .document import Document, ALL_OF, INLINE
+from .exceptions import processing, DocumentStep, AttributeStep, ItemStep
+from .fields import BaseSchemaField, ArrayField, DictField, DocumentField, Null
+from .roles import DEFAULT_ROLE, Resolvable
+from ._compat import iteritems
+
+
+__all__ = ['compile_defaults']
+
+# kinds of defaults
+_IMMUTABLE = 0
+_MUTABLE = 1  # copied each time it's used
+_CALLABLE = 2  # called each time it's used
+
+
+class _Plan(object):
+    def apply(self, value):  # pragma: no cover
+        """Fills ``value`` with defaults in place."""
+        raise NotImplementedError
+
+
+class _ObjectPlan(_Plan):
+    def __init__(self, defaults, nested):
+        #: A tuple of triples (key, default, kind).
+        self.defaults = tuple(defaults)
+        #: A tuple of pairs (key, plan) of the properties to descend into.
+        self.nested = tuple(nested)
+
+    def apply(self, value):
+        if not isinstance(value, dict):
+            return
+        # nested values are visited first, so that the added defaults
+        # are left exactly as they are specified
+        for key, plan in self.nested:
+            if key in value:
+                plan.apply(value[key])
+        for key, default, kind in self.defaults:
+            if key not in value:
+                if kind == _CALLABLE:
+                    default = default()
+                    # the same as in the schema: None means there is no default
+                    if default is None:
+                        continue
+                    if default is Null:
+                        default = None
+                elif kind == _MUTABLE:
+                    default = copy.deepcopy(default)
+                value[key] = default
+
+
+class _ArrayPlan(_Plan):
+    def __init__(self, items):
+        #: A plan all the items are filled by or a tuple of plans
+        #: (``None`` for the items without defaults).
+        self.items = items
+
+    def apply(self, value):
+        if not isinstance(value, list):
+            return
+        items = self.items
+        if isinstance(items, tuple):
+            for plan, item in zip(items, value):
+                if plan is not None:
+                    plan.apply(item)
+        else:
+            for item in value:
+                items.apply(item)
+
+
+class _AllPlan(_Plan):
+    def __init__(self, plans):
+        self.plans = tuple(plans)
+
+    def apply(self, value):
+        for plan in self.plans:
+            plan.apply(value)
+
+
+class _DocumentPlan(_Plan):
+    def __init__(self, document_cls):
+        self.document_cls = document_cls
+        #: A plan of the document contents or ``None`` if it has no defaults.
+        #: Set after the plan is created to allow recursive references.
+        self.plan = None
+
+    def apply(self, value):
+        if self.plan is not None:
+            self.plan.apply(value)
+
+
+def _get_kind(default):
+    if callable(default):
+        return _CALLABLE
+    elif isinstance(default, (dict, list)):
+        return _MUTABLE
+    return _IMMUTABLE
+
+
+class _Compiler(object):
+    """Compiles fields and documents into plans. Returns ``None`` for
+    the fields which instances never get defaults.
+    """
+
+    def __init__(self):
+        self._document_plans = {}
+
+    def compile_document(self, document_cls, role):
+        key = (document_cls, role)
+        plan = self._document_plans.get(key)
+        if plan is not None:
+            return plan
+        plan = self._document_plans[key] = _DocumentPlan(document_cls)
+        with processing(DocumentStep(document_cls, role=role)):
+            plans = [self.compile_field(document_cls._backend, role)]
+        # with anyOf and oneOf it's unknown which of the parents an instance is of
+        if document_cls._options.inheritance_mode in (INLINE, ALL_OF):
+            plans.extend(self.compile_document(parent_document, role)
+                         for parent_document in document_cls._parent_documents)
+        plans = [p for p in plans if p is not None]
+        if len(plans) == 1:
+            plan.plan = plans[0]
+        elif plans:
+            plan.plan = _AllPlan(plans)
+        return plan
+
+    def compile_field(self, field, role):
+        if isinstance(field, DocumentField):
+            return self.compile_document(field.document_cls, field.get_nested_role(role))
+        elif isinstance(field, DictField):
+            return self._compile_dict_field(field, role)
+        elif isinstance(field, ArrayField):
+            return self._compile_array_field(field, role)
+        return None
+
+    def _compile_dict_field(self, field, role):
+        properties, properties_role = field.resolve_attr('properties', role)
+        if not properties:
+            return None
+        defaults = []
+        nested = []
+        with processing(AttributeStep('properties', role=role)):
+            for prop, prop_field in iteritems(properties):
+                with processing(ItemStep(prop, role=properties_role)):
+                    if not isinstance(prop_field, Resolvable):
+                        continue
+                    prop_field, prop_field_role = prop_field.resolve(properties_role)
+                    if prop_field is None:
+                        continue
+                    key = field._get_property_key(prop, prop_field)
+                    if isinstance(prop_field, BaseSchemaField):
+                        default = prop_field.resolve_attr('_default', prop_field_role).value
+                        if default is Null:
+                            defaults.append((key, None, _IMMUTABLE))
+                        elif default is not None:
+                            defaults.append((key, default, _get_kind(default)))
+                    plan = self.compile_field(prop_field, prop_field_role)
+                    if plan is not None:
+                        nested.append((key, plan))
+        if not defaults and not nested:
+            return None
+        return _ObjectPlan(defaults, nested)
+
+    def _compile_array_field(self, field, role):
+        items, items_role = field.resolve_attr('items', role)
+        if isinstance(items, (list, tuple)):
+            plans = []
+            for item in items:
+                if not isinstance(item, Resolvable):
+                    continue
+                item, item_role = item.resolve(items_role)
+                # unresolved items are not present in the schema
+                if item is not None:
+                    plans.append(self.compile_field(item, item_role))
+            if not any(plan is not None for plan in plans):
+                return None
+            return _ArrayPlan(tuple(plans))
+        elif isinstance(items, Resolvable):
+            plan = self.compile_field(items, items_role)
+            if plan is not None:
+                return _ArrayPlan(plan)
+        return None
+
+
+def compile_defaults(field_or_document, role=DEFAULT_ROLE):
+    """Compiles a plan of filling instances with defaults.
+
+    :param field_or_document: A field or a document.
+    :type field_or_document: :class:`.BaseField` or subclass of :class:`.Document`
+    :param str role: A role.
+    :raises: :class:`.SchemaGenerationException`
+    :returns: an object with the ``apply(instance)`` method that fills
+              ``instance`` with defaults in place
+    """
+    compiler = _Compiler()
+    if isinstance(field_or_document, type) and issubclass(field_or_document, Document):
+        plan = compiler.compile_document(field_or_document, role)
+    else:
+        plan = compiler.compile_field(field_or_document, role) or _AllPlan(())
+    return plan
@@ -1,7 +1,9 @@
 # coding: utf-8
 import inspect
+import time
 
 from . import registry
+from .registry import DEFAULT_REGISTRY
 from .exceptions import processing, DocumentStep
 from .fields import BaseField, DocumentField, DictField
 from .roles import DEFAULT_ROLE, Var, Scope, all_, construct_matcher, Resolvable, Resolution
@@ -53,6 +55,11 @@ class Options(object):
         :data:`ALL_OF`, :data:`ANY_OF`, or :data:`ONE_OF`
 
         .. versionadded:: 0.1.4
+    :param registry:
+        A :class:`.Registry` to put the document to and to look up the string
+        references of its :class:`.DocumentField` s in. Defaults to
+        :data:`~jsl.registry.DEFAULT_REGISTRY`.
+    :type registry: :class:`.Registry`
     """
 
     def __init__(self, additional_properties=False, pattern_properties=None,
@@ -61,7 +68,7 @@ class Options(object):
                  default=None, enum=None,
                  id='', schema_uri='http://json-schema.org/draft-04/schema#',
                  definition_id=None, roles_to_propagate=None,
-                 inheritance_mode=INLINE):
+                 inheritance_mode=INLINE, registry=None):
         self.pattern_properties = pattern_properties
         self.additional_properties = additional_properties
         self.min_properties = min_properties
@@ -84,6 +91,7 @@ class Options(object):
                 )
             )
         self.inheritance_mode = inheritance_mode
+        self.registry = DEFAULT_REGISTRY if registry is None else registry
 
 
 class DocumentBackend(DictField):
@@ -131,6 +139,11 @@ class DocumentMeta(with_metaclass(Prepareable, type)):
         attrs['_fields'] = fields
         attrs['_parent_documents'] = sorted(parent_documents, key=lambda d: d.get_definition_id())
         attrs['_options'] = options
+        # objects derived from the document (e.g. compiled validators), keyed by (kind, role)
+        attrs['_cache'] = {}
+        # when the document is defined, to tell whether its module's source
+        # has been edited since then (see :mod:`jsl.snapshots`)
+        attrs['_created'] = time.time()
         attrs['_backend'] = DocumentBackend(
             properties=fields,
             pattern_properties=options.pattern_properties,
@@ -145,7 +158,7 @@ class DocumentMeta(with_metaclass(Prepareable, type)):
         )
 
         klass = type.__new__(mcs, name, bases, attrs)
-        registry.put_document(klass.__name__, klass, module=klass.__module__)
+        options.registry.put_document(klass.__name__, klass, module=klass.__module__)
         _set_owner_to_document_fields(klass)
         return klass
 
@@ -363,6 +376,145 @@ class Document(with_metaclass(DocumentMeta)):
         rv.update(schema)
         return rv
 
+    @classmethod
+    def get_validator(cls, role=DEFAULT_ROLE):
+        """Returns a :class:`.Validator` of the document instances compiled for ``role``.
+        The validator is compiled once and then cached.
+
+        :param str role: A role.
+        :raises: :class:`.SchemaGenerationException`
+        :rtype: :class:`.Validator`
+        """
+        key = ('validator', role)
+        validator = cls._cache.get(key)
+        if validator is None:
+            from .validation import compile_validator
+            validator = cls._cache[key] = compile_validator(cls, role=role)
+        return validator
+
+    @classmethod
+    def apply_defaults(cls, instance, role=DEFAULT_ROLE):
+        """Fills ``instance`` in place with the defaults of the fields which keys are
+        missing, including the fields of nested documents. Callable defaults are only
+        called for the missing keys.
+
+        A plan of which keys have defaults is compiled once for a role and then cached.
+
+        :param dict instance: An instance of the document.
+        :param str role: A role.
+        :raises: :class:`.SchemaGenerationException`
+        :returns: ``instance``
+        """
+        key = ('defaults', role)
+        plan = cls._cache.get(key)
+        if plan is None:
+            from .defaults import compile_defaults
+            plan = cls._cache[key] = compile_defaults(cls, role=role)
+        plan.apply(instance)
+        return instance
+
+    @classmethod
+    def project(cls, instance, role=DEFAULT_ROLE):
+        """Returns a copy of ``instance`` without the keys of the fields that
+        are not resolved for ``role``, including the fields of nested documents.
+        Undeclared keys are removed unless additional properties are allowed.
+
+        Sets of the keys to keep are compiled once for a role and then cached.
+
+        :param dict instance: An instance of the document.
+        :param str role: A role.
+        :raises: :class:`.SchemaGenerationException`
+        :rtype: dict
+        """
+        key = ('projection', role)
+        projection = cls._cache.get(key)
+        if projection is None:
+            from .projection import compile_projection
+            projection = cls._cache[key] = compile_projection(cls, role=role)
+        return projection.project(instance)
+
+    @classmethod
+    def record_class(cls, role=DEFAULT_ROLE):
+        """Returns a :class:`.Record` class with a slot for every field of the document
+        resolved for ``role`` and generated methods that convert valid instances
+        to records and back. Nested documents are converted to their records.
+        The class is generated once and then cached.
+
+        :param str role: A role.
+        :raises: :class:`ValueError` if an attribute name can not be used in a record
+        :rtype: subclass of :class:`.Record`
+        """
+        record_cls = cls._cache.get(('record_class', role))
+        if record_cls is None:
+            from .records import compile_record_class
+            record_cls = compile_record_class(cls, role=role)
+        return record_cls
+
+    @classmethod
+    def get_field_index(cls, role=DEFAULT_ROLE):
+        """Returns a :class:`.FieldIndex` of the fields of the document resolved for
+        ``role``, including the fields of nested documents, by their paths in instances
+        and by their types.
+
+        The index is built on first use and then cached until the document's registry
+        changes (which may change the documents :class:`.DocumentField` s point to).
+
+        :param str role: A role.
+        :rtype: :class:`.FieldIndex`
+        """
+        key = ('field_index', role)
+        version = cls._options.registry.get_version()
+        cached = cls._cache.get(key)
+        if cached is None or cached[0] != version:
+            from .fieldindex import compile_field_index
+            cached = cls._cache[key] = (version, compile_field_index(cls, role=role))
+        return cached[1]
+
+    @classmethod
+    def coerce(cls, instance, role=DEFAULT_ROLE, parse_dates=False):
+        """Returns a copy of ``instance`` which strings are converted to the types
+        of the fields (e.g., ``"1"`` of an :class:`.IntField` to ``1``), including the
+        fields of nested documents. Useful for query string parameters and form fields
+        that are validated afterwards. See :func:`.compile_coercion` for the conversion rules.
+
+        The coercion is compiled once for a role and then cached.
+
+        :param dict instance: An instance of the document.
+        :param str role: A role.
+        :param bool parse_dates:
+            Whether to convert the values of :class:`.DateTimeField` s to
+            :class:`datetime.datetime`. Such instances can not be validated.
+        :raises: :class:`.SchemaGenerationException`
+        :rtype: dict
+        """
+        key = ('date_coercion' if parse_dates else 'coercion', role)
+        coerce = cls._cache.get(key)
+        if coerce is None:
+            from .coercion import compile_coercion
+            coerce = cls._cache[key] = compile_coercion(cls, role=role,
+                                                        parse_dates=parse_dates)
+        return coerce(instance)
+
+    @classmethod
+    def aget_schema(cls, role=DEFAULT_ROLE, ordered=False):
+        """An asynchronous version of :meth:`get_schema` that generates the schema
+        in an executor (see :mod:`jsl.aio`). Requires Python 3.5+.
+
+        :rtype: awaitable
+        """
+        from .aio import get_schema
+        return get_schema(cls, role=role, ordered=ordered)
+
+    @classmethod
+    def aget_validator(cls, role=DEFAULT_ROLE):
+        """An asynchronous version of :meth:`get_validator` that compiles
+        the validator in an executor. Requires Python 3.5+.
+
+        :rtype: awaitable
+        """
+        from .aio import get_validator
+        return get_validator(cls, role=role)
+
     @classmethod
     def get_definitions_and_schema(cls, role=DEFAULT_ROLE, res_scope=EMPTY_SCOPE,
                                    ordered=False, ref_documents=None):
@@ -129,19 +129,7 @@ class SchemaGenerationException(Exception):
         """
 
     def _format_steps(self):
-        if not self.steps:
-            return ''
-        parts = []
-        steps = iter(self.steps)
-        parts.append(str(next(steps)))
-        for step in steps:
-            if isinstance(step, (DocumentStep, FieldStep)):
-                parts.append(' -> {0}'.format(step))
-            elif isinstance(step, AttributeStep):
-                parts.append('.{0}'.format(step))
-            elif isinstance(step, ItemStep):
-                parts.append('[{0}]'.format(step))
-        return ''.join(parts)
+        return _format_steps(self.steps)
 
     def __str__(self):
         rv = text_type(self.message)
@@ -149,3 +137,56 @@ class SchemaGenerationException(Exception):
         if steps:
             rv += u'\nSteps: {0}'.format(steps)
         return rv
+
+
+@implements_to_string
+class ValidationError(Exception):
+    """
+    Describes a violation found by a :class:`validator <.Validator>`.
+
+    :param str message: A message.
+    :param steps: An iterable of :class:`steps <.Step>` leading to the invalid value.
+    """
+
+    def __init__(self, message, steps=()):
+        self.message = message
+        """A message."""
+        self.steps = collections.deque(steps)
+        """
+        A deque of :class:`steps <.Step>`, ordered from the outermost to the invalid value.
+        :class:`DocumentStep` s mark entering a document, :class:`ItemStep` s contain
+        object keys and array indices, and the last :class:`AttributeStep`, if any,
+        names the field attribute which constraint has been violated
+        (e.g., ``"min_length"`` or ``"required"``).
+        """
+
+    @property
+    def path(self):
+        """A tuple of object keys and array indices leading to the invalid value."""
+        return tuple(step.entity for step in self.steps if isinstance(step, ItemStep))
+
+    def _format_steps(self):
+        return _format_steps(self.steps)
+
+    def __str__(self):
+        rv = text_type(self.message)
+        steps = self._format_steps()
+        if steps:
+            rv += u'\nSteps: {0}'.format(steps)
+        return rv
+
+
+def _format_steps(steps):
+    if not steps:
+        return ''
+    parts = []
+    steps = iter(steps)
+    parts.append(str(next(steps)))
+    for step in steps:
+        if isinstance(step, (DocumentStep, FieldStep)):
+            parts.append(' -> {0}'.format(step))
+        elif isinstance(step, AttributeStep):
+            parts.append('.{0}'.format(step))
+        elif isinstance(step, ItemStep):
+            parts.append('[{0}]'.format(step))
+    return ''.join(parts)
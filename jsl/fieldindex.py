@@ -0,0 +1,186 @@
+# coding: utf-8
+"""
+An index of the fields of a document resolved for a role, by the paths of their
+values in instances and by their types.
+
+Paths are `JSON Pointers`_ into instances: ``/address/street`` is the path of
+the ``street`` field of a document which is the ``address`` field of another
+document. ``*`` stands for any item of an array or any key of an object that
+matches pattern or additional properties. Alternatives of :class:`.OneOfField`
+and other compound fields share the path of the field, as do the fields of
+parent documents. A recursive document is indexed down to its first
+recursive reference.
+
+.. _JSON Pointers: https://tools.ietf.org/html/rfc6901
+"""
+from .document import Document
+from .fields import BaseField, ArrayField, DictField, DocumentField, NotField
+from .fields.compound import BaseOfField
+from .roles import DEFAULT_ROLE, Resolvable
+from ._compat import iteritems
+
+
+__all__ = ['FieldIndex', 'compile_field_index']
+
+_ANY = '*'
+
+
+def _join(path, token):
+    return u'{0}/{1}'.format(path, token.replace('~', '~0').replace('/', '~1'))
+
+
+class FieldIndex(object):
+    """An index of fields by their paths and types.
+    Use :func:`compile_field_index` or :meth:`.Document.get_field_index` to create one.
+
+    :param items: An iterable of pairs (path, field) in a DFS order.
+    """
+
+    def __init__(self, items):
+        self._items = tuple(items)
+        self._fields_by_path = {}
+        self._paths_by_field = {}
+        self._items_by_exact_type = {}
+        for path, field in self._items:
+            self._fields_by_path.setdefault(path, []).append(field)
+            self._paths_by_field.setdefault(field, []).append(path)
+            self._items_by_exact_type.setdefault(type(field), []).append((path, field))
+        # the positions of the items, to merge the items of several types in a DFS order
+        self._positions = dict((item, i) for i, item in enumerate(self._items))
+        self._items_by_type = {}
+
+    def __iter__(self):
+        """Iterates over pairs (path, field) in a DFS order."""
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def get_fields(self, path):
+        """Returns a tuple of the fields which values are at ``path``.
+
+        :param str path: A JSON Pointer.
+        """
+        return tuple(self._fields_by_path.get(path, ()))
+
+    def get_paths(self, field):
+        """Returns a tuple of the paths at which ``field`` is used.
+
+        :param field: A field.
+        :type field: :class:`.BaseField`
+        """
+        return tuple(self._paths_by_field.get(field, ()))
+
+    def get_by_type(self, field_type):
+        """Returns a tuple of pairs (path, field) of the fields that are instances
+        of ``field_type`` (e.g., :class:`.StringField` matches :class:`.EmailField` s too)
+        in a DFS order. The result is cached.
+
+        :param field_type: A field class or a tuple of field classes.
+        """
+        items = self._items_by_type.get(field_type)
+        if items is None:
+            items = []
+            for exact_type, exact_type_items in iteritems(self._items_by_exact_type):
+                if issubclass(exact_type, field_type):
+                    items.extend(exact_type_items)
+            items.sort(key=self._positions.__getitem__)
+            items = self._items_by_type[field_type] = tuple(items)
+        return items
+
+
+def _iter_resolved(values, role):
+    for value in values:
+        if isinstance(value, Resolvable):
+            field, field_role = value.resolve(role)
+            if isinstance(field, BaseField):
+                yield field, field_role
+
+
+def _iter_document_children(document_cls, role, path, documents):
+    documents = documents | frozenset([document_cls])
+    backend = document_cls._backend
+    for child in _iter_children(backend, role, path, documents):
+        yield child
+    for parent_document in document_cls._parent_documents:
+        if parent_document not in documents:
+            for child in _iter_document_children(parent_document, role, path, documents):
+                yield child
+
+
+def _iter_children(field, role, path, documents):
+    """Yields tuples (field, role, path, documents) of the fields nested
+    in ``field``, where ``documents`` are the documents on the way to them.
+    """
+    if isinstance(field, DocumentField):
+        document_cls = field.document_cls
+        if document_cls not in documents:
+            for child in _iter_document_children(
+                    document_cls, field.get_nested_role(role), path, documents):
+                yield child
+    elif isinstance(field, DictField):
+        properties, properties_role = field.resolve_attr('properties', role)
+        for prop, value in iteritems(properties or {}):
+            for prop_field, prop_field_role in _iter_resolved([value], properties_role):
+                key = field._get_property_key(prop, prop_field)
+                yield prop_field, prop_field_role, _join(path, key), documents
+        pattern_properties, pattern_properties_role = \
+            field.resolve_attr('pattern_properties', role)
+        for prop_field, prop_field_role in _iter_resolved(
+                (pattern_properties or {}).values(), pattern_properties_role):
+            yield prop_field, prop_field_role, _join(path, _ANY), documents
+        additional_properties, additional_properties_role = \
+            field.resolve_attr('additional_properties', role)
+        if isinstance(additional_properties, BaseField):
+            yield additional_properties, additional_properties_role, _join(path, _ANY), documents
+    elif isinstance(field, ArrayField):
+        items, items_role = field.resolve_attr('items', role)
+        if isinstance(items, (list, tuple)):
+            # the indexes of the items are their positions in the schema
+            i = 0
+            for item in items:
+                for item_field, item_field_role in _iter_resolved([item], items_role):
+                    yield item_field, item_field_role, _join(path, str(i)), documents
+                    i += 1
+        elif isinstance(items, BaseField):
+            yield items, items_role, _join(path, _ANY), documents
+        additional_items, additional_items_role = field.resolve_attr('additional_items', role)
+        if isinstance(additional_items, BaseField):
+            yield additional_items, additional_items_role, _join(path, _ANY), documents
+    elif isinstance(field, BaseOfField):
+        fields, fields_role = field.resolve_attr('fields', role)
+        for nested_field, nested_field_role in _iter_resolved(fields or (), fields_role):
+            yield nested_field, nested_field_role, path, documents
+    elif isinstance(field, NotField):
+        nested_field, nested_field_role = field.resolve_attr('field', role)
+        if isinstance(nested_field, BaseField):
+            yield nested_field, nested_field_role, path, documents
+
+
+def compile_field_index(field_or_document, role=DEFAULT_ROLE):
+    """Indexes the fields of a document or a field resolved for ``role``, including
+    the fields of nested documents. The fields of a document are indexed without
+    the document itself, the fields of a field are indexed with the field at the path ``""``.
+
+    :param field_or_document: A field or a document.
+    :type field_or_document: :class:`.BaseField` or subclass of :class:`.Document`
+    :param str role: A role.
+    :rtype: :class:`FieldIndex`
+    """
+    if isinstance(field_or_document, type) and issubclass(field_or_document, Document):
+        roots = _iter_document_children(field_or_document, role, u'', frozenset())
+    else:
+        roots = [(field_or_document, role, u'', frozenset())]
+    items = []
+    # an explicit stack of iterators, like in BaseField.walk
+    stack = [iter(roots)]
+    push = stack.append
+    pop = stack.pop
+    while stack:
+        for field, field_role, path, documents in stack[-1]:
+            items.append((path, field))
+            push(_iter_children(field, field_role, path, documents))
+            break
+        else:
+            pop()
+    return FieldIndex(items)
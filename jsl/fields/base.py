@@ -130,11 +130,35 @@ class BaseField(Resolvable):
             recursion when ``through_document_field`` is ``True``.
         :returns: iterable of :class:`.BaseField`
         """
-        yield self
-        for field in self.iter_fields():
-            for field_ in field.walk(through_document_fields=through_document_fields,
-                                     visited_documents=visited_documents):
-                yield field_
+        # an explicit stack of iterators instead of nested generators: every field
+        # is yielded once rather than through all its ancestors, and deep trees do
+        # not hit the recursion limit. A document is visited while the fields
+        # nested in it are walked, so that every branch that refers to it
+        # descends into it, but a document never descends into itself
+        visited_documents = set(visited_documents)
+        stack = [(None, iter((self,)))]
+        push = stack.append
+        pop = stack.pop
+        while stack:
+            for field in stack[-1][1]:
+                yield field
+                document_cls, children = field._iter_walk_children(
+                    through_document_fields, visited_documents)
+                if document_cls is not None:
+                    visited_documents.add(document_cls)
+                push((document_cls, children))
+                break
+            else:
+                document_cls = pop()[0]
+                if document_cls is not None:
+                    visited_documents.discard(document_cls)
+
+    def _iter_walk_children(self, through_document_fields, visited_documents):
+        """Returns a pair (document, fields): the fields :meth:`walk` descends into
+        after yielding this field and the document they belong to, which is
+        visited while they are walked, or ``None``.
+        """
+        return None, self.iter_fields()
 
     def resolve_and_iter_fields(self, role=DEFAULT_ROLE):
         """The same as :meth:`.iter_fields`, but :class:`resolvables <.Resolvable>`
@@ -147,13 +171,30 @@ class BaseField(Resolvable):
         """The same as :meth:`.walk`, but :class:`resolvables <.Resolvable>` are
         resolved using ``role``.
         """
-        yield self
-        for field in self.resolve_and_iter_fields(role=role):
-            field, field_role = field.resolve(role)
-            for field_ in field.resolve_and_walk(role=field_role,
-                                                 through_document_fields=through_document_fields,
-                                                 visited_documents=visited_documents):
-                yield field_
+        visited_documents = set(visited_documents)
+        stack = [(None, iter(((self, role),)))]
+        push = stack.append
+        pop = stack.pop
+        while stack:
+            for field, field_role in stack[-1][1]:
+                yield field
+                document_cls, children = field._resolve_and_iter_walk_children(
+                    field_role, through_document_fields, visited_documents)
+                if document_cls is not None:
+                    visited_documents.add(document_cls)
+                push((document_cls, children))
+                break
+            else:
+                document_cls = pop()[0]
+                if document_cls is not None:
+                    visited_documents.discard(document_cls)
+
+    def _resolve_and_iter_walk_children(self, role, through_document_fields,
+                                        visited_documents):
+        """Returns a pair (document, pairs (field, role)) :meth:`resolve_and_walk`
+        descends into after yielding this field (see :meth:`_iter_walk_children`).
+        """
+        return None, (field.resolve(role) for field in self.resolve_and_iter_fields(role=role))
 
     def get_schema(self, ordered=False, role=DEFAULT_ROLE):
         """Returns a JSON schema (draft v4) of the field.
@@ -477,40 +477,47 @@ class DocumentField(BaseField):
         #: A :class:`.Document` this field is attached to.
         self.owner_cls = None
         self.as_ref = as_ref  #:
+        # a tuple (registry version, owner_cls, document) of the last lookup
+        # of a string reference in the registry
+        self._resolved = None
         super(DocumentField, self).__init__(**kwargs)
 
+    def __getstate__(self):
+        # registry versions are meaningless in other processes
+        state = self.__dict__.copy()
+        state['_resolved'] = None
+        return state
+
+    def get_nested_role(self, role):
+        """Returns a role the document is resolved for when the field is resolved
+        for ``role``: ``role`` itself if the owner document propagates it (see
+        the ``roles_to_propagate`` option) or the field is not attached to a document,
+        :data:`.DEFAULT_ROLE` otherwise.
+        """
+        if self.owner_cls and not self.owner_cls._options.roles_to_propagate(role):
+            return DEFAULT_ROLE
+        return role
+
     def iter_fields(self):
         return self.document_cls.iter_fields()
 
-    def walk(self, through_document_fields=False, visited_documents=frozenset()):
-        yield self
+    def _iter_walk_children(self, through_document_fields, visited_documents):
         if through_document_fields:
             document_cls = self.document_cls
             if document_cls not in visited_documents:
-                visited_documents = visited_documents | set([document_cls])
-                for field in document_cls.walk(
-                        through_document_fields=through_document_fields,
-                        visited_documents=visited_documents):
-                    yield field
+                return document_cls, document_cls._backend._iter_walk_children(
+                    through_document_fields, visited_documents)[1]
+        return None, ()
 
-    def resolve_and_walk(self, role=DEFAULT_ROLE, through_document_fields=False,
-                         visited_documents=frozenset()):
-        yield self
+    def _resolve_and_iter_walk_children(self, role, through_document_fields,
+                                        visited_documents):
         if through_document_fields:
             document_cls = self.document_cls
-            new_role = DEFAULT_ROLE
-            if self.owner_cls:
-                if self.owner_cls._options.roles_to_propagate(role):
-                    new_role = role
-            else:
-                new_role = role
+            new_role = self.get_nested_role(role)
             if document_cls not in visited_documents:
-                visited_documents = visited_documents | set([document_cls])
-                for field in document_cls.resolve_and_walk(
-                        role=new_role,
-                        through_document_fields=through_document_fields,
-                        visited_documents=visited_documents):
-                    yield field
+                return document_cls, document_cls._backend._resolve_and_iter_walk_children(
+                    new_role, through_document_fields, visited_documents)[1]
+        return None, ()
 
     def _get_definitions_and_schema(self, role=DEFAULT_ROLE, res_scope=EMPTY_SCOPE,
                                     ordered=False, ref_documents=None):
@@ -519,12 +526,7 @@ class DocumentField(BaseField):
         if ref_documents and document_cls in ref_documents:
             return {}, res_scope.create_ref(definition_id)
         else:
-            new_role = DEFAULT_ROLE
-            if self.owner_cls:
-                if self.owner_cls._options.roles_to_propagate(role):
-                    new_role = role
-            else:
-                new_role = role
+            new_role = self.get_nested_role(role)
             document_definitions, document_schema = document_cls.get_definitions_and_schema(
                 role=new_role, res_scope=res_scope, ordered=ordered, ref_documents=ref_documents)
             if self.as_ref and not document_cls.is_recursive(role=new_role):
@@ -543,13 +545,24 @@ class DocumentField(BaseField):
                     raise ValueError('owner_cls is not set')
                 document_cls = self.owner_cls
             else:
+                # string references are looked up in the registry of the owner
+                if self.owner_cls is None:
+                    document_registry = registry.DEFAULT_REGISTRY
+                else:
+                    document_registry = self.owner_cls._options.registry
+                version = document_registry.get_version()
+                resolved = self._resolved
+                if (resolved is not None and resolved[0] == version and
+                        resolved[1] is self.owner_cls):
+                    return resolved[2]
                 try:
-                    document_cls = registry.get_document(document_cls)
+                    document_cls = document_registry.get_document(document_cls)
                 except KeyError:
                     if self.owner_cls is None:
                         raise ValueError('owner_cls is not set')
-                    document_cls = registry.get_document(document_cls,
-                                                         module=self.owner_cls.__module__)
+                    document_cls = document_registry.get_document(
+                        document_cls, module=self.owner_cls.__module__)
+                self._resolved = (version, self.owner_cls, document_cls)
         return document_cls
 
 
@@ -573,6 +586,3 @@ class RefField(BaseField):
             if not isinstance(pointer, string_types):
                 raise SchemaGenerationException(u'{0} is not a string.'.format(pointer))
         return {}, {'$ref': pointer}
-
-    def walk(self, through_document_fields=False, visited_documents=frozenset()):
-        yield self
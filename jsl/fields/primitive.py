@@ -2,6 +2,7 @@
 from ..roles import DEFAULT_ROLE
 from ..resolutionscope import EMPTY_SCOPE
 from .._compat import OrderedDict
+from ..formats import get_format_checker
 from .base import BaseSchemaField
 from .util import validate, validate_regex
 
@@ -71,6 +72,16 @@ class StringField(BaseSchemaField):
             schema['format'] = format
         return {}, schema
 
+    def get_format_checker(self, role=DEFAULT_ROLE):
+        """Returns a checker for the resolved value of :attr:`format`
+        or ``None`` if the format is not set or no checker is registered for it
+        (see :func:`.register_format_checker`).
+        """
+        format = self.resolve_attr('format', role).value
+        if format is None:
+            return None
+        return get_format_checker(format)
+
 
 class EmailField(StringField):
     """An email field."""
@@ -0,0 +1,137 @@
+# coding: utf-8
+"""
+Checkers for the values of the ``"format"`` keyword.
+
+A checker is a callable that accepts a string and returns ``True`` if the string
+conforms to the format. The built-in checkers only use patterns that do not
+backtrack and do not split values into intermediate strings.
+"""
+import re
+
+from ._compat import string_types
+
+
+__all__ = [
+    'check_email', 'check_ipv4', 'check_date_time', 'check_uri', 'parse_date_time',
+    'register_format_checker', 'unregister_format_checker', 'get_format_checker',
+]
+
+_DAYS_IN_MONTH = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# Every token of the pattern has either a fixed width or is terminated by a character
+# that can not occur within it, so matching never backtracks.
+_DATE_TIME = re.compile(
+    r'([0-9]{4})-([0-9]{2})-([0-9]{2})[Tt]([0-9]{2}):([0-9]{2}):([0-9]{2})'
+    r'(?:\.([0-9]+))?(?:[Zz]|([+-])([0-9]{2}):([0-9]{2}))\Z')
+# Alternatives of an octet are ordered from the longest, so a mismatch is detected
+# within at most three characters.
+_IPV4_OCTET = r'(?:25[0-5]|2[0-4][0-9]|1[0-9]{2}|[1-9][0-9]|[0-9])'
+_IPV4 = re.compile(r'{0}\.{0}\.{0}\.{0}\Z'.format(_IPV4_OCTET))
+_URI_SCHEME = re.compile(r'[a-zA-Z][a-zA-Z0-9+\-.]*:')
+_URI_FORBIDDEN_CHAR = re.compile(u'[\x00-\x20"<>\\\\^`{|}\x7f]')
+_WHITESPACE = re.compile(r'\s')
+
+
+def parse_date_time(value):
+    """Parses an :rfc:`3339` date-time (a profile of ISO 8601).
+
+    :param str value: A string to parse.
+    :returns:
+        ``None`` if ``value`` is not a valid date-time, otherwise a tuple of
+        ``(year, month, day, hour, minute, second, microsecond, utc_offset)``,
+        where ``utc_offset`` is an offset from UTC in minutes.
+    """
+    match = _DATE_TIME.match(value)
+    if match is None:
+        return None
+    (year, month, day, hour, minute, second,
+     fraction, sign, offset_hour, offset_minute) = match.groups()
+    year = int(year)
+    month = int(month)
+    day = int(day)
+    hour = int(hour)
+    minute = int(minute)
+    second = int(second)
+    if (not 1 <= month <= 12 or not 1 <= day <= _DAYS_IN_MONTH[month] or
+            hour > 23 or minute > 59 or second > 60):
+        return None
+    if month == 2 and day == 29 and not (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)):
+        return None
+    microsecond = 0
+    if fraction is not None:
+        # only the first six digits are significant
+        microsecond = int(fraction[:6].ljust(6, '0'))
+    utc_offset = 0
+    if sign is not None:
+        offset_hour = int(offset_hour)
+        offset_minute = int(offset_minute)
+        if offset_hour > 23 or offset_minute > 59:
+            return None
+        utc_offset = offset_hour * 60 + offset_minute
+        if sign == '-':
+            utc_offset = -utc_offset
+    return year, month, day, hour, minute, second, microsecond, utc_offset
+
+
+def check_date_time(value):
+    """Checks that ``value`` is an :rfc:`3339` date-time."""
+    return parse_date_time(value) is not None
+
+
+def check_ipv4(value):
+    """Checks that ``value`` is an IPv4 address in dotted-quad notation.
+    Octets with leading zeros are rejected.
+    """
+    return _IPV4.match(value) is not None
+
+
+def check_email(value):
+    """Checks that ``value`` looks like an email address: a non-empty local
+    part and a non-empty domain separated by ``@``, without whitespace.
+    """
+    at = value.rfind('@')
+    return 0 < at < len(value) - 1 and _WHITESPACE.search(value) is None
+
+
+def check_uri(value):
+    """Checks that ``value`` is an absolute URI: a scheme (a letter followed by
+    letters, digits, ``+``, ``-`` or ``.``), a colon and the rest containing no
+    characters that are not allowed to appear in a URI.
+    """
+    match = _URI_SCHEME.match(value)
+    return match is not None and _URI_FORBIDDEN_CHAR.search(value, match.end()) is None
+
+
+_format_checkers = {
+    'date-time': check_date_time,
+    'email': check_email,
+    'ipv4': check_ipv4,
+    'uri': check_uri,
+}
+
+
+def register_format_checker(format, checker):
+    """Registers ``checker`` for the ``format``. Replaces the checker
+    previously registered for the same format, including the built-in ones.
+
+    :param str format: A value of the ``format`` argument of :class:`.StringField`.
+    :param checker: A callable that accepts a string and returns a boolean.
+    """
+    if not isinstance(format, string_types):
+        raise TypeError('format must be a string, not {0!r}'.format(format))
+    if not callable(checker):
+        raise TypeError('{0!r} is not callable'.format(checker))
+    _format_checkers[format] = checker
+
+
+def unregister_format_checker(format):
+    """Removes a checker registered for the ``format``.
+
+    :raises: :class:`KeyError`
+    """
+    del _format_checkers[format]
+
+
+def get_format_checker(format):
+    """Returns a checker registered for the ``format`` or ``None``."""
+    return _format_checkers.get(format)
@@ -0,0 +1,227 @@
+# coding: utf-8
+"""
+A graph of references between documents: a document depends on the documents
+its :class:`.DocumentField` s point to (in any of the roles) and on its parent
+documents, since their schemas are parts of its schema.
+
+:func:`get_graph` returns the graph of the documents of a registry. It is kept
+up to date with the registry: after a change only the new documents, the
+documents which references have not resolved yet and the dependents of the
+removed or replaced documents are examined again.
+"""
+import weakref
+
+from .registry import DEFAULT_REGISTRY
+from .document import Document
+from .fields import DocumentField
+
+
+__all__ = ['DocumentGraph', 'get_graph', 'resolve_all_references']
+
+
+def _iter_references(document_cls):
+    """Yields pairs (field, document) of the :class:`.DocumentField` s of ``document_cls``
+    in any of the roles, where the document is ``None`` if the reference is dangling.
+    """
+    for field in document_cls.walk():
+        if isinstance(field, DocumentField):
+            try:
+                yield field, field.document_cls
+            except (KeyError, ValueError):
+                yield field, None
+
+
+def _get_references(document_cls):
+    """Returns a pair of sets: the documents ``document_cls`` refers to and
+    the names of the documents which can not be resolved through the registry.
+    """
+    references = set(document_cls._parent_documents)
+    unresolved = set()
+    for field, target in _iter_references(document_cls):
+        if target is None:
+            unresolved.add(field._document_cls)
+        else:
+            references.add(target)
+    references.discard(document_cls)
+    return references, unresolved
+
+
+def _iter_registered_documents(registry):
+    for document_cls in registry.iter_documents():
+        if isinstance(document_cls, type) and issubclass(document_cls, Document):
+            yield document_cls
+
+
+def resolve_all_references(documents=None, registry=None):
+    """Resolves the references of the :class:`.DocumentField` s of ``documents``
+    (by default, all the documents of ``registry``) in any of the roles, so that the
+    resolved documents are cached in the fields until the registry changes.
+
+    :param documents: An iterable of documents.
+    :param registry: A registry, :data:`~jsl.registry.DEFAULT_REGISTRY` by default.
+    :type registry: :class:`.Registry`
+    :returns:
+        a list of pairs (document, field) of the fields which references
+        can not be resolved, empty if all of them are resolved
+    """
+    if documents is None:
+        documents = list(_iter_registered_documents(registry or DEFAULT_REGISTRY))
+    dangling = []
+    for document_cls in documents:
+        for field, target in _iter_references(document_cls):
+            if target is None:
+                dangling.append((document_cls, field))
+    return dangling
+
+
+class DocumentGraph(object):
+    """A graph of references between documents.
+
+    :param documents: An iterable of documents to add to the graph.
+    :param bool weak:
+        If ``True``, the graph does not keep its documents alive: a document
+        is removed from the graph as soon as it's garbage collected.
+    """
+
+    def __init__(self, documents=(), weak=False):
+        self._mapping = weakref.WeakKeyDictionary if weak else dict
+        self._dependencies = self._mapping()
+        # the reverse index: documents -> mappings which keys are the graph documents
+        # that refer to them (used as sets, since there are no weak sets in Python 2.6)
+        self._dependents = self._mapping()
+        #: A dictionary mapping the documents that have unresolved string references
+        #: to sets of the unresolved names.
+        self.unresolved = self._mapping()
+        for document_cls in documents:
+            self.add(document_cls)
+
+    def __contains__(self, document_cls):
+        return document_cls in self._dependencies
+
+    def __iter__(self):
+        return iter(self._dependencies)
+
+    def __len__(self):
+        return len(self._dependencies)
+
+    def add(self, document_cls):
+        """Adds ``document_cls`` to the graph or updates its references if
+        it's already added.
+        """
+        if document_cls in self._dependencies:
+            self.remove(document_cls)
+        references, unresolved = _get_references(document_cls)
+        self._dependencies[document_cls] = frozenset(references)
+        for reference in references:
+            dependents = self._dependents.get(reference)
+            if dependents is None:
+                dependents = self._dependents[reference] = self._mapping()
+            dependents[document_cls] = True
+        if unresolved:
+            self.unresolved[document_cls] = unresolved
+
+    def remove(self, document_cls):
+        """Removes ``document_cls`` from the graph. The references of the other
+        documents to it are kept.
+        """
+        for reference in self._dependencies.pop(document_cls):
+            dependents = self._dependents[reference]
+            dependents.pop(document_cls, None)
+            if not dependents:
+                del self._dependents[reference]
+        self.unresolved.pop(document_cls, None)
+
+    def get_dependencies(self, document_cls, transitive=False):
+        """Returns a frozenset of the documents ``document_cls`` refers to.
+
+        :param bool transitive:
+            If ``True``, the documents they refer to are included and so on.
+        """
+        if not transitive:
+            return self._dependencies.get(document_cls, frozenset())
+        return self._traverse(document_cls, self._dependencies)
+
+    def get_dependents(self, document_cls, transitive=False):
+        """Returns a frozenset of the documents of the graph that refer to ``document_cls``.
+
+        :param bool transitive:
+            If ``True``, the documents that refer to them are included and so on.
+        """
+        if not transitive:
+            return frozenset(self._dependents.get(document_cls, ()))
+        return self._traverse(document_cls, self._dependents)
+
+    def _traverse(self, document_cls, edges):
+        rv = set()
+        stack = [document_cls]
+        while stack:
+            for next_document_cls in edges.get(stack.pop(), ()):
+                if next_document_cls not in rv:
+                    rv.add(next_document_cls)
+                    stack.append(next_document_cls)
+        rv.discard(document_cls)
+        return frozenset(rv)
+
+    def topological_order(self, documents=None):
+        """Returns a list of ``documents`` (by default, all the graph documents)
+        in which every document follows the documents it refers to.
+        The documents of a reference cycle are listed in an arbitrary order.
+
+        :param documents: An iterable of documents of the graph.
+        """
+        if documents is None:
+            documents = sorted(self._dependencies, key=lambda d: d.get_definition_id())
+        else:
+            documents = list(documents)
+        included = set(documents)
+        dependencies = self._dependencies
+        rv = []
+        visited = set()
+        for document_cls in documents:
+            if document_cls in visited:
+                continue
+            visited.add(document_cls)
+            # an iterative DFS that lists documents in post-order
+            stack = [(document_cls, iter(dependencies.get(document_cls, ())))]
+            while stack:
+                current, references = stack[-1]
+                for reference in references:
+                    if reference in included and reference not in visited:
+                        visited.add(reference)
+                        stack.append((reference, iter(dependencies.get(reference, ()))))
+                        break
+                else:
+                    stack.pop()
+                    rv.append(current)
+        return rv
+
+
+def get_graph(registry=None):
+    """Returns a :class:`DocumentGraph` of the documents of ``registry``.
+    The graph is stored in the registry cache.
+
+    :param registry: A registry, :data:`~jsl.registry.DEFAULT_REGISTRY` by default.
+    :type registry: :class:`.Registry`
+    :rtype: :class:`DocumentGraph`
+    """
+    if registry is None:
+        registry = DEFAULT_REGISTRY
+    version = registry.get_version()
+    graph_version, graph = registry.cache.get('graph', (None, None))
+    if graph is None:
+        graph = DocumentGraph(weak=registry.weak)
+    elif graph_version == version:
+        return graph
+    documents = set(_iter_registered_documents(registry))
+    removed = [d for d in graph if d not in documents]
+    to_update = set(d for d in documents if d not in graph)
+    # string references may resolve to the new documents now
+    to_update.update(graph.unresolved)
+    for document_cls in removed:
+        to_update.update(graph.get_dependents(document_cls))
+        graph.remove(document_cls)
+    for document_cls in to_update:
+        if document_cls in documents:
+            graph.add(document_cls)
+    registry.cache['graph'] = (version, graph)
+    return graph
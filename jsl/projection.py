@@ -0,0 +1,247 @@
+# coding: utf-8
+"""
+Projection of instances onto roles: removing the keys of the fields
+that do not resolve for a role.
+
+A document is compiled for a role into frozen sets of allowed keys, so
+projecting an object costs one dict comprehension plus the nested objects.
+"""
+import re
+
+from .document import Document
+from .exceptions import processing, DocumentStep, AttributeStep, ItemStep
+from .fields import ArrayField, DictField, DocumentField, BaseField
+from .roles import DEFAULT_ROLE, Resolvable
+from ._compat import iteritems
+
+
+__all__ = ['compile_projection']
+
+
+class _Projection(object):
+    def project(self, value):  # pragma: no cover
+        """Returns a projected copy of ``value``. Values that are not of
+        the expected types are returned as they are.
+        """
+        raise NotImplementedError
+
+    def project_many(self, values):
+        """Projects every value of the iterable ``values``.
+
+        :rtype: list
+        """
+        project = self.project
+        return [project(value) for value in values]
+
+
+class _ObjectProjection(_Projection):
+    def __init__(self, keys, hidden_keys, patterns, additional_properties, nested):
+        #: A frozenset of the keys of the fields resolved for the role.
+        self.keys = keys
+        #: A frozenset of the keys of the fields that are not resolved for the role.
+        self.hidden_keys = hidden_keys
+        #: A tuple of compiled regular expressions of pattern properties.
+        self.patterns = patterns
+        #: Whether the keys of undeclared properties are kept.
+        self.additional_properties = additional_properties
+        #: A tuple of pairs (key, projection) of the properties to descend into.
+        self.nested = nested
+
+    def _is_allowed(self, key):
+        if key in self.keys:
+            return True
+        if key in self.hidden_keys:
+            return False
+        for pattern in self.patterns:
+            if pattern.search(key) is not None:
+                return True
+        return self.additional_properties
+
+    def project(self, value):
+        if not isinstance(value, dict):
+            return value
+        if self.patterns:
+            is_allowed = self._is_allowed
+            rv = dict((k, v) for k, v in iteritems(value) if is_allowed(k))
+        elif self.additional_properties:
+            hidden_keys = self.hidden_keys
+            rv = dict((k, v) for k, v in iteritems(value) if k not in hidden_keys)
+        else:
+            keys = self.keys
+            rv = dict((k, v) for k, v in iteritems(value) if k in keys)
+        for key, projection in self.nested:
+            if key in rv:
+                rv[key] = projection.project(rv[key])
+        return rv
+
+
+class _ArrayProjection(_Projection):
+    def __init__(self, items):
+        #: A projection of all the items or a tuple of projections
+        #: (``None`` for the items that are kept as they are).
+        self.items = items
+
+    def project(self, value):
+        if not isinstance(value, list):
+            return value
+        items = self.items
+        if isinstance(items, tuple):
+            rv = list(value)
+            for i, projection in enumerate(items[:len(rv)]):
+                if projection is not None:
+                    rv[i] = projection.project(rv[i])
+            return rv
+        project = items.project
+        return [project(item) for item in value]
+
+
+def _merge(contents, parent):
+    """Merges the object projection of a parent document into ``contents``,
+    since an instance of a document with parents may contain the parents' keys.
+    """
+    return _ObjectProjection(
+        keys=contents.keys | parent.keys,
+        hidden_keys=(contents.hidden_keys | parent.hidden_keys) -
+                    (contents.keys | parent.keys),
+        patterns=contents.patterns + parent.patterns,
+        additional_properties=(contents.additional_properties or
+                               parent.additional_properties),
+        nested=contents.nested + tuple(
+            (key, p) for key, p in parent.nested
+            if key not in dict(contents.nested)),
+    )
+
+
+class _DocumentProjection(_Projection):
+    def __init__(self, document_cls):
+        self.document_cls = document_cls
+        #: A projection of the document's own fields. Set after the projection
+        #: is created to allow recursive references.
+        self.contents = None
+        #: A tuple of the projections of the parent documents.
+        self.parents = ()
+        self._projection = None
+
+    @property
+    def projection(self):
+        """A projection of the document contents. The parents are merged on
+        first use, when all of them are compiled: a parent may refer to
+        the document itself.
+        """
+        if self._projection is None:
+            contents = self.contents
+            for parent in self.parents:
+                contents = _merge(contents, parent.projection)
+            self._projection = contents
+        return self._projection
+
+    def project(self, value):
+        return self.projection.project(value)
+
+
+class _Compiler(object):
+    """Compiles fields and documents into projections. Returns ``None`` for
+    the fields which values are kept as they are.
+    """
+
+    def __init__(self):
+        self._document_projections = {}
+
+    def compile_document(self, document_cls, role):
+        key = (document_cls, role)
+        projection = self._document_projections.get(key)
+        if projection is not None:
+            return projection
+        projection = self._document_projections[key] = _DocumentProjection(document_cls)
+        with processing(DocumentStep(document_cls, role=role)):
+            projection.contents = self._compile_dict_field(document_cls._backend, role)
+        projection.parents = tuple(self.compile_document(parent_document, role)
+                                   for parent_document in document_cls._parent_documents)
+        return projection
+
+    def compile_field(self, field, role):
+        if isinstance(field, DocumentField):
+            return self.compile_document(field.document_cls, field.get_nested_role(role))
+        elif isinstance(field, DictField):
+            return self._compile_dict_field(field, role)
+        elif isinstance(field, ArrayField):
+            return self._compile_array_field(field, role)
+        return None
+
+    def _compile_dict_field(self, field, role):
+        keys = set()
+        hidden_keys = set()
+        nested = []
+        properties, properties_role = field.resolve_attr('properties', role)
+        with processing(AttributeStep('properties', role=role)):
+            for prop, prop_field in iteritems(properties or {}):
+                with processing(ItemStep(prop, role=properties_role)):
+                    if not isinstance(prop_field, Resolvable):
+                        continue
+                    resolved_field, prop_field_role = prop_field.resolve(properties_role)
+                    if resolved_field is None:
+                        # the key of a field is its name in any of the roles
+                        for possible_field in prop_field.iter_possible_values():
+                            if isinstance(possible_field, BaseField):
+                                hidden_keys.add(field._get_property_key(prop, possible_field))
+                        continue
+                    key = field._get_property_key(prop, resolved_field)
+                    keys.add(key)
+                    projection = self.compile_field(resolved_field, prop_field_role)
+                    if projection is not None:
+                        nested.append((key, projection))
+
+        pattern_properties = field.resolve_attr('pattern_properties', role).value
+        patterns = tuple(re.compile(pattern) for pattern in pattern_properties or ())
+        additional_properties = field.resolve_attr('additional_properties', role).value
+        return _ObjectProjection(
+            keys=frozenset(keys),
+            hidden_keys=frozenset(hidden_keys - keys),
+            patterns=patterns,
+            additional_properties=(additional_properties is None or
+                                   isinstance(additional_properties, BaseField) or
+                                   bool(additional_properties)),
+            nested=tuple(nested),
+        )
+
+    def _compile_array_field(self, field, role):
+        items, items_role = field.resolve_attr('items', role)
+        if isinstance(items, (list, tuple)):
+            projections = []
+            for item in items:
+                if not isinstance(item, Resolvable):
+                    continue
+                item, item_role = item.resolve(items_role)
+                # unresolved items are not present in the schema
+                if item is not None:
+                    projections.append(self.compile_field(item, item_role))
+            if not any(projection is not None for projection in projections):
+                return None
+            return _ArrayProjection(tuple(projections))
+        elif isinstance(items, Resolvable):
+            projection = self.compile_field(items, items_role)
+            if projection is not None:
+                return _ArrayProjection(projection)
+        return None
+
+
+def compile_projection(field_or_document, role=DEFAULT_ROLE):
+    """Compiles a projection of instances onto ``role``.
+
+    :param field_or_document: A field or a document.
+    :type field_or_document: :class:`.BaseField` or subclass of :class:`.Document`
+    :param str role: A role.
+    :raises: :class:`.SchemaGenerationException`
+    :returns:
+        an object with the ``project(instance)`` method that returns a copy of
+        ``instance`` without the keys of the fields not resolved for ``role``,
+        and the ``project_many(instances)`` method that projects every instance
+        of an iterable
+    """
+    compiler = _Compiler()
+    if isinstance(field_or_document, type) and issubclass(field_or_document, Document):
+        return compiler.compile_document(field_or_document, role)
+    projection = compiler.compile_field(field_or_document, role)
+    if projection is None:
+        raise TypeError(u'{0!r} can not be projected'.format(field_or_document))
+    return projection
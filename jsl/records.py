@@ -0,0 +1,242 @@
+# coding: utf-8
+"""
+Record classes: lightweight Python objects that hold instances of documents.
+
+A record class is generated for a document and a role. It has an attribute
+(a slot) for every field of the document resolved for the role, and
+:meth:`~.Record.from_dict` and :meth:`~.Record.to_dict` methods generated
+for its fields, so that converting an instance does not involve looking up
+fields or their types.
+"""
+import keyword
+import re
+
+from .document import Document
+from .fields import ArrayField, BaseField, DocumentField
+from .roles import DEFAULT_ROLE
+from ._compat import iteritems
+
+
+__all__ = ['Record', 'compile_record_class']
+
+_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*\Z')
+
+
+class Record(object):
+    """A base class of record classes.
+    Use :func:`compile_record_class` or :meth:`.Document.record_class` to create one.
+    """
+
+    __slots__ = ()
+
+    # the names start with an underscore not to clash with the attributes
+    #: A document the record class is generated for.
+    _document_cls = None
+    #: A role the record class is generated for.
+    _role = DEFAULT_ROLE
+    #: A tuple of the attribute names.
+    _fields = ()
+    #: A source code of the generated methods.
+    _source = ''
+
+    def __init__(self, **kwargs):
+        for name in self._fields:
+            setattr(self, name, kwargs.pop(name, None))
+        if kwargs:
+            raise TypeError(u'Unexpected keyword arguments: {0}'.format(
+                u', '.join(sorted(kwargs))))
+
+    @classmethod
+    def from_dict(cls, data):  # pragma: no cover
+        """Creates a record from a valid instance of the document.
+        Attributes of the missing keys are set to ``None``.
+
+        :param dict data: An instance.
+        """
+        raise NotImplementedError
+
+    def to_dict(self):  # pragma: no cover
+        """Returns an instance of the document. The keys of the attributes
+        that are ``None`` are omitted.
+
+        :rtype: dict
+        """
+        raise NotImplementedError
+
+    def __reduce__(self):
+        # record classes are not importable, so they are pickled as
+        # the documents and roles they are generated for
+        return _restore_record, (self._document_cls, self._role,
+                                 tuple(getattr(self, name) for name in self._fields))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self._fields)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__, ', '.join(
+            '{0}={1!r}'.format(name, getattr(self, name)) for name in self._fields))
+
+
+def _restore_record(document_cls, role, values):
+    record_cls = document_cls.record_class(role=role)
+    record = object.__new__(record_cls)
+    for name, value in zip(record_cls._fields, values):
+        setattr(record, name, value)
+    return record
+
+
+class _Generator(object):
+    """Generates record classes of documents and their nested documents."""
+
+    def __init__(self):
+        self._classes = {}
+        self._pending = []
+
+    def get_class(self, document_cls, role):
+        key = (document_cls, role)
+        record_cls = self._classes.get(key)
+        if record_cls is None:
+            record_cls = document_cls._cache.get(('record_class', role))
+            if record_cls is not None:
+                return record_cls
+            properties = self._collect_properties(document_cls, role)
+            names = tuple(name for name, _, _, _ in properties)
+            record_cls = self._classes[key] = type(
+                '{0}Record'.format(document_cls.__name__), (Record,), {
+                    '__slots__': names,
+                    '__module__': document_cls.__module__,
+                    '_document_cls': document_cls,
+                    '_role': role,
+                    '_fields': names,
+                })
+            # the methods are generated after all the nested classes are created,
+            # since the documents may refer to each other
+            self._pending.append((record_cls, properties))
+        return record_cls
+
+    def generate(self, document_cls, role):
+        record_cls = self.get_class(document_cls, role)
+        while self._pending:
+            self._generate_methods(*self._pending.pop())
+        # the classes are shared only when all of them are complete
+        for (document, document_role), record in iteritems(self._classes):
+            document._cache[('record_class', document_role)] = record
+        return record_cls
+
+    def _collect_properties(self, document_cls, role):
+        """Returns a list of tuples (attribute name, key, field, field role)."""
+        properties = []
+        names = set()
+        # the document and its ancestors (in depth-first order), which schemas
+        # are combined with ``allOf``
+        documents = []
+        stack = [document_cls]
+        while stack:
+            document = stack.pop()
+            if document not in documents:
+                documents.append(document)
+                stack.extend(reversed(document._parent_documents))
+        for document in documents:
+            backend = document._backend
+            for name, prop in iteritems(backend.properties):
+                if name in names:
+                    continue
+                field, field_role = prop.resolve(role)
+                if not isinstance(field, BaseField):
+                    continue
+                if (not _IDENTIFIER.match(name) or keyword.iskeyword(name) or
+                        name.startswith('__') or hasattr(Record, name)):
+                    raise ValueError(u'{0!r} of {1!r} can not be an attribute name'.format(
+                        name, document))
+                names.add(name)
+                properties.append((name, backend._get_property_key(name, field),
+                                   field, field_role))
+        return properties
+
+    def _decoder(self, field, role, var, namespace, depth=0):
+        """Returns an expression that decodes ``var`` or ``None``
+        if the value is used as it is.
+        """
+        if isinstance(field, DocumentField):
+            record_cls = self.get_class(field.document_cls, field.get_nested_role(role))
+            name = '_record_{0}'.format(len(namespace))
+            namespace[name] = record_cls
+            return '{0}.from_dict({1})'.format(name, var)
+        elif isinstance(field, ArrayField):
+            items, items_role = field.resolve_attr('items', role)
+            if isinstance(items, BaseField):
+                item_var = '_item{0}'.format(depth)
+                expr = self._decoder(items, items_role, item_var, namespace, depth + 1)
+                if expr is not None:
+                    return '[{0} for {1} in {2}]'.format(expr, item_var, var)
+        return None
+
+    def _encoder(self, field, role, var, depth=0):
+        """Returns an expression that encodes ``var`` or ``None``
+        if the value is used as it is.
+        """
+        if isinstance(field, DocumentField):
+            return '{0}.to_dict()'.format(var)
+        elif isinstance(field, ArrayField):
+            items, items_role = field.resolve_attr('items', role)
+            if isinstance(items, BaseField):
+                item_var = '_item{0}'.format(depth)
+                expr = self._encoder(items, items_role, item_var, depth + 1)
+                if expr is not None:
+                    return '[{0} for {1} in {2}]'.format(expr, item_var, var)
+        return None
+
+    def _generate_methods(self, record_cls, properties):
+        namespace = {'_new': object.__new__}
+        from_dict = ['def from_dict(cls, data):',
+                     '    self = _new(cls)',
+                     '    _get = data.get']
+        to_dict = ['def to_dict(self):',
+                   '    rv = {}']
+        for name, key, field, field_role in properties:
+            decoder = self._decoder(field, field_role, '_value', namespace)
+            if decoder is None:
+                from_dict.append('    self.{0} = _get({1!r})'.format(name, key))
+            else:
+                from_dict.append('    _value = _get({0!r})'.format(key))
+                from_dict.append('    self.{0} = None if _value is None else {1}'.format(
+                    name, decoder))
+            encoder = self._encoder(field, field_role, '_value') or '_value'
+            to_dict.append('    _value = self.{0}'.format(name))
+            to_dict.append('    if _value is not None:')
+            to_dict.append('        rv[{0!r}] = {1}'.format(key, encoder))
+        from_dict.append('    return self')
+        to_dict.append('    return rv')
+        source = '\n'.join(from_dict + to_dict) + '\n'
+        exec(compile(source, '<record class {0}>'.format(record_cls.__name__), 'exec'),
+             namespace)
+        record_cls.from_dict = classmethod(namespace['from_dict'])
+        record_cls.to_dict = namespace['to_dict']
+        record_cls._source = source
+
+
+def compile_record_class(document_cls, role=DEFAULT_ROLE):
+    """Generates a record class of a document.
+
+    The attributes are named after the document attributes, while
+    :meth:`~.Record.from_dict` and :meth:`~.Record.to_dict` use the keys of the fields
+    (that may be different if fields have ``name`` specified). The values of
+    :class:`.DocumentField` s and of :class:`.ArrayField` s of them are converted
+    to and from records of the nested documents.
+
+    :param document_cls: A document.
+    :type document_cls: subclass of :class:`.Document`
+    :param str role: A role.
+    :raises: :class:`ValueError` if a document attribute name can not be used
+             as a record attribute name
+    :rtype: subclass of :class:`.Record`
+    """
+    if not (isinstance(document_cls, type) and issubclass(document_cls, Document)):
+        raise TypeError(u'{0!r} is not a document'.format(document_cls))
+    return _Generator().generate(document_cls, role)
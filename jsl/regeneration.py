@@ -0,0 +1,143 @@
+# coding: utf-8
+"""
+Cached schemas of documents and their incremental regeneration, e.g. for
+development servers that reload modules.
+
+:func:`get_schema` and :func:`get_schema_bytes` cache the schemas of documents
+and their JSON serializations. When a document is redefined (a document with
+the same module and name is created and put to the registry), the new document
+and all the documents that depend on the old or the new one (see :mod:`jsl.graph`)
+become stale. :func:`regenerate_stale` drops the caches of the stale documents
+only and rebuilds their schemas for the roles that were cached; the other
+cached schemas and bytes are left untouched.
+
+Redefinitions in :data:`~jsl.registry.DEFAULT_REGISTRY` are tracked since the module
+is imported, and in other registries since they are passed to :func:`track`.
+"""
+import json
+import weakref
+
+from .registry import DEFAULT_REGISTRY
+from .graph import DocumentGraph, get_graph
+from .roles import DEFAULT_ROLE
+
+
+__all__ = ['get_schema', 'get_schema_bytes', 'mark_stale', 'get_stale', 'regenerate_stale',
+           'track']
+
+# the bookkeeping does not keep documents alive, so that the documents of weak
+# registries can be collected
+# redefinitions not processed yet: new documents -> the documents they replaced
+# (the keys of weak mappings used as sets). Repeated redefinitions of a name are
+# collapsed into one entry, and the entries of collected documents are dropped,
+# so that the bookkeeping doesn't grow if get_stale is never called
+_redefinitions = weakref.WeakKeyDictionary()
+# the stale documents (the keys)
+_stale = weakref.WeakKeyDictionary()
+# stale documents -> sets of the roles cached for the documents they replaced
+_replaced_roles = weakref.WeakKeyDictionary()
+
+
+def _on_put(name, old_document_cls, document_cls):
+    if old_document_cls is not None and old_document_cls is not document_cls:
+        roles = _replaced_roles.setdefault(document_cls, set())
+        roles.update(_get_cached_roles(old_document_cls))
+        roles.update(_replaced_roles.pop(old_document_cls, ()))
+        replaced = _redefinitions.pop(old_document_cls, None)
+        if replaced is None:
+            replaced = weakref.WeakKeyDictionary()
+        replaced[old_document_cls] = True
+        _redefinitions[document_cls] = replaced
+
+
+def track(registry):
+    """Starts tracking redefinitions of the documents of ``registry``.
+
+    :type registry: :class:`.Registry`
+    """
+    registry.add_listener(_on_put)
+
+
+track(DEFAULT_REGISTRY)
+
+
+def get_schema(document_cls, role=DEFAULT_ROLE):
+    """Returns a schema of ``document_cls`` for ``role``. The schema is generated
+    once and then cached until the document becomes stale, so it must not be modified.
+
+    :rtype: dict
+    """
+    key = ('schema', role)
+    schema = document_cls._cache.get(key)
+    if schema is None:
+        schema = document_cls._cache[key] = document_cls.get_schema(role=role)
+    return schema
+
+
+def get_schema_bytes(document_cls, role=DEFAULT_ROLE):
+    """Returns a compact JSON serialization of :func:`get_schema` (with the keys
+    sorted) encoded in UTF-8. The result is cached.
+
+    :rtype: bytes
+    """
+    key = ('schema_bytes', role)
+    schema_bytes = document_cls._cache.get(key)
+    if schema_bytes is None:
+        schema_bytes = document_cls._cache[key] = json.dumps(
+            get_schema(document_cls, role=role),
+            sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return schema_bytes
+
+
+def mark_stale(document_cls):
+    """Marks ``document_cls`` and the documents that depend on it as stale."""
+    graph = get_graph(document_cls._options.registry)
+    _stale[document_cls] = True
+    for dependent in graph.get_dependents(document_cls, transitive=True):
+        _stale[dependent] = True
+
+
+def _process_redefinitions():
+    while _redefinitions:
+        document_cls, replaced = _redefinitions.popitem()
+        # the documents that refer to the new document by name depend on it now,
+        # while the ones that refer to the class still depend on the old one
+        mark_stale(document_cls)
+        for old_document_cls in list(replaced):
+            graph = get_graph(old_document_cls._options.registry)
+            for dependent in graph.get_dependents(old_document_cls, transitive=True):
+                _stale[dependent] = True
+            _stale.pop(old_document_cls, None)
+
+
+def get_stale():
+    """Returns a frozenset of the stale documents."""
+    _process_redefinitions()
+    return frozenset(_stale)
+
+
+def _get_cached_roles(document_cls):
+    return set(key[1] for key in document_cls._cache
+               if key[0] in ('schema', 'schema_bytes'))
+
+
+def regenerate_stale():
+    """Drops all the cached objects (schemas, validators and so on) of the stale
+    documents and regenerates their cached schemas and bytes, the documents
+    a stale document depends on first. Documents are not stale anymore afterwards.
+
+    :returns: a list of the regenerated documents in the order they are regenerated
+    """
+    documents = sorted(get_stale(), key=lambda d: d.get_definition_id())
+    # the stale documents may belong to different registries
+    graph = DocumentGraph(documents)
+    rv = []
+    for document_cls in graph.topological_order(documents):
+        roles = _get_cached_roles(document_cls)
+        roles.update(_replaced_roles.pop(document_cls, ()))
+        document_cls._cache.clear()
+        for role in sorted(roles):
+            get_schema_bytes(document_cls, role=role)
+        _stale.pop(document_cls, None)
+        rv.append(document_cls)
+    return rv
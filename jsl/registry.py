@@ -1,31 +1,196 @@
 # coding: utf-8
-from ._compat import itervalues
+import sys
+import weakref
 
+from ._compat import iteritems, itervalues
 
-_documents_registry = {}
 
+__all__ = ['Registry', 'DEFAULT_REGISTRY']
 
-def get_document(name, module=None):
-    if module:
-        name = '{0}.{1}'.format(module, name)
-    return _documents_registry[name]
+_NO_MODULE_MESSAGE = 'No module named '
 
 
-def put_document(name, document_cls, module=None):
-    if module:
-        name = '{0}.{1}'.format(module, name)
-    _documents_registry[name] = document_cls
+def _is_missing(module, error):
+    """Tells whether ``error`` raised by importing ``module`` means that
+    ``module`` or one of its packages does not exist.
+    """
+    missing = getattr(error, 'name', None)
+    if missing:
+        return module == missing or module.startswith(missing + '.')
+    # Python 2 does not set the name; its message contains the dotted path
+    # of the missing module relative to the last package that was imported
+    message = str(error)
+    if not message.startswith(_NO_MODULE_MESSAGE):
+        return False
+    missing = message[len(_NO_MODULE_MESSAGE):].strip('\'"')
+    parts = module.split('.')
+    for i in range(1, len(parts) + 1):
+        package = '.'.join(parts[:i])
+        if package == missing or package.endswith('.' + missing):
+            return True
+    return False
 
 
-def remove_document(name, module=None):
-    if module:
-        name = '{0}.{1}'.format(module, name)
-    del _documents_registry[name]
+class Registry(object):
+    """A registry of documents: a namespace in which string references of
+    :class:`.DocumentField` s are looked up.
 
+    Documents are put to the registry specified by the ``registry`` option
+    (see :class:`.Options`), :data:`DEFAULT_REGISTRY` by default. A registry
+    is not referred to by anything but its documents, so dropping all the
+    references to a registry and its documents frees them and their caches.
 
-def iter_documents():
-    return itervalues(_documents_registry)
+    :param bool weak:
+        If ``True``, the registry keeps weak references to its documents, so that
+        the documents nothing else refers to (e.g., the ones created at runtime)
+        are garbage collected together with the objects derived from them.
+        Note that documents are referred to by their subclasses and by the
+        documents they are referred to from.
+    :param bool lazy:
+        If ``True``, a document that is not in the registry is looked up by importing
+        the module of its dotted path (e.g., ``"app.resources"`` for
+        ``"app.resources.User"``) or of the path the :attr:`manifest` maps its name to.
+        Then the documents of schema modules are only imported when they are used.
+    """
 
+    def __init__(self, weak=False, lazy=False):
+        #: Whether the registry keeps weak references to its documents.
+        self.weak = weak
+        #: Whether the registry imports modules of the documents that are not in it.
+        self.lazy = lazy
+        #: A dictionary mapping names of documents to the dotted paths
+        #: (``"<module>.<name>"``) they are imported from when the registry is lazy.
+        #: See :meth:`get_manifest`.
+        self.manifest = {}
+        # names -> documents or weak references to them
+        self._documents = {}
+        # incremented on every change, so that the objects derived from
+        # the registry contents can tell whether they are stale
+        self._version = 0
+        self._listeners = []
+        #: Objects derived from the registry contents (e.g., a document graph), keyed by kind.
+        #: Cleared together with the registry.
+        self.cache = {}
 
-def clear():
-    _documents_registry.clear()
\ No newline at end of file
+    def _changed(self):
+        self._version += 1
+
+    def get_version(self):
+        """Returns a number that changes every time the registry is changed."""
+        return self._version
+
+    def add_listener(self, listener):
+        """Adds a function to be called as ``listener(name, old, new)`` every time
+        a document is put to the registry, where ``old`` is the replaced document
+        or ``None``.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def _collected(self, name, ref):
+        # the document was garbage collected, unless the name is taken by another one
+        if self._documents.get(name) is ref:
+            del self._documents[name]
+            self._changed()
+
+    def _deref(self, value):
+        return value() if self.weak and value is not None else value
+
+    def _get_document(self, name):
+        document_cls = self._deref(self._documents[name])
+        if document_cls is None:
+            raise KeyError(name)
+        return document_cls
+
+    def _import(self, module):
+        """Imports ``module`` unless it's imported already."""
+        if not module or module in sys.modules:
+            return
+        try:
+            __import__(module)
+        except ImportError as e:
+            # the modules that do not exist are unknown names, but
+            # the errors of the existing modules are not hidden
+            if not _is_missing(module, e):
+                raise
+
+    def get_document(self, name, module=None):
+        if module:
+            name = '{0}.{1}'.format(module, name)
+        try:
+            return self._get_document(name)
+        except KeyError:
+            if not self.lazy:
+                raise
+        path = self.manifest.get(name, name)
+        self._import(path.rpartition('.')[0])
+        return self._get_document(path)
+
+    def get_manifest(self):
+        """Returns a dictionary mapping the names of the registered documents
+        (``"<module>.<name>"``, and ``"<name>"`` if no other document has the same
+        class name) to the dotted paths to import them from. It can be saved
+        (e.g., as JSON) and loaded to the :attr:`manifest` of a lazy registry
+        in another process.
+
+        :rtype: dict
+        """
+        manifest = {}
+        short_names = {}
+        for name in list(self._documents):
+            document_cls = self._deref(self._documents.get(name))
+            if document_cls is None:
+                continue
+            manifest[name] = name
+            short_names.setdefault(name.rpartition('.')[2], set()).add(name)
+        for short_name, names in iteritems(short_names):
+            if len(names) == 1 and short_name not in manifest:
+                manifest[short_name] = names.pop()
+        return manifest
+
+    def put_document(self, name, document_cls, module=None):
+        if module:
+            name = '{0}.{1}'.format(module, name)
+        old_document_cls = self._deref(self._documents.get(name))
+        if self.weak:
+            self._documents[name] = weakref.ref(
+                document_cls, lambda ref, name=name: self._collected(name, ref))
+        else:
+            self._documents[name] = document_cls
+        self._changed()
+        for listener in list(self._listeners):
+            listener(name, old_document_cls, document_cls)
+
+    def remove_document(self, name, module=None):
+        if module:
+            name = '{0}.{1}'.format(module, name)
+        del self._documents[name]
+        self._changed()
+
+    def iter_documents(self):
+        if not self.weak:
+            return itervalues(self._documents)
+        documents = (ref() for ref in list(itervalues(self._documents)))
+        return (document_cls for document_cls in documents if document_cls is not None)
+
+    def clear(self):
+        self._documents.clear()
+        self.cache.clear()
+        self._changed()
+
+
+#: The registry documents are put to by default.
+DEFAULT_REGISTRY = Registry()
+
+# the functions of the default registry
+get_version = DEFAULT_REGISTRY.get_version
+add_listener = DEFAULT_REGISTRY.add_listener
+remove_listener = DEFAULT_REGISTRY.remove_listener
+get_document = DEFAULT_REGISTRY.get_document
+put_document = DEFAULT_REGISTRY.put_document
+remove_document = DEFAULT_REGISTRY.remove_document
+iter_documents = DEFAULT_REGISTRY.iter_documents
+clear = DEFAULT_REGISTRY.clear
+get_manifest = DEFAULT_REGISTRY.get_manifest
@@ -26,17 +26,72 @@ def not_(*roles):
 
     :rtype: callable
     """
-    return lambda role: role not in roles
+    return _NotIn(roles)
+
+
+class _Matcher(object):
+    """A base class of the matchers constructed from strings and iterables.
+    Unlike lambdas, matchers can be pickled and compared.
+    """
+
+    __slots__ = ('roles',)
+
+    def __init__(self, roles):
+        self.roles = roles
+
+    def __call__(self, role):  # pragma: no cover
+        raise NotImplementedError
+
+    def __reduce__(self):
+        return type(self), (self.roles,)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.roles == other.roles
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((type(self), self.roles))
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(type(self).__name__, self.roles)
+
+
+class _Equals(_Matcher):
+    """Matches a single role."""
+
+    __slots__ = ()
+
+    def __call__(self, role):
+        return role == self.roles
+
+
+class _In(_Matcher):
+    """Matches the roles from a frozenset."""
+
+    __slots__ = ()
+
+    def __call__(self, role):
+        return role in self.roles
+
+
+class _NotIn(_Matcher):
+    """Matches the roles that are not in a tuple."""
+
+    __slots__ = ()
+
+    def __call__(self, role):
+        return role not in self.roles
 
 
 def construct_matcher(matcher):
     if callable(matcher):
         return matcher
     elif isinstance(matcher, string_types):
-        return lambda r: r == matcher
+        return _Equals(matcher)
     elif isinstance(matcher, collections.Iterable):
-        choices = frozenset(matcher)
-        return lambda r: r in choices
+        return _In(frozenset(matcher))
     else:
         raise ValueError(
             'Unknown matcher type {} ({!r}). Only callables, '
@@ -88,8 +143,11 @@ class Var(Resolvable):
         Matchers are callables returning boolean values. Strings and
         iterables are also accepted and processed as follows:
 
-        * A string ``s`` will be replaced with a lambda ``lambda r: r == s``;
-        * An iterable ``i`` will be replaced with a lambda ``lambda r: r in i``.
+        * A string ``s`` will be replaced with a matcher equivalent to ``lambda r: r == s``;
+        * An iterable ``i`` will be replaced with a matcher equivalent to
+          ``lambda r: r in i``.
+
+        Unlike lambdas, such matchers can be pickled.
     :type values: dict or list of pairs
 
     :param default:
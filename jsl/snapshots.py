@@ -0,0 +1,158 @@
+# coding: utf-8
+"""
+A persistent cache of generated schemas: a directory of JSON files.
+
+A snapshot is keyed by the definition id of a document, a role, the output
+options and a hash of the sources of the modules that define the document and
+the documents it depends on (see :mod:`jsl.graph`), so editing any of these
+modules invalidates the snapshot. A process started with the same modules
+loads the schemas from the files instead of generating them, while a process
+that imported the modules before they were edited neither loads nor saves them.
+"""
+import hashlib
+import inspect
+import json
+import os
+import sys
+import tempfile
+
+from . import __version__
+from .graph import DocumentGraph
+from .roles import DEFAULT_ROLE
+from ._compat import OrderedDict
+
+
+__all__ = ['SnapshotCache']
+
+# (file name, modification time, size) -> digest of the file contents
+_source_digests = {}
+# json.loads supports object_pairs_hook since Python 2.7, so ordered
+# schemas are not cached on Python 2.6
+_CAN_LOAD_ORDERED = sys.version_info >= (2, 7)
+
+
+def _get_source_digest(document_cls):
+    """Returns a hex digest of the source of the module of ``document_cls`` or ``None``
+    if the source can not be found or has been modified since the document was
+    defined, so that the document may not match it.
+    """
+    module = sys.modules.get(document_cls.__module__)
+    if module is None:
+        return None
+    try:
+        filename = inspect.getsourcefile(module)
+    except TypeError:  # a built-in module
+        return None
+    if filename is None:
+        return None
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    if stat.st_mtime > document_cls._created:
+        return None
+    key = (filename, stat.st_mtime, stat.st_size)
+    digest = _source_digests.get(key)
+    if digest is None:
+        with open(filename, 'rb') as f:
+            digest = _source_digests[key] = hashlib.sha1(f.read()).hexdigest()
+    return digest
+
+
+def _get_dependencies(document_cls):
+    """Returns a list of ``document_cls`` and the documents it depends on."""
+    graph = DocumentGraph()
+    stack = [document_cls]
+    while stack:
+        current = stack.pop()
+        if current not in graph:
+            graph.add(current)
+            stack.extend(graph.get_dependencies(current))
+    return list(graph)
+
+
+class SnapshotCache(object):
+    """A directory of snapshots of document schemas.
+
+    :param str directory: A directory to keep snapshots in. Created if it doesn't exist.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory  #:
+
+    def get_key(self, document_cls, role=DEFAULT_ROLE, ordered=False):
+        """Returns a key of the snapshot of a schema or ``None`` if the source
+        of any of the modules the schema depends on can not be found or has been
+        modified since the documents were defined (the running process may
+        generate a schema that doesn't match the source then).
+
+        :rtype: str
+        """
+        digests = {}
+        for dependency in _get_dependencies(document_cls):
+            digest = _get_source_digest(dependency)
+            if digest is None:
+                return None
+            digests[dependency.__module__] = digest
+        key = json.dumps([__version__, document_cls.get_definition_id(role=role), role,
+                          bool(ordered), sorted(digests.items())])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def get_schema(self, document_cls, role=DEFAULT_ROLE, ordered=False):
+        """Returns a schema of ``document_cls`` (see :meth:`.Document.get_schema`)
+        loaded from a snapshot. If there is no snapshot, generates the schema
+        and saves a snapshot of it.
+
+        Documents whose modules' sources can not be found (e.g., the ones defined
+        in the interactive interpreter) or have been edited since the modules were
+        imported are not cached, nor are ordered schemas on Python 2.6.
+
+        :rtype: dict or OrderedDict
+        """
+        if ordered and not _CAN_LOAD_ORDERED:
+            return document_cls.get_schema(role=role, ordered=ordered)
+        key = self.get_key(document_cls, role=role, ordered=ordered)
+        if key is None:
+            return document_cls.get_schema(role=role, ordered=ordered)
+        path = self._get_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except (IOError, OSError):
+            pass
+        else:
+            if ordered:
+                return json.loads(data.decode('utf-8'), object_pairs_hook=OrderedDict)
+            return json.loads(data.decode('utf-8'))
+        schema = document_cls.get_schema(role=role, ordered=ordered)
+        self._save(path, json.dumps(schema).encode('utf-8'))
+        return schema
+
+    def _save(self, path, data):
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:  # created by another process
+                pass
+        # a snapshot is written to a temporary file and then renamed, so that
+        # other processes never read incomplete snapshots
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.rename(temp_path, path)
+        except OSError:
+            # e.g., on Windows if another process has saved the snapshot first
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def clear(self):
+        """Removes all the snapshots."""
+        if not os.path.isdir(self.directory):
+            return
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.json'):
+                os.remove(os.path.join(self.directory, filename))
@@ -0,0 +1,212 @@
+# coding: utf-8
+"""
+Validation of huge JSON arrays read from file-like objects.
+
+The array is never loaded into memory as a whole: its elements are decoded
+and validated one by one, so memory use is bounded by the size of the largest
+element.
+"""
+import codecs
+import json
+import re
+
+from .exceptions import ItemStep
+from .fields import ArrayField
+from .roles import DEFAULT_ROLE
+from .validation import _Compiler, _ArrayNode, _AnyNode, _error, _NO_ERRORS
+from ._compat import text_type
+
+
+__all__ = ['iter_array_items', 'StreamingValidator']
+
+_CHUNK_SIZE = 64 * 1024
+_NON_WHITESPACE = re.compile(r'[^ \t\n\r]')
+_DELIMITER = re.compile(r'[ \t\n\r,\]]')
+
+
+class _ArrayReader(object):
+    """An incremental tokenizer of a JSON array. It only looks for the structural
+    characters of the outermost array (``[``, ``,`` and ``]``) and decodes
+    the elements between them with :meth:`json.JSONDecoder.raw_decode`.
+    """
+
+    def __init__(self, fp, chunk_size=_CHUNK_SIZE):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._bytes_decoder = None
+        self._buffer = u''
+        self._pos = 0
+        self._eof = False
+
+    def _read_chunk(self):
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            if self._bytes_decoder is not None:
+                return self._bytes_decoder.decode(b'', final=True)
+            return u''
+        if not isinstance(chunk, text_type):
+            if self._bytes_decoder is None:
+                self._bytes_decoder = codecs.getincrementaldecoder('utf-8')()
+            chunk = self._bytes_decoder.decode(chunk)
+        return chunk
+
+    def _read(self):
+        """Reads more data and drops the consumed part of the buffer.
+        Reads at least as much as is left in the buffer, so that decoding a large
+        element is retried a logarithmic number of times.
+
+        :returns: ``False`` if the end of the file is reached
+        """
+        if self._eof:
+            return False
+        chunks = [self._buffer[self._pos:]]
+        size = 0
+        while not self._eof and size <= len(chunks[0]):
+            chunk = self._read_chunk()
+            chunks.append(chunk)
+            size += len(chunk)
+        self._buffer = u''.join(chunks)
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """Skips whitespace and returns the next character or ``''`` at the end of the file."""
+        while True:
+            match = _NON_WHITESPACE.search(self._buffer, self._pos)
+            if match is not None:
+                self._pos = match.start()
+                return self._buffer[self._pos]
+            self._pos = len(self._buffer)
+            if not self._read():
+                return ''
+
+    def _decode(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                if self._read():
+                    continue
+                raise
+            # a number cut by the end of the buffer (e.g., after "." or "e") is
+            # decoded truncated, so an element is only complete if it's followed
+            # by a delimiter or the end of the file
+            if _DELIMITER.search(self._buffer, end) is None and self._read():
+                continue
+            self._pos = end
+            return value
+
+    def _expect(self, expected):
+        c = self._peek()
+        if c not in expected:
+            raise ValueError(u'Expected one of {0!r}, got {1!r}'.format(
+                list(expected), c or u'the end of the file'))
+        self._pos += 1
+        return c
+
+    def __iter__(self):
+        self._expect(u'[')
+        if self._peek() == u']':
+            self._pos += 1
+        else:
+            while True:
+                yield self._decode()
+                if self._expect(u',]') == u']':
+                    break
+        if self._peek():
+            raise ValueError(u'Extra data after the array')
+
+
+def iter_array_items(fp, chunk_size=_CHUNK_SIZE):
+    """Lazily decodes elements of a JSON array stored in a file-like object.
+
+    :param fp: A file-like object opened in either text or binary (UTF-8) mode.
+    :param int chunk_size: A number of bytes or characters to read at once.
+    :raises: :class:`ValueError` if the file does not contain a valid JSON array
+    :rtype: iterable
+    """
+    return iter(_ArrayReader(fp, chunk_size=chunk_size))
+
+
+class StreamingValidator(object):
+    """Validates a JSON array read from a file-like object against an
+    :class:`.ArrayField` (typically, of :class:`.DocumentField` items).
+    Every element is validated as soon as it is decoded and then discarded.
+
+    :param field: An array field.
+    :type field: :class:`.ArrayField`
+    :param str role: A role.
+    :param int chunk_size: A number of bytes or characters to read at once.
+    :raises:
+        :class:`ValueError` if ``unique_items`` of the field is set, since it can not be
+        checked in bounded memory
+    """
+
+    def __init__(self, field, role=DEFAULT_ROLE, chunk_size=_CHUNK_SIZE):
+        if not isinstance(field, ArrayField):
+            raise TypeError(u'{0!r} is not an ArrayField'.format(field))
+        node = _Compiler().compile_field(field, role)
+        if not isinstance(node, _ArrayNode):
+            raise ValueError(u'Arrays with enum can not be validated by streaming')
+        if node.unique_items:
+            raise ValueError(u'unique_items can not be checked by streaming')
+        self._node = node
+        self.field = field  #:
+        self.role = role  #:
+        self.chunk_size = chunk_size  #:
+
+    def _get_item_node(self, i):
+        items = self._node.items
+        if isinstance(items, tuple):
+            if i < len(items):
+                return items[i]
+            return self._node.additional_items
+        return items if items is not None else _AnyNode()
+
+    def iter_errors(self, fp):
+        """Lazily yields a :class:`.ValidationError` for every violation.
+
+        :param fp: A file-like object.
+        :raises: :class:`ValueError` if the file does not contain a valid JSON array
+        """
+        node = self._node
+        role = self.role
+        count = 0
+        for i, item in enumerate(iter_array_items(fp, chunk_size=self.chunk_size)):
+            count += 1
+            item_node = self._get_item_node(i)
+            if item_node is False:
+                # reported once, as the in-memory validator does
+                if i == len(node.items):
+                    yield _error(u'Additional items are not allowed', _NO_ERRORS,
+                                 'additional_items', role)
+            elif item_node is not True and not item_node.is_valid(item):
+                for error in item_node.iter_errors(item, (ItemStep(i, role=role),)):
+                    yield error
+            if node.max_items is not None and count == node.max_items + 1:
+                yield _error(u'The array is too long', _NO_ERRORS, 'max_items', role)
+        if node.min_items is not None and count < node.min_items:
+            yield _error(u'The array is too short', _NO_ERRORS, 'min_items', role)
+
+    def is_valid(self, fp):
+        """Returns ``True`` if the array is valid. Stops reading at the first violation.
+
+        :param fp: A file-like object.
+        :raises: :class:`ValueError` if the file does not contain a valid JSON array
+        :rtype: bool
+        """
+        for _ in self.iter_errors(fp):
+            return False
+        return True
+
+    def validate(self, fp):
+        """Raises the first found :class:`.ValidationError` if the array is not valid.
+
+        :param fp: A file-like object.
+        :raises: :class:`.ValidationError`, :class:`ValueError`
+        """
+        for error in self.iter_errors(fp):
+            raise error
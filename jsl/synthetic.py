@@ -0,0 +1,444 @@
+# coding: utf-8
+"""
+Generation of random valid instances, e.g. for load testing.
+
+A document is compiled into a tree of generating functions once; producing
+an instance then only calls them and the random number generator.
+Constraints that can not be satisfied by construction (complex patterns,
+custom formats, ``oneOf`` and ``not``) are satisfied by retrying.
+"""
+import math
+import random
+import sre_constants
+import sre_parse
+import string
+
+from .document import Document
+from .roles import DEFAULT_ROLE
+from .validation import (compile_validator, _AnyNode, _EnumNode, _NullNode, _BooleanNode,
+                         _StringNode, _NumberNode, _ArrayNode, _ObjectNode, _OfNode,
+                         _NotNode, _DocumentNode, _has_duplicates)
+from ._compat import iteritems, IS_PY3
+
+
+__all__ = ['InstanceGenerator']
+
+_unichr = chr if IS_PY3 else unichr  # noqa
+
+_ALPHABET = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+#: A number of attempts to generate a value satisfying the constraints
+#: that can only be checked.
+_MAX_ATTEMPTS = 100
+#: An upper bound of the generated array and string lengths and of
+#: the integer ranges if the field does not specify one.
+_DEFAULT_MAX_LENGTH = 8
+_DEFAULT_RANGE = 1000
+
+
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: string.digits,
+    sre_constants.CATEGORY_WORD: string.ascii_letters + string.digits + '_',
+    sre_constants.CATEGORY_SPACE: ' ',
+}
+
+
+def _compile_pattern(parsed, rng):
+    """Compiles a parsed regular expression into a function that returns strings
+    matching it. Returns ``None`` if the expression uses unsupported constructs.
+    """
+    parts = []
+    for op, av in parsed:
+        if op == sre_constants.LITERAL:
+            parts.append(lambda c=_unichr(av): c)
+        elif op == sre_constants.NOT_LITERAL:
+            chars = [c for c in _ALPHABET if c != _unichr(av)]
+            parts.append(lambda chars=chars: rng.choice(chars))
+        elif op == sre_constants.ANY:
+            parts.append(lambda: rng.choice(_ALPHABET))
+        elif op == sre_constants.IN:
+            chars = []
+            negate = False
+            for item_op, item_av in av:
+                if item_op == sre_constants.NEGATE:
+                    negate = True
+                elif item_op == sre_constants.LITERAL:
+                    chars.append(_unichr(item_av))
+                elif item_op == sre_constants.RANGE:
+                    chars.extend(_unichr(c) for c in range(item_av[0], item_av[1] + 1))
+                elif item_op == sre_constants.CATEGORY and item_av in _CATEGORIES:
+                    chars.extend(_CATEGORIES[item_av])
+                else:
+                    return None
+            if negate:
+                chars = [c for c in _ALPHABET if c not in chars]
+            parts.append(lambda chars=chars: rng.choice(chars))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, high, subpattern = av
+            if high == sre_constants.MAXREPEAT:
+                high = low + _DEFAULT_MAX_LENGTH
+            generate = _compile_pattern(subpattern, rng)
+            if generate is None:
+                return None
+            parts.append(lambda low=low, high=high, generate=generate: u''.join(
+                [generate() for _ in range(rng.randint(low, high))]))
+        elif op == sre_constants.SUBPATTERN:
+            generate = _compile_pattern(av[-1], rng)
+            if generate is None:
+                return None
+            parts.append(generate)
+        elif op == sre_constants.BRANCH:
+            branches = [_compile_pattern(branch, rng) for branch in av[1]]
+            if None in branches:
+                return None
+            parts.append(lambda branches=branches: rng.choice(branches)())
+        elif op == sre_constants.AT:
+            continue
+        else:
+            return None
+    return lambda: u''.join([part() for part in parts])
+
+
+class _Compiler(object):
+    """Compiles validator nodes into functions ``generate(depth)``."""
+
+    def __init__(self, rng, max_depth):
+        self.rng = rng
+        self.max_depth = max_depth
+        self._documents = {}
+
+    def _retry(self, generate, check, description):
+        def retrying(depth):
+            for _ in range(_MAX_ATTEMPTS):
+                value = generate(depth)
+                if check(value):
+                    return value
+            raise ValueError(u'Can not generate {0} in {1} attempts'.format(
+                description, _MAX_ATTEMPTS))
+        return retrying
+
+    def compile(self, node):
+        if isinstance(node, _DocumentNode):
+            return self._compile_document(node)
+        elif isinstance(node, _EnumNode):
+            return self._compile_enum(node)
+        elif isinstance(node, _StringNode):
+            return self._compile_string(node)
+        elif isinstance(node, _NumberNode):
+            return self._compile_number(node)
+        elif isinstance(node, _BooleanNode):
+            random_ = self.rng.random
+            return lambda depth: random_() < 0.5
+        elif isinstance(node, _NullNode):
+            return lambda depth: None
+        elif isinstance(node, _ArrayNode):
+            return self._compile_array(node)
+        elif isinstance(node, _ObjectNode):
+            return self._compile_object(node)
+        elif isinstance(node, _OfNode):
+            return self._compile_of(node)
+        elif isinstance(node, _NotNode):
+            return self._retry(self._compile_any(), node.is_valid, u'a value of {0!r}'.format(node))
+        elif isinstance(node, _AnyNode):
+            return self._compile_any()
+        raise TypeError(u'Can not generate values of {0!r}'.format(node))  # pragma: no cover
+
+    def _compile_any(self):
+        rng = self.rng
+        randint = rng.randint
+        random_ = rng.random
+
+        def generate(depth):
+            kind = randint(0, 3)
+            if kind == 0:
+                return randint(-_DEFAULT_RANGE, _DEFAULT_RANGE)
+            elif kind == 1:
+                return ''.join([_ALPHABET[int(random_() * len(_ALPHABET))]
+                                for _ in range(randint(0, _DEFAULT_MAX_LENGTH))])
+            elif kind == 2:
+                return random_() < 0.5
+            return None
+        return generate
+
+    def _compile_document(self, node):
+        generate = self._documents.get(node)
+        if generate is None:
+            # the function of the contents is compiled after the document function is
+            # created, since the contents may refer to the document
+            contents = []
+            generate = self._documents[node] = lambda depth: contents[0](depth)
+            contents.append(self.compile(node.node))
+        return generate
+
+    def _compile_enum(self, node):
+        choice = self.rng.choice
+        is_valid = node.node.is_valid
+        enum = node.enum
+        if callable(enum):
+            def generate(depth):
+                return choice([value for value in enum() if is_valid(value)])
+            return generate
+        choices = [value for value in enum if is_valid(value)]
+        if not choices:
+            raise ValueError(u'None of the enum values {0!r} is valid'.format(enum))
+        return lambda depth: choice(choices)
+
+    def _compile_string(self, node):
+        rng = self.rng
+        randint = rng.randint
+        random_ = rng.random
+        n = len(_ALPHABET)
+
+        min_length = node.min_length or 0
+        max_length = node.max_length
+        if max_length is None:
+            max_length = min_length + _DEFAULT_MAX_LENGTH
+        if min_length > max_length:
+            raise ValueError(u'min_length is greater than max_length in {0!r}'.format(node))
+
+        def random_string(length):
+            return ''.join([_ALPHABET[int(random_() * n)] for _ in range(length)])
+
+        format_generator = _FORMATS.get(node.format) if node.format_checker else None
+        pattern_generator = None
+        if node.pattern is not None:
+            pattern_generator = _compile_pattern(sre_parse.parse(node.pattern.pattern), rng)
+        if format_generator is not None:
+            def generate(depth):
+                return format_generator(rng, random_string)
+        elif pattern_generator is not None:
+            def generate(depth):
+                return pattern_generator()
+        else:
+            def generate(depth):
+                return random_string(randint(min_length, max_length))
+
+        if node.pattern is not None or node.format_checker is not None:
+            description = (u'a string matching {0!r}'.format(node.pattern.pattern)
+                           if node.pattern is not None else
+                           u'a string of {0!r} format'.format(node.format))
+            return self._retry(generate, node.is_valid, description)
+        return generate
+
+    def _compile_number(self, node):
+        rng = self.rng
+        minimum = node.minimum
+        maximum = node.maximum
+        if minimum is None and maximum is None:
+            minimum, maximum = -_DEFAULT_RANGE, _DEFAULT_RANGE
+        elif minimum is None:
+            minimum = maximum - 2 * _DEFAULT_RANGE
+        elif maximum is None:
+            maximum = minimum + 2 * _DEFAULT_RANGE
+        multiple_of = node.multiple_of
+
+        if node.integer or multiple_of is not None:
+            step = multiple_of or 1
+            low = int(math.ceil(float(minimum) / step))
+            high = int(math.floor(float(maximum) / step))
+            if node.exclusive_minimum and low * step <= minimum:
+                low += 1
+            if node.exclusive_maximum and high * step >= maximum:
+                high -= 1
+            if low > high:
+                raise ValueError(u'No numbers satisfy {0!r}'.format(node))
+            randint = rng.randint
+            if node.integer and isinstance(step, int):
+                return lambda depth: randint(low, high) * step
+            generate = lambda depth: randint(low, high) * step
+        else:
+            if minimum > maximum:
+                raise ValueError(u'No numbers satisfy {0!r}'.format(node))
+            uniform = rng.uniform
+            generate = lambda depth: uniform(minimum, maximum)
+        # floating point errors and exclusive bounds
+        return self._retry(generate, node.is_valid, u'a number of {0!r}'.format(node))
+
+    def _compile_array(self, node):
+        randint = self.rng.randint
+        max_depth = self.max_depth
+        items = node.items
+        min_items = node.min_items or 0
+        max_items = node.max_items
+        if isinstance(items, tuple):
+            item_generators = [self.compile(item) for item in items]
+            additional_items = node.additional_items
+            if additional_items is False:
+                limit = len(item_generators)
+            else:
+                limit = len(item_generators) + _DEFAULT_MAX_LENGTH
+                item_generators.append(self.compile(
+                    _AnyNode() if additional_items is True else additional_items))
+        else:
+            item_generators = [self.compile(items if items is not None else _AnyNode())]
+            limit = min_items + _DEFAULT_MAX_LENGTH
+        if max_items is None or max_items > limit:
+            max_items = max(limit, min_items)
+        if min_items > max_items:
+            raise ValueError(u'No arrays satisfy {0!r}'.format(node))
+        last = len(item_generators) - 1
+
+        def generate(depth):
+            length = min_items if depth >= max_depth else randint(min_items, max_items)
+            depth += 1
+            return [item_generators[min(i, last)](depth) for i in range(length)]
+
+        if node.unique_items:
+            return self._retry(generate, lambda value: not _has_duplicates(value),
+                               u'unique items of {0!r}'.format(node))
+        return generate
+
+    def _compile_object(self, node):
+        random_ = self.rng.random
+        max_depth = self.max_depth
+        required = set(node.required)
+        properties = sorted(iteritems(node.properties))
+        required_generators = [(key, self.compile(property_node))
+                               for key, property_node in properties if key in required]
+        # required keys without fields
+        required_generators.extend((key, self._compile_any())
+                                   for key in sorted(required - set(node.properties)))
+        optional_generators = [(key, self.compile(property_node))
+                               for key, property_node in properties if key not in required]
+        min_properties = node.min_properties or 0
+        max_properties = node.max_properties
+        if max_properties is None:
+            max_properties = len(required_generators) + len(optional_generators)
+        additional_properties = node.additional_properties
+        additional_generator = None
+        if additional_properties is not False and not node.pattern_properties:
+            additional_generator = self.compile(
+                _AnyNode() if additional_properties is True else additional_properties)
+        n_required = len(required_generators)
+        if n_required > max_properties or (
+                additional_generator is None and
+                n_required + len(optional_generators) < min_properties):
+            raise ValueError(u'No objects satisfy {0!r}'.format(node))
+
+        def generate(depth):
+            nested_depth = depth + 1
+            rv = {}
+            for key, generate_value in required_generators:
+                rv[key] = generate_value(nested_depth)
+            skipped = []
+            for key, generate_value in optional_generators:
+                if len(rv) < max_properties and depth < max_depth and random_() < 0.5:
+                    rv[key] = generate_value(nested_depth)
+                else:
+                    skipped.append((key, generate_value))
+            for key, generate_value in skipped:
+                if len(rv) >= min_properties:
+                    break
+                rv[key] = generate_value(nested_depth)
+            i = 0
+            while len(rv) < min_properties:
+                key = '_{0}'.format(i)
+                if key not in rv:
+                    rv[key] = additional_generator(nested_depth)
+                i += 1
+            return rv
+        return generate
+
+    def _compile_of(self, node):
+        choice = self.rng.choice
+        generators = [self.compile(nested_node) for nested_node in node.nodes]
+        if node.keyword == 'allOf':
+            def generate(depth):
+                rv = None
+                for generate_value in generators:
+                    value = generate_value(depth)
+                    if isinstance(rv, dict) and isinstance(value, dict):
+                        rv.update(value)
+                    else:
+                        rv = value
+                return rv
+        else:
+            def generate(depth):
+                return choice(generators)(depth)
+        if node.keyword == 'anyOf':
+            return generate
+        return self._retry(generate, node.is_valid,
+                           u'a value of {0!r}'.format(node.keyword))
+
+
+def _generate_date_time(rng, random_string):
+    return u'{0:04d}-{1:02d}-{2:02d}T{3:02d}:{4:02d}:{5:02d}Z'.format(
+        rng.randint(1970, 2037), rng.randint(1, 12), rng.randint(1, 28),
+        rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 59))
+
+
+def _generate_email(rng, random_string):
+    return u'{0}@{1}.com'.format(random_string(rng.randint(1, 8)),
+                                 random_string(rng.randint(1, 8)))
+
+
+def _generate_ipv4(rng, random_string):
+    return u'{0}.{1}.{2}.{3}'.format(*[rng.randint(0, 255) for _ in range(4)])
+
+
+def _generate_uri(rng, random_string):
+    return u'http://{0}.com/{1}'.format(random_string(rng.randint(1, 8)),
+                                        random_string(rng.randint(0, 8)))
+
+
+_FORMATS = {
+    'date-time': _generate_date_time,
+    'email': _generate_email,
+    'ipv4': _generate_ipv4,
+    'uri': _generate_uri,
+}
+
+
+class InstanceGenerator(object):
+    """Generates random valid instances of a document or a field.
+
+    Strings are generated from ASCII letters and digits. The values of
+    ``date-time``, ``email``, ``ipv4`` and ``uri`` formats are generated by construction,
+    as well as the strings matching patterns that consist of literals, character
+    classes, groups, alternations and repetitions. Strings of other formats and patterns
+    are generated by retrying, which only works if they are permissive.
+
+    :param field_or_document: A field or a document.
+    :type field_or_document: :class:`.BaseField` or subclass of :class:`.Document`
+    :param str role: A role.
+    :param seed: A seed of the random number generator. Generators with the same seed
+                 produce the same instances.
+    :param int max_depth:
+        A depth of objects and arrays starting from which optional properties are
+        omitted and arrays are of the minimum length. Limits the size of
+        instances of recursive documents.
+    :raises:
+        :class:`ValueError` if the constraints of a field obviously can not be satisfied
+        (e.g., ``min_length`` is greater than ``max_length``)
+    """
+
+    def __init__(self, field_or_document, role=DEFAULT_ROLE, seed=None, max_depth=4):
+        if isinstance(field_or_document, type) and issubclass(field_or_document, Document):
+            validator = field_or_document.get_validator(role=role)
+        else:
+            validator = compile_validator(field_or_document, role=role)
+        self._random = random.Random(seed)
+        self._generate = _Compiler(self._random, max_depth).compile(validator._node)
+        self.role = role  #:
+
+    def seed(self, seed):
+        """Resets the random number generator."""
+        self._random.seed(seed)
+
+    def generate(self):
+        """Returns a random valid instance.
+
+        :raises: :class:`ValueError` if a value satisfying the constraints
+                 has not been found in a number of attempts
+        """
+        return self._generate(0)
+
+    def iter_instances(self, count=None):
+        """Lazily yields ``count`` instances or infinitely many if ``count`` is ``None``."""
+        generate = self._generate
+        if count is None:
+            while True:
+                yield generate(0)
+        for _ in range(count):
+            yield generate(0)
+
+    __iter__ = iter_instances
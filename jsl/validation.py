@@ -0,0 +1,1075 @@
+# coding: utf-8
+"""
+Validation of instances against documents and fields.
+
+A document or a field is compiled for a role into a tree of nodes: all the
+:class:`resolvables <.Resolvable>` are resolved, regular expressions are compiled
+and format checkers are looked up once, so validating an instance does not
+interpret the field description again.
+"""
+import random
+import re
+
+from .document import Document, _INHERITANCE_MODES
+from .exceptions import (SchemaGenerationException, ValidationError, processing,
+                         DocumentStep, AttributeStep, ItemStep)
+from .fields import (BaseField, StringField, NumberField, IntField, BooleanField, NullField,
+                     ArrayField, DictField, NotField, DocumentField, RefField)
+from .fields.compound import BaseOfField
+from .roles import DEFAULT_ROLE, Resolvable
+from ._compat import iteritems, integer_types, string_types, OrderedDict
+
+
+__all__ = [
+    'FAIL_FAST', 'COLLECT_ALL', 'Validator', 'ValidationCache', 'SamplingValidator',
+    'compile_validator',
+]
+
+FAIL_FAST = 'fail_fast'
+"""A validation mode: stop at the first violation."""
+COLLECT_ALL = 'collect_all'
+"""A validation mode: report every violation."""
+
+_NO_ERRORS = ()
+_NUMBER_TYPES = integer_types + (float,)
+
+
+def _is_bool(value):
+    return value is True or value is False
+
+
+def _in_enum(value, enum):
+    is_bool = _is_bool(value)
+    for choice in enum:
+        if choice == value and _is_bool(choice) == is_bool:
+            return True
+    return False
+
+
+def _has_duplicates(items):
+    try:
+        seen = set()
+        for item in items:
+            key = (_is_bool(item), item)
+            if key in seen:
+                return True
+            seen.add(key)
+        return False
+    except TypeError:
+        # unhashable items (objects or arrays)
+        for i, item in enumerate(items):
+            for other in items[i + 1:]:
+                if item == other and _is_bool(item) == _is_bool(other):
+                    return True
+        return False
+
+
+def _check(node, value, partial):
+    return node.is_partially_valid(value) if partial else node.is_valid(value)
+
+
+def _error(message, steps, attr=None, role=DEFAULT_ROLE):
+    if attr is not None:
+        steps = steps + (AttributeStep(attr, role=role),)
+    return ValidationError(message, steps)
+
+
+class _Node(object):
+    """A compiled field. Subclasses implement two methods:
+
+    * ``is_valid(value)`` that stops at the first violation and does not allocate
+      anything for error reporting;
+    * ``iter_errors(value, steps)`` that lazily yields every violation.
+      ``steps`` is a tuple of :class:`steps <.Step>` leading to ``value``.
+      Nested nodes are only visited if their ``is_valid`` returns ``False``,
+      so valid subtrees cost the same as in the fail-fast mode.
+
+    Nodes of objects also override ``is_partially_valid`` and ``iter_partial_errors``
+    that skip the checks which need all the keys to be present.
+
+    Nodes are pickled as their classes and constructor arguments.
+    """
+
+    #: Names of the constructor arguments, in order. The arguments
+    #: are stored in the attributes of the same names.
+    _args = ('role',)
+
+    def __init__(self, role=DEFAULT_ROLE):
+        self.role = role
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, name) for name in self._args)
+
+    def is_valid(self, value):  # pragma: no cover
+        raise NotImplementedError
+
+    def iter_errors(self, value, steps):  # pragma: no cover
+        raise NotImplementedError
+
+    def is_partially_valid(self, value):
+        return self.is_valid(value)
+
+    def iter_partial_errors(self, value, steps):
+        return self.iter_errors(value, steps)
+
+
+class _AnyNode(_Node):
+    def is_valid(self, value):
+        return True
+
+    def iter_errors(self, value, steps):
+        return iter(_NO_ERRORS)
+
+
+class _EnumNode(_Node):
+    _args = ('enum', 'node', 'role')
+
+    def __init__(self, enum, node, role=DEFAULT_ROLE):
+        self.enum = enum
+        self.node = node
+        super(_EnumNode, self).__init__(role=role)
+
+    def _get_enum(self):
+        enum = self.enum
+        return enum() if callable(enum) else enum
+
+    def is_valid(self, value):
+        return _in_enum(value, self._get_enum()) and self.node.is_valid(value)
+
+    def iter_errors(self, value, steps):
+        if not _in_enum(value, self._get_enum()):
+            yield _error(u'{0!r} is not one of {1!r}'.format(value, list(self._get_enum())),
+                         steps, 'enum', self.role)
+        for error in self.node.iter_errors(value, steps):
+            yield error
+
+    def is_partially_valid(self, value):
+        return self.node.is_partially_valid(value)
+
+    def iter_partial_errors(self, value, steps):
+        return self.node.iter_partial_errors(value, steps)
+
+
+class _NullNode(_Node):
+    def is_valid(self, value):
+        return value is None
+
+    def iter_errors(self, value, steps):
+        if value is not None:
+            yield _error(u'{0!r} is not null'.format(value), steps)
+
+
+class _BooleanNode(_Node):
+    def is_valid(self, value):
+        return value is True or value is False
+
+    def iter_errors(self, value, steps):
+        if not (value is True or value is False):
+            yield _error(u'{0!r} is not a boolean'.format(value), steps)
+
+
+class _StringNode(_Node):
+    _args = ('min_length', 'max_length', 'pattern', 'format', 'format_checker', 'role')
+
+    def __init__(self, min_length=None, max_length=None, pattern=None,
+                 format=None, format_checker=None, role=DEFAULT_ROLE):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.pattern = pattern
+        self.format = format
+        self.format_checker = format_checker
+        super(_StringNode, self).__init__(role=role)
+
+    def is_valid(self, value):
+        if not isinstance(value, string_types):
+            return False
+        if self.min_length is not None and len(value) < self.min_length:
+            return False
+        if self.max_length is not None and len(value) > self.max_length:
+            return False
+        if self.pattern is not None and self.pattern.search(value) is None:
+            return False
+        if self.format_checker is not None and not self.format_checker(value):
+            return False
+        return True
+
+    def iter_errors(self, value, steps):
+        if not isinstance(value, string_types):
+            yield _error(u'{0!r} is not a string'.format(value), steps)
+            return
+        role = self.role
+        if self.min_length is not None and len(value) < self.min_length:
+            yield _error(u'{0!r} is too short'.format(value), steps, 'min_length', role)
+        if self.max_length is not None and len(value) > self.max_length:
+            yield _error(u'{0!r} is too long'.format(value), steps, 'max_length', role)
+        if self.pattern is not None and self.pattern.search(value) is None:
+            yield _error(u'{0!r} does not match {1!r}'.format(value, self.pattern.pattern),
+                         steps, 'pattern', role)
+        if self.format_checker is not None and not self.format_checker(value):
+            yield _error(u'{0!r} is not a {1!r}'.format(value, self.format),
+                         steps, 'format', role)
+
+
+class _NumberNode(_Node):
+    _args = ('integer', 'multiple_of', 'minimum', 'maximum', 'exclusive_minimum',
+             'exclusive_maximum', 'role')
+
+    def __init__(self, integer=False, multiple_of=None, minimum=None, maximum=None,
+                 exclusive_minimum=False, exclusive_maximum=False, role=DEFAULT_ROLE):
+        self.integer = integer
+        self.types = integer_types if integer else _NUMBER_TYPES
+        self.type_name = 'an integer' if integer else 'a number'
+        self.multiple_of = multiple_of
+        self.minimum = minimum
+        self.maximum = maximum
+        self.exclusive_minimum = exclusive_minimum
+        self.exclusive_maximum = exclusive_maximum
+        super(_NumberNode, self).__init__(role=role)
+
+    def _is_multiple(self, value):
+        multiple_of = self.multiple_of
+        if isinstance(multiple_of, float) or isinstance(value, float):
+            quotient = value / multiple_of
+            try:
+                return int(quotient) == quotient
+            except (OverflowError, ValueError):
+                return False
+        return value % multiple_of == 0
+
+    def _is_below_minimum(self, value):
+        if self.exclusive_minimum:
+            return value <= self.minimum
+        return value < self.minimum
+
+    def _is_above_maximum(self, value):
+        if self.exclusive_maximum:
+            return value >= self.maximum
+        return value > self.maximum
+
+    def is_valid(self, value):
+        if not isinstance(value, self.types) or value is True or value is False:
+            return False
+        if self.minimum is not None and self._is_below_minimum(value):
+            return False
+        if self.maximum is not None and self._is_above_maximum(value):
+            return False
+        if self.multiple_of is not None and not self._is_multiple(value):
+            return False
+        return True
+
+    def iter_errors(self, value, steps):
+        if not isinstance(value, self.types) or value is True or value is False:
+            yield _error(u'{0!r} is not {1}'.format(value, self.type_name), steps)
+            return
+        role = self.role
+        if self.minimum is not None and self._is_below_minimum(value):
+            yield _error(u'{0!r} is less than the minimum of {1!r}'.format(value, self.minimum),
+                         steps, 'minimum', role)
+        if self.maximum is not None and self._is_above_maximum(value):
+            yield _error(u'{0!r} is greater than the maximum of {1!r}'.format(value, self.maximum),
+                         steps, 'maximum', role)
+        if self.multiple_of is not None and not self._is_multiple(value):
+            yield _error(u'{0!r} is not a multiple of {1!r}'.format(value, self.multiple_of),
+                         steps, 'multiple_of', role)
+
+
+class _ArrayNode(_Node):
+    _args = ('items', 'additional_items', 'min_items', 'max_items', 'unique_items', 'role')
+
+    def __init__(self, items=None, additional_items=True, min_items=None, max_items=None,
+                 unique_items=False, role=DEFAULT_ROLE):
+        #: A node all the items must be valid against, a tuple of nodes
+        #: (tuple typing) or ``None``.
+        self.items = items
+        #: A boolean or a node. Only used if :attr:`items` is a tuple.
+        self.additional_items = additional_items
+        self.min_items = min_items
+        self.max_items = max_items
+        self.unique_items = unique_items
+        super(_ArrayNode, self).__init__(role=role)
+
+    def is_valid(self, value):
+        if not isinstance(value, (list, tuple)):
+            return False
+        length = len(value)
+        if self.min_items is not None and length < self.min_items:
+            return False
+        if self.max_items is not None and length > self.max_items:
+            return False
+        items = self.items
+        if isinstance(items, tuple):
+            for node, item in zip(items, value):
+                if not node.is_valid(item):
+                    return False
+            if length > len(items):
+                additional_items = self.additional_items
+                if additional_items is False:
+                    return False
+                if additional_items is not True:
+                    for item in value[len(items):]:
+                        if not additional_items.is_valid(item):
+                            return False
+        elif items is not None:
+            is_valid = items.is_valid
+            for item in value:
+                if not is_valid(item):
+                    return False
+        if self.unique_items and _has_duplicates(value):
+            return False
+        return True
+
+    def _iter_item_errors(self, node, value, start, steps):
+        for i, item in enumerate(value, start):
+            if not node.is_valid(item):
+                for error in node.iter_errors(item, steps + (ItemStep(i, role=self.role),)):
+                    yield error
+
+    def iter_errors(self, value, steps):
+        if not isinstance(value, (list, tuple)):
+            yield _error(u'{0!r} is not an array'.format(value), steps)
+            return
+        role = self.role
+        length = len(value)
+        if self.min_items is not None and length < self.min_items:
+            yield _error(u'{0!r} is too short'.format(value), steps, 'min_items', role)
+        if self.max_items is not None and length > self.max_items:
+            yield _error(u'{0!r} is too long'.format(value), steps, 'max_items', role)
+        items = self.items
+        if isinstance(items, tuple):
+            for i, (node, item) in enumerate(zip(items, value)):
+                if not node.is_valid(item):
+                    for error in node.iter_errors(item, steps + (ItemStep(i, role=role),)):
+                        yield error
+            if length > len(items):
+                additional_items = self.additional_items
+                if additional_items is False:
+                    yield _error(u'Additional items are not allowed', steps,
+                                 'additional_items', role)
+                elif additional_items is not True:
+                    for error in self._iter_item_errors(additional_items, value[len(items):],
+                                                        len(items), steps):
+                        yield error
+        elif items is not None:
+            for error in self._iter_item_errors(items, value, 0, steps):
+                yield error
+        if self.unique_items and _has_duplicates(value):
+            yield _error(u'{0!r} has non-unique items'.format(value), steps, 'unique_items', role)
+
+
+class _ObjectNode(_Node):
+    _args = ('properties', 'required', 'pattern_properties', 'additional_properties',
+             'min_properties', 'max_properties', 'role')
+
+    def __init__(self, properties=None, required=(), pattern_properties=(),
+                 additional_properties=True, min_properties=None, max_properties=None,
+                 role=DEFAULT_ROLE):
+        #: A dictionary mapping property keys to nodes.
+        self.properties = properties or {}
+        #: A tuple of required keys.
+        self.required = tuple(required)
+        #: A tuple of pairs (compiled regular expression, node).
+        self.pattern_properties = tuple(pattern_properties)
+        #: A boolean or a node.
+        self.additional_properties = additional_properties
+        self.min_properties = min_properties
+        self.max_properties = max_properties
+        super(_ObjectNode, self).__init__(role=role)
+
+    def is_valid(self, value):
+        if not isinstance(value, dict):
+            return False
+        if self.min_properties is not None and len(value) < self.min_properties:
+            return False
+        if self.max_properties is not None and len(value) > self.max_properties:
+            return False
+        for key in self.required:
+            if key not in value:
+                return False
+        return self._are_items_valid(value)
+
+    def is_partially_valid(self, value):
+        if not isinstance(value, dict):
+            return False
+        if self.max_properties is not None and len(value) > self.max_properties:
+            return False
+        return self._are_items_valid(value)
+
+    def _are_items_valid(self, value):
+        properties = self.properties
+        pattern_properties = self.pattern_properties
+        additional_properties = self.additional_properties
+        for key, item in value.items():
+            node = properties.get(key)
+            matched = node is not None
+            if matched and not node.is_valid(item):
+                return False
+            for regex, node in pattern_properties:
+                if regex.search(key) is not None:
+                    matched = True
+                    if not node.is_valid(item):
+                        return False
+            if not matched and additional_properties is not True:
+                if additional_properties is False or not additional_properties.is_valid(item):
+                    return False
+        return True
+
+    def iter_errors(self, value, steps):
+        return self._iter_errors(value, steps, partial=False)
+
+    def iter_partial_errors(self, value, steps):
+        return self._iter_errors(value, steps, partial=True)
+
+    def _iter_errors(self, value, steps, partial):
+        if not isinstance(value, dict):
+            yield _error(u'{0!r} is not an object'.format(value), steps)
+            return
+        role = self.role
+        if (not partial and self.min_properties is not None and
+                len(value) < self.min_properties):
+            yield _error(u'{0!r} does not have enough properties'.format(value),
+                         steps, 'min_properties', role)
+        if self.max_properties is not None and len(value) > self.max_properties:
+            yield _error(u'{0!r} has too many properties'.format(value),
+                         steps, 'max_properties', role)
+        if not partial:
+            for key in self.required:
+                if key not in value:
+                    yield _error(u'{0!r} is a required property'.format(key),
+                                 steps, 'required', role)
+        properties = self.properties
+        additional_properties = self.additional_properties
+        for key, item in value.items():
+            nodes = []
+            node = properties.get(key)
+            if node is not None:
+                nodes.append(node)
+            for regex, node in self.pattern_properties:
+                if regex.search(key) is not None:
+                    nodes.append(node)
+            if not nodes:
+                if additional_properties is False:
+                    yield _error(u'Additional property {0!r} is not allowed'.format(key),
+                                 steps, 'additional_properties', role)
+                elif additional_properties is not True:
+                    nodes.append(additional_properties)
+            for node in nodes:
+                if not node.is_valid(item):
+                    for error in node.iter_errors(item, steps + (ItemStep(key, role=role),)):
+                        yield error
+
+
+class _OfNode(_Node):
+    _args = ('keyword', 'nodes', 'role')
+
+    def __init__(self, keyword, nodes, role=DEFAULT_ROLE):
+        #: ``"allOf"``, ``"anyOf"`` or ``"oneOf"``.
+        self.keyword = keyword
+        self.nodes = tuple(nodes)
+        super(_OfNode, self).__init__(role=role)
+
+    def is_valid(self, value):
+        return self._is_valid(value, partial=False)
+
+    def is_partially_valid(self, value):
+        return self._is_valid(value, partial=True)
+
+    def _is_valid(self, value, partial):
+        keyword = self.keyword
+        if keyword == 'allOf':
+            for node in self.nodes:
+                if not _check(node, value, partial):
+                    return False
+            return True
+        elif keyword == 'anyOf':
+            for node in self.nodes:
+                if _check(node, value, partial):
+                    return True
+            return False
+        else:
+            matched = False
+            for node in self.nodes:
+                if _check(node, value, partial):
+                    if matched:
+                        return False
+                    matched = True
+            return matched
+
+    def iter_errors(self, value, steps):
+        return self._iter_errors(value, steps, partial=False)
+
+    def iter_partial_errors(self, value, steps):
+        return self._iter_errors(value, steps, partial=True)
+
+    def _iter_errors(self, value, steps, partial):
+        keyword = self.keyword
+        if keyword == 'allOf':
+            for node in self.nodes:
+                if not _check(node, value, partial):
+                    errors = (node.iter_partial_errors(value, steps) if partial
+                              else node.iter_errors(value, steps))
+                    for error in errors:
+                        yield error
+        elif not self._is_valid(value, partial):
+            if keyword == 'anyOf':
+                message = u'{0!r} is not valid under any of the given schemas'
+            elif any(_check(node, value, partial) for node in self.nodes):
+                message = u'{0!r} is valid under more than one of the given schemas'
+            else:
+                message = u'{0!r} is not valid under any of the given schemas'
+            yield _error(message.format(value), steps, 'fields', self.role)
+
+
+class _NotNode(_Node):
+    _args = ('node', 'role')
+
+    def __init__(self, node, role=DEFAULT_ROLE):
+        self.node = node
+        super(_NotNode, self).__init__(role=role)
+
+    def is_valid(self, value):
+        return not self.node.is_valid(value)
+
+    def iter_errors(self, value, steps):
+        if self.node.is_valid(value):
+            yield _error(u'{0!r} is not allowed'.format(value), steps, 'field', self.role)
+
+
+class _DocumentNode(_Node):
+    _args = ('document_cls', 'role')
+
+    def __init__(self, document_cls, role=DEFAULT_ROLE):
+        self.document_cls = document_cls
+        #: A node of the document contents. Set after the node is created
+        #: to allow recursive references.
+        self.node = None
+        super(_DocumentNode, self).__init__(role=role)
+
+    def __reduce__(self):
+        # the contents are restored after the node is created, so that
+        # recursive references are resolved to it
+        return type(self), (self.document_cls, self.role), {'node': self.node}
+
+    def is_valid(self, value):
+        return self.node.is_valid(value)
+
+    def iter_errors(self, value, steps):
+        return self.node.iter_errors(
+            value, steps + (DocumentStep(self.document_cls, role=self.role),))
+
+    def is_partially_valid(self, value):
+        return self.node.is_partially_valid(value)
+
+    def iter_partial_errors(self, value, steps):
+        return self.node.iter_partial_errors(
+            value, steps + (DocumentStep(self.document_cls, role=self.role),))
+
+
+class _Compiler(object):
+    """Compiles fields and documents into nodes."""
+
+    def __init__(self):
+        self._document_nodes = {}
+
+    def compile_document(self, document_cls, role):
+        key = (document_cls, role)
+        node = self._document_nodes.get(key)
+        if node is not None:
+            return node
+        node = self._document_nodes[key] = _DocumentNode(document_cls, role=role)
+        with processing(DocumentStep(document_cls, role=role)):
+            contents = self.compile_field(document_cls._backend, role)
+        if document_cls._parent_documents:
+            nodes = [self.compile_document(parent_document, role)
+                     for parent_document in document_cls._parent_documents]
+            nodes.append(contents)
+            contents = _OfNode(_INHERITANCE_MODES[document_cls._options.inheritance_mode],
+                               nodes, role=role)
+        node.node = contents
+        return node
+
+    def compile_field(self, field, role):
+        if isinstance(field, DocumentField):
+            return self._compile_document_field(field, role)
+        elif isinstance(field, RefField):
+            # a JSON pointer can not be followed without the whole schema
+            return _AnyNode(role=role)
+
+        if isinstance(field, StringField):
+            node = self._compile_string_field(field, role)
+        elif isinstance(field, NumberField):
+            node = self._compile_number_field(field, role)
+        elif isinstance(field, BooleanField):
+            node = _BooleanNode(role=role)
+        elif isinstance(field, NullField):
+            node = _NullNode(role=role)
+        elif isinstance(field, ArrayField):
+            node = self._compile_array_field(field, role)
+        elif isinstance(field, DictField):
+            node = self._compile_dict_field(field, role)
+        elif isinstance(field, BaseOfField):
+            node = self._compile_of_field(field, role)
+        elif isinstance(field, NotField):
+            node = self._compile_not_field(field, role)
+        else:
+            raise TypeError(u'{0!r} can not be compiled into a validator'.format(field))
+
+        enum = field.resolve_attr('_enum', role).value
+        if enum:
+            node = _EnumNode(enum, node, role=role)
+        return node
+
+    def _compile_document_field(self, field, role):
+        return self.compile_document(field.document_cls, field.get_nested_role(role))
+
+    def _compile_string_field(self, field, role):
+        pattern = field.resolve_attr('pattern', role).value
+        return _StringNode(
+            min_length=field.resolve_attr('min_length', role).value,
+            max_length=field.resolve_attr('max_length', role).value,
+            pattern=re.compile(pattern) if pattern else None,
+            format=field.resolve_attr('format', role).value,
+            format_checker=field.get_format_checker(role=role),
+            role=role,
+        )
+
+    def _compile_number_field(self, field, role):
+        return _NumberNode(
+            integer=isinstance(field, IntField),
+            multiple_of=field.resolve_attr('multiple_of', role).value,
+            minimum=field.resolve_attr('minimum', role).value,
+            maximum=field.resolve_attr('maximum', role).value,
+            exclusive_minimum=bool(field.resolve_attr('exclusive_minimum', role).value),
+            exclusive_maximum=bool(field.resolve_attr('exclusive_maximum', role).value),
+            role=role,
+        )
+
+    def _compile_array_field(self, field, role):
+        items_node = None
+        items, items_role = field.resolve_attr('items', role)
+        if items is not None:
+            with processing(AttributeStep('items', role=role)):
+                if isinstance(items, (list, tuple)):
+                    items_nodes = []
+                    for i, item in enumerate(items):
+                        with processing(ItemStep(i, role=items_role)):
+                            if not isinstance(item, Resolvable):
+                                raise SchemaGenerationException(
+                                    u'{0} is not resolvable'.format(item))
+                            item, item_role = item.resolve(items_role)
+                            if item is None:
+                                continue
+                            items_nodes.append(self.compile_field(item, item_role))
+                    if not items_nodes:
+                        raise SchemaGenerationException(u'Items tuple is empty')
+                    items_node = tuple(items_nodes)
+                elif isinstance(items, BaseField):
+                    items_node = self.compile_field(items, items_role)
+                else:
+                    raise SchemaGenerationException(
+                        u'{0} is not a BaseField, a list or a tuple'.format(items))
+
+        additional_items_node = True
+        additional_items, additional_items_role = field.resolve_attr('additional_items', role)
+        if additional_items is not None:
+            with processing(AttributeStep('additional_items', role=role)):
+                if isinstance(additional_items, bool):
+                    additional_items_node = additional_items
+                elif isinstance(additional_items, BaseField):
+                    additional_items_node = self.compile_field(additional_items,
+                                                               additional_items_role)
+                else:
+                    raise SchemaGenerationException(
+                        u'{0} is not a BaseField or a boolean'.format(additional_items))
+
+        return _ArrayNode(
+            items=items_node,
+            additional_items=additional_items_node,
+            min_items=field.resolve_attr('min_items', role).value,
+            max_items=field.resolve_attr('max_items', role).value,
+            unique_items=bool(field.resolve_attr('unique_items', role).value),
+            role=role,
+        )
+
+    def _compile_properties(self, field, attr, role):
+        properties, properties_role = field.resolve_attr(attr, role)
+        nodes = []
+        required = []
+        if properties is None:
+            return nodes, required
+        with processing(AttributeStep(attr, role=role)):
+            if not isinstance(properties, dict):
+                raise SchemaGenerationException(u'{0} is not a dict'.format(properties))
+            for prop, prop_field in iteritems(properties):
+                with processing(ItemStep(prop, role=properties_role)):
+                    if not isinstance(prop_field, Resolvable):
+                        raise SchemaGenerationException(
+                            u'{0} is not resolvable'.format(prop_field))
+                    prop_field, prop_field_role = prop_field.resolve(properties_role)
+                    if prop_field is None:
+                        continue
+                    if attr == 'properties':
+                        key = field._get_property_key(prop, prop_field)
+                        if prop_field.resolve_attr('required', prop_field_role).value:
+                            required.append(key)
+                    else:
+                        key = re.compile(prop)
+                    nodes.append((key, self.compile_field(prop_field, prop_field_role)))
+        return nodes, required
+
+    def _compile_dict_field(self, field, role):
+        properties, required = self._compile_properties(field, 'properties', role)
+        pattern_properties, _ = self._compile_properties(field, 'pattern_properties', role)
+
+        additional_properties_node = True
+        additional_properties, additional_properties_role = \
+            field.resolve_attr('additional_properties', role)
+        if additional_properties is not None:
+            with processing(AttributeStep('additional_properties', role=role)):
+                if isinstance(additional_properties, bool):
+                    additional_properties_node = additional_properties
+                elif isinstance(additional_properties, BaseField):
+                    additional_properties_node = self.compile_field(
+                        additional_properties, additional_properties_role)
+                else:
+                    raise SchemaGenerationException(
+                        u'{0} is not a BaseField or a boolean'.format(additional_properties))
+
+        return _ObjectNode(
+            properties=dict(properties),
+            required=required,
+            pattern_properties=pattern_properties,
+            additional_properties=additional_properties_node,
+            min_properties=field.resolve_attr('min_properties', role).value,
+            max_properties=field.resolve_attr('max_properties', role).value,
+            role=role,
+        )
+
+    def _compile_of_field(self, field, role):
+        nodes = []
+        with processing(AttributeStep('fields', role=role)):
+            fields, fields_role = field.resolve_attr('fields', role)
+            if not isinstance(fields, (list, tuple)):
+                raise SchemaGenerationException(u'{0} is not a list or a tuple'.format(fields))
+            for i, nested_field in enumerate(fields):
+                with processing(ItemStep(i, role=fields_role)):
+                    if not isinstance(nested_field, Resolvable):
+                        raise SchemaGenerationException(
+                            u'{0} is not resolvable'.format(nested_field))
+                    nested_field, nested_field_role = nested_field.resolve(fields_role)
+                    if nested_field is None:
+                        continue
+                    if not isinstance(nested_field, BaseField):
+                        raise SchemaGenerationException(
+                            u'{0} is not a BaseField.'.format(nested_field))
+                    nodes.append(self.compile_field(nested_field, nested_field_role))
+            if not nodes:
+                raise SchemaGenerationException(u'Fields list is empty')
+        return _OfNode(field._KEYWORD, nodes, role=role)
+
+    def _compile_not_field(self, field, role):
+        with processing(AttributeStep('field', role=role)):
+            nested_field, nested_field_role = field.resolve_attr('field', role)
+            if not isinstance(nested_field, BaseField):
+                raise SchemaGenerationException(u'{0} is not a BaseField.'.format(nested_field))
+            return _NotNode(self.compile_field(nested_field, nested_field_role), role=role)
+
+
+class Validator(object):
+    """A validator of instances of a document or a field, compiled for a role.
+    Use :func:`compile_validator` or :meth:`.Document.get_validator` to create one.
+
+    :param node: A compiled root node.
+    :param str role: A role the validator is compiled for.
+    """
+
+    def __init__(self, node, role=DEFAULT_ROLE):
+        self._node = node
+        #: A role the validator is compiled for.
+        self.role = role
+
+    def is_valid(self, instance, partial=False):
+        """Returns ``True`` if ``instance`` is valid. Stops at the first violation
+        and allocates nothing for error reporting.
+
+        :param instance: An instance to validate.
+        :param bool partial:
+            If ``True``, validates ``instance`` as a partial update (e.g., a body of
+            a PATCH request): ``required`` and ``min_properties`` of the outermost
+            object are not checked, and only the keys present in ``instance`` are
+            visited. The values of these keys are validated in full.
+        :rtype: bool
+        """
+        if partial:
+            return self._node.is_partially_valid(instance)
+        return self._node.is_valid(instance)
+
+    def iter_errors(self, instance, partial=False):
+        """Lazily yields a :class:`.ValidationError` for every violation.
+
+        :param bool partial: See :meth:`is_valid`.
+        :rtype: iterable of :class:`.ValidationError`
+        """
+        if partial:
+            return self._node.iter_partial_errors(instance, ())
+        return self._node.iter_errors(instance, ())
+
+    def get_errors(self, instance, mode=COLLECT_ALL, partial=False):
+        """Returns a tuple of violations.
+
+        :param instance: An instance to validate.
+        :param str mode:
+            :data:`COLLECT_ALL` (default) to report every violation or
+            :data:`FAIL_FAST` to report at most one.
+        :param bool partial: See :meth:`is_valid`.
+        :rtype: tuple of :class:`.ValidationError`
+        """
+        if mode not in (FAIL_FAST, COLLECT_ALL):
+            raise ValueError(
+                'Unknown validation mode: {0!r}. Must be one of the following: {1!r}'.format(
+                    mode, sorted([FAIL_FAST, COLLECT_ALL])))
+        if self.is_valid(instance, partial=partial):
+            return _NO_ERRORS
+        if mode == FAIL_FAST:
+            return (next(self.iter_errors(instance, partial=partial)),)
+        return tuple(self.iter_errors(instance, partial=partial))
+
+    def validate(self, instance, partial=False):
+        """Raises the first found :class:`.ValidationError` if ``instance`` is not valid.
+
+        :param bool partial: See :meth:`is_valid`.
+        :raises: :class:`.ValidationError`
+        """
+        if not self.is_valid(instance, partial=partial):
+            raise next(self.iter_errors(instance, partial=partial))
+
+    def ais_valid(self, instance, partial=False):
+        """An asynchronous version of :meth:`is_valid`. Large instances are validated
+        in an executor (see :mod:`jsl.aio`). Requires Python 3.5+.
+
+        :rtype: awaitable
+        """
+        from .aio import is_valid
+        return is_valid(self, instance, partial=partial)
+
+    def aget_errors(self, instance, mode=COLLECT_ALL, partial=False):
+        """An asynchronous version of :meth:`get_errors`. Requires Python 3.5+.
+
+        :rtype: awaitable
+        """
+        from .aio import get_errors
+        return get_errors(self, instance, mode=mode, partial=partial)
+
+    def avalidate(self, instance, partial=False):
+        """An asynchronous version of :meth:`validate`. Requires Python 3.5+.
+
+        :rtype: awaitable
+        """
+        from .aio import validate
+        return validate(self, instance, partial=partial)
+
+
+def compile_validator(field_or_document, role=DEFAULT_ROLE):
+    """Compiles a :class:`.Validator`.
+
+    :param field_or_document: A field or a document to validate instances against.
+    :type field_or_document: :class:`.BaseField` or subclass of :class:`.Document`
+    :param str role: A role.
+    :raises: :class:`.SchemaGenerationException`
+    :rtype: :class:`.Validator`
+    """
+    compiler = _Compiler()
+    if isinstance(field_or_document, type) and issubclass(field_or_document, Document):
+        node = compiler.compile_document(field_or_document, role)
+    else:
+        node = compiler.compile_field(field_or_document, role)
+    return Validator(node, role=role)
+
+
+def _fingerprint(value):
+    """Returns a hashable structural copy of a JSON-like ``value``. Equal fingerprints
+    mean the values are equal and have the same types (so ``1``, ``1.0`` and ``True``
+    are told apart).
+
+    :raises: :class:`TypeError` if ``value`` contains unhashable non-JSON objects
+    """
+    value_type = type(value)
+    if value_type is dict or isinstance(value, dict):
+        return dict, frozenset([(key, _fingerprint(item)) for key, item in value.items()])
+    elif value_type is list or value_type is tuple:
+        return list, tuple([_fingerprint(item) for item in value])
+    hash(value)
+    return value_type, value
+
+
+class ValidationCache(object):
+    """A bounded LRU cache of validation results of a document instances.
+    Results are keyed by a role and a structural fingerprint of an instance,
+    so repeated instances (even if they are different objects) are validated only once.
+
+    Fingerprints are exact, not just hashes: a cache hit never returns a result
+    of a different instance. Instances that contain unhashable non-JSON objects
+    bypass the cache. Computing a fingerprint takes a single pass over an instance,
+    so the cache pays off for documents with patterns, formats, nested documents
+    or alternatives (:class:`.OneOfField` and alike).
+
+    :param document_cls: A document to validate instances against.
+    :type document_cls: subclass of :class:`.Document`
+    :param int maxsize: A maximum number of cached results.
+    """
+
+    def __init__(self, document_cls, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError('maxsize must be positive, not {0!r}'.format(maxsize))
+        self.document_cls = document_cls  #:
+        self.maxsize = maxsize  #:
+        #: A number of lookups that found a cached result.
+        self.hits = 0
+        #: A number of lookups that did not find a cached result.
+        self.misses = 0
+        self._results = OrderedDict()
+
+    @property
+    def hit_rate(self):
+        """A fraction of lookups that found a cached result (``0.0`` if there were none)."""
+        lookups = self.hits + self.misses
+        return float(self.hits) / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        """Removes all cached results and resets the statistics."""
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def is_valid(self, instance, role=DEFAULT_ROLE, partial=False):
+        """The same as :meth:`.Validator.is_valid`, but the result is cached.
+
+        :rtype: bool
+        """
+        try:
+            key = (role, partial, _fingerprint(instance))
+        except TypeError:
+            return self.document_cls.get_validator(role=role).is_valid(
+                instance, partial=partial)
+        results = self._results
+        try:
+            # re-insert the result to mark it as the most recently used
+            result = results.pop(key)
+        except KeyError:
+            self.misses += 1
+            result = self.document_cls.get_validator(role=role).is_valid(
+                instance, partial=partial)
+            if len(results) >= self.maxsize:
+                results.popitem(last=False)
+        else:
+            self.hits += 1
+        results[key] = result
+        return result
+
+    def get_errors(self, instance, role=DEFAULT_ROLE, mode=COLLECT_ALL, partial=False):
+        """The same as :meth:`.Validator.get_errors`. Only the fact that an instance
+        is valid is cached: errors of an invalid instance are collected on each call.
+
+        :rtype: tuple of :class:`.ValidationError`
+        """
+        if self.is_valid(instance, role=role, partial=partial):
+            return _NO_ERRORS
+        return self.document_cls.get_validator(role=role).get_errors(
+            instance, mode=mode, partial=partial)
+
+    def validate(self, instance, role=DEFAULT_ROLE, partial=False):
+        """The same as :meth:`.Validator.validate`, but the result is cached.
+
+        :raises: :class:`.ValidationError`
+        """
+        if not self.is_valid(instance, role=role, partial=partial):
+            self.document_cls.get_validator(role=role).validate(instance, partial=partial)
+
+
+class SamplingValidator(object):
+    """Validates only a sample of instances and collects statistics of
+    the violations found. Instances that are not sampled are not looked at.
+
+    Exactly one of ``fraction`` and ``every`` must be specified.
+
+    :param validator: A validator to validate sampled instances with.
+    :type validator: :class:`.Validator`
+    :param float fraction:
+        A probability of an instance to be sampled, from ``0`` to ``1``.
+    :param int every:
+        If specified, every ``every``-th instance is sampled (starting from the first one).
+    :param seed: A seed of the random number generator used when ``fraction`` is specified.
+    """
+
+    def __init__(self, validator, fraction=None, every=None, seed=None):
+        if (fraction is None) == (every is None):
+            raise ValueError('Exactly one of fraction and every must be specified')
+        if fraction is not None and not 0 <= fraction <= 1:
+            raise ValueError('fraction must be between 0 and 1, not {0!r}'.format(fraction))
+        if every is not None and every < 1:
+            raise ValueError('every must be positive, not {0!r}'.format(every))
+        self.validator = validator  #:
+        self.fraction = fraction  #:
+        self.every = every  #:
+        self._random = random.Random(seed).random
+        self._countdown = 1
+        self._skipped = 0
+        #: A number of validated instances.
+        self.sampled = 0
+        #: A number of validated instances that turned out to be invalid.
+        self.invalid = 0
+        #: A dictionary mapping :attr:`paths <.ValidationError.path>` of invalid values
+        #: to the numbers of violations found there.
+        self.violations = {}
+
+    @property
+    def seen(self):
+        """A number of instances passed to :meth:`check`."""
+        return self.sampled + self._skipped
+
+    def _is_sampled(self):
+        if self.every is not None:
+            self._countdown -= 1
+            if self._countdown:
+                return False
+            self._countdown = self.every
+            return True
+        return self._random() < self.fraction
+
+    def check(self, instance):
+        """Validates ``instance`` if it is sampled and records every violation.
+
+        :returns: ``False`` if ``instance`` is sampled and invalid, ``True`` otherwise.
+        :rtype: bool
+        """
+        if not self._is_sampled():
+            self._skipped += 1
+            return True
+        self.sampled += 1
+        errors = self.validator.get_errors(instance)
+        if not errors:
+            return True
+        self.invalid += 1
+        violations = self.violations
+        for error in errors:
+            path = error.path
+            violations[path] = violations.get(path, 0) + 1
+        return False
+
+    def most_common(self, n=None):
+        """Returns a list of ``n`` pairs (path, number of violations) with the most
+        violations, from the most common to the least. Returns all of them if ``n``
+        is not specified.
+        """
+        rv = sorted(self.violations.items(), key=lambda item: item[1], reverse=True)
+        return rv if n is None else rv[:n]
+
+    def reset(self):
+        """Resets the statistics."""
+        self._countdown = 1
+        self._skipped = 0
+        self.sampled = 0
+        self.invalid = 0
+        self.violations = {}
@@ -0,0 +1,98 @@
+# coding: utf-8
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from jsl import Document, StringField, IntField, ArrayField, DocumentField, ValidationError
+
+if sys.version_info < (3, 5):
+    pytest.skip('asyncio API requires Python 3.5+', allow_module_level=True)
+
+import asyncio
+
+from jsl import aio
+
+
+class Item(Document):
+    name = StringField(required=True)
+    count = IntField(minimum=0)
+
+
+class Order(Document):
+    items = ArrayField(DocumentField(Item), required=True)
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super(RecordingExecutor, self).__init__(max_workers=1)
+        self.calls = 0
+
+    def submit(self, *args, **kwargs):
+        self.calls += 1
+        return super(RecordingExecutor, self).submit(*args, **kwargs)
+
+
+@pytest.fixture
+def executor():
+    executor = RecordingExecutor()
+    aio.configure(executor=executor, threshold=10)
+    yield executor
+    aio.configure()
+    executor.shutdown()
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_exceeds():
+    assert not aio._exceeds(1, 1)
+    assert aio._exceeds(1, 0)
+    assert not aio._exceeds({'a': [1, 2]}, 4)
+    assert aio._exceeds({'a': [1, 2]}, 3)
+    assert aio._exceeds([[]] * 100, 10)
+
+
+def test_aget_schema(executor):
+    assert run(Order.aget_schema(role='x', ordered=True)) == Order.get_schema(role='x', ordered=True)
+    assert executor.calls == 1
+
+
+def test_aget_validator(executor):
+    Item._cache.clear()
+    validator = run(Item.aget_validator())
+    assert executor.calls == 1
+    assert run(Item.aget_validator()) is validator is Item.get_validator()
+    assert executor.calls == 1
+
+
+def test_avalidate(executor):
+    validator = Order.get_validator()
+    small = {'items': [{'name': 'a'}]}
+    large = {'items': [{'name': 'a', 'count': i} for i in range(10)]}
+
+    assert run(validator.ais_valid(small))
+    run(validator.avalidate(small))
+    assert run(validator.aget_errors(small)) == ()
+    assert executor.calls == 0
+
+    assert run(validator.ais_valid(large))
+    assert executor.calls == 1
+
+    large['items'].append({'count': -1})
+    assert not run(validator.ais_valid(large))
+    errors = run(validator.aget_errors(large))
+    assert [e.path for e in errors] == [('items', 10), ('items', 10, 'count')]
+    with pytest.raises(ValidationError):
+        run(validator.avalidate(large, partial=True))
+    assert executor.calls == 4
+
+
+def test_configure():
+    with pytest.raises(ValueError):
+        aio.configure(threshold=-1)
@@ -0,0 +1,59 @@
+# coding: utf-8
+import io
+
+import pytest
+
+from jsl import Document, StringField, IntField, Scope
+from jsl.bundle import BundleWriter, SchemaBundle, write_bundle
+
+
+class User(Document):
+    class Options(object):
+        definition_id = 'user'
+
+    name = StringField()
+    with Scope('admin') as admin:
+        admin.age = IntField()
+
+
+class Group(Document):
+    class Options(object):
+        definition_id = 'group'
+
+    title = StringField()
+
+
+def test_bundle(tmpdir):
+    path = str(tmpdir.join('schemas.bundle'))
+    write_bundle(path, [User, Group], roles=['default', 'admin'])
+
+    with SchemaBundle(path) as bundle:
+        assert len(bundle) == 4
+        assert set(bundle) == set([('user', 'default'), ('user', 'admin'),
+                                   ('group', 'default'), ('group', 'admin')])
+        assert ('user', 'admin') in bundle
+        assert bundle.get_schema('user') == User.get_schema()
+        assert bundle.get_schema('user', role='admin') == User.get_schema(role='admin')
+        assert bundle.get_schema('group', role='admin') == Group.get_schema(role='admin')
+        assert bundle.get_bytes('group').startswith(b'{')
+        with pytest.raises(KeyError):
+            bundle.get_bytes('missing')
+
+
+def test_writer(tmpdir):
+    path = tmpdir.join('schemas.bundle')
+    with io.open(str(path), 'wb') as fp:
+        writer = BundleWriter(fp)
+        writer.add('a', 'default', {'type': 'string'})
+        writer.add('b', 'default', b'{"type":"integer"}')
+        with pytest.raises(ValueError):
+            writer.add('a', 'default', {})
+        writer.close()
+
+    with SchemaBundle(str(path)) as bundle:
+        assert bundle.get_schema('a') == {'type': 'string'}
+        assert bundle.get_bytes('b') == b'{"type":"integer"}'
+
+    path.write(b'not a bundle, but long enough', mode='wb')
+    with pytest.raises(ValueError):
+        SchemaBundle(str(path))
@@ -0,0 +1,113 @@
+# coding: utf-8
+import json
+
+import mock
+import pytest
+
+from jsl import Document, StringField, IntField, Scope
+from jsl.cli import load_document, validate_jsonl, main, _split
+
+
+class Record(Document):
+    name = StringField(required=True, min_length=1)
+    count = IntField(minimum=0)
+
+    with Scope('db') as db:
+        db.id = IntField(required=True)
+
+
+def write_lines(tmpdir, lines):
+    path = tmpdir.join('data.jsonl')
+    path.write(u'\n'.join(lines) + u'\n', mode='w')
+    return str(path)
+
+
+def make_lines(n):
+    lines = []
+    for i in range(n):
+        if i % 7 == 3:
+            lines.append(json.dumps({'name': '', 'count': -1}))
+        elif i % 11 == 5:
+            lines.append(u'{')
+        elif i % 13 == 0:
+            lines.append(u'')
+        else:
+            lines.append(json.dumps({'name': 'x', 'count': i}))
+    return lines
+
+
+def test_load_document():
+    assert load_document('test_cli:Record') is Record
+    for spec in ('test_cli', ':Record', 'test_cli:'):
+        with pytest.raises(ValueError):
+            load_document(spec)
+    with pytest.raises(AttributeError):
+        load_document('test_cli:Missing')
+
+
+def test_split():
+    data = b'a\nbb\n\nccc\nd'
+    for count in range(1, 10):
+        ranges = _split(data, len(data), count)
+        assert ranges[0][0] == 0
+        assert ranges[-1][1] == len(data)
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            assert end == start
+            assert data[start - 1:start] == b'\n'
+
+
+@pytest.mark.parametrize('jobs', [1, 3])
+def test_validate_jsonl(tmpdir, jobs):
+    lines = make_lines(200)
+    path = write_lines(tmpdir, lines)
+    errors = list(validate_jsonl(path, Record, jobs=jobs))
+
+    expected = []
+    validator = Record.get_validator()
+    for i, line in enumerate(lines, 1):
+        if line == u'{':
+            expected.append(i)
+        elif line:
+            expected.extend(i for _ in validator.iter_errors(json.loads(line)))
+    assert [line_number for line_number, _ in errors] == expected
+    assert errors[0] == (4, u"'' is too short (at /name)")
+
+    errors = list(validate_jsonl(path, Record, role='db', jobs=jobs))
+    assert len(errors) > len(expected)
+
+
+def test_validate_jsonl_valid_lines(tmpdir):
+    lines = [json.dumps({'name': 'x', 'count': i}) for i in range(10)]
+    path = write_lines(tmpdir, lines + [json.dumps({'name': ''})])
+    # valid lines are only checked with is_valid
+    with mock.patch.object(type(Record.get_validator()), 'iter_errors',
+                           autospec=True,
+                           side_effect=lambda self, instance, partial=False:
+                           self._node.iter_errors(instance, ())) as iter_errors:
+        errors = list(validate_jsonl(path, Record))
+    assert errors == [(11, u"'' is too short (at /name)")]
+    assert iter_errors.call_count == 1
+
+
+def test_validate_empty_jsonl(tmpdir):
+    path = tmpdir.join('empty.jsonl')
+    path.write(b'', mode='wb')
+    assert list(validate_jsonl(str(path), Record, jobs=2)) == []
+    with pytest.raises((IOError, OSError)):
+        validate_jsonl(str(tmpdir.join('missing.jsonl')), Record)
+
+
+def test_main(tmpdir, capsys):
+    pytest.importorskip('argparse')
+    path = write_lines(tmpdir, [json.dumps({'name': 'x'})])
+    assert main(['validate', 'test_cli:Record', path]) == 0
+    assert main(['validate', 'test_cli:Record', path, '--role', 'db', '--jobs', '2']) == 1
+    out, _ = capsys.readouterr()
+    assert out.startswith(u'{0}:1: '.format(path))
+
+    with pytest.raises(SystemExit):
+        main(['validate', 'test_cli:Missing', path])
+    with pytest.raises(SystemExit):
+        main(['validate', 'test_cli:Record', str(tmpdir.join('missing.jsonl'))])
+    _, err = capsys.readouterr()
+    assert 'can not read' in err
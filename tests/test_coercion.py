@@ -0,0 +1,136 @@
+# coding: utf-8
+import datetime
+import pickle
+
+import pytest
+
+from jsl import (Document, StringField, IntField, NumberField, BooleanField, NullField,
+                 ArrayField, DictField, DocumentField, OneOfField, DateTimeField, Scope,
+                 ALL_OF, RECURSIVE_REFERENCE_CONSTANT)
+from jsl.coercion import compile_coercion
+
+
+class Filter(Document):
+    min_price = NumberField()
+    in_stock = BooleanField()
+
+
+class Query(Document):
+    class Options(object):
+        additional_properties = IntField()
+
+    q = StringField()
+    page = IntField(enum=[1, 2, 3])
+    since = DateTimeField()
+    parent = NullField()
+    ids = ArrayField(IntField())
+    pair = ArrayField([IntField(), StringField()], additional_items=BooleanField())
+    limit = OneOfField([NullField(), IntField()])
+    filter = DocumentField(Filter)
+    extra = DictField(pattern_properties={'^x-': IntField()})
+
+    with Scope('admin') as admin:
+        admin.debug = BooleanField()
+
+
+@pytest.mark.parametrize('field,value,expected', [
+    (IntField(), '12', 12),
+    (IntField(), '-0', 0),
+    (IntField(), '1.5', '1.5'),
+    (IntField(), '01', '01'),
+    (IntField(), 12, 12),
+    (NumberField(), '1', 1),
+    (NumberField(), '-1.5e3', -1500.0),
+    (NumberField(), 'nan', 'nan'),
+    (NumberField(), '', ''),
+    (BooleanField(), 'true', True),
+    (BooleanField(), 'False', False),
+    (BooleanField(), '0', False),
+    (BooleanField(), 'yes', 'yes'),
+    (NullField(), '', None),
+    (NullField(), 'null', None),
+    (NullField(), 'none', 'none'),
+    (StringField(), '1', '1'),
+    (OneOfField([IntField(), BooleanField()]), '1', 1),
+    (OneOfField([BooleanField(), IntField()]), '1', True),
+    (OneOfField([BooleanField(), StringField()]), 'x', 'x'),
+])
+def test_scalars(field, value, expected):
+    coerced = compile_coercion(field)(value)
+    assert coerced == expected
+    assert type(coerced) is type(expected)
+
+
+def test_date_time():
+    coerce = compile_coercion(DateTimeField(), parse_dates=True)
+    value = coerce('2016-02-29T10:20:30.5+03:30')
+    assert value.replace(tzinfo=None) == datetime.datetime(2016, 2, 29, 10, 20, 30, 500000)
+    assert value.utcoffset() == datetime.timedelta(hours=3, minutes=30)
+    assert coerce('2016-01-01T00:00:00Z').utcoffset() == datetime.timedelta(0)
+    assert pickle.loads(pickle.dumps(value)) == value
+    assert coerce('2015-02-29T10:20:30Z') == '2015-02-29T10:20:30Z'
+    assert coerce('2016-12-31T23:59:60Z') == '2016-12-31T23:59:60Z'
+    assert compile_coercion(DateTimeField())('2016-01-01T00:00:00Z') == '2016-01-01T00:00:00Z'
+
+
+def test_coerce():
+    query = {
+        'q': '1',
+        'page': '2',
+        'since': '2016-01-01T00:00:00Z',
+        'parent': '',
+        'ids': ['1', 'x'],
+        'pair': ['1', '2', 'true'],
+        'limit': 'null',
+        'filter': {'min_price': '9.99', 'in_stock': 'true'},
+        'extra': {'x-a': '1', 'b': '1'},
+        'other': '5',
+        'debug': 'true',
+    }
+    coerced = Query.coerce(query, parse_dates=True)
+    assert coerced == {
+        'q': '1',
+        'page': 2,
+        'since': datetime.datetime(2016, 1, 1, tzinfo=coerced['since'].tzinfo),
+        'parent': None,
+        'ids': [1, 'x'],
+        'pair': [1, '2', True],
+        'limit': None,
+        'filter': {'min_price': 9.99, 'in_stock': True},
+        'extra': {'x-a': 1, 'b': '1'},
+        'other': 5,
+        'debug': 'true',
+    }
+    assert query['page'] == '2'
+    assert Query.coerce(query)['since'] == '2016-01-01T00:00:00Z'
+    assert Query.coerce(query, role='admin')['debug'] is True
+    assert Query.coerce('not an object') == 'not an object'
+
+
+def test_coerced_instances_are_valid():
+    class Params(Document):
+        page = IntField(minimum=1)
+        sort = StringField(enum=['asc', 'desc'])
+        flags = ArrayField(BooleanField())
+        since = DateTimeField()
+
+    instance = Params.coerce({'page': '3', 'sort': 'asc', 'flags': ['1', 'false'],
+                              'since': '2016-01-01T00:00:00Z'})
+    Params.get_validator().validate(instance)
+    assert instance['page'] == 3
+
+
+def test_recursion_and_inheritance():
+    class Node(Document):
+        value = IntField()
+        children = ArrayField(DocumentField(RECURSIVE_REFERENCE_CONSTANT))
+
+    class Child(Node):
+        class Options(object):
+            inheritance_mode = ALL_OF
+        flag = BooleanField()
+
+    assert Node.coerce({'value': '1', 'children': [{'value': '2'}]}) == \
+        {'value': 1, 'children': [{'value': 2}]}
+    assert Child.coerce({'value': '1', 'flag': '0'}) == {'value': 1, 'flag': False}
+    assert compile_coercion(StringField())('1') == '1'
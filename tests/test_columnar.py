@@ -0,0 +1,127 @@
+# coding: utf-8
+import pytest
+
+from jsl import (Document, StringField, IntField, NumberField, BooleanField, NullField,
+                 ArrayField, DocumentField, Var)
+
+numpy = pytest.importorskip('numpy')
+
+from jsl.columnar import ColumnarValidator
+
+
+class Measurement(Document):
+    sensor = StringField(required=True, min_length=2, max_length=4, pattern='^[a-z]+$')
+    value = NumberField(minimum=0, maximum=100, exclusive_maximum=True, multiple_of=0.5)
+    count = IntField(name='n', minimum=1, multiple_of=2)
+    kind = StringField(enum=['a', 'b'])
+    is_ok = BooleanField()
+    nothing = NullField()
+
+
+def rows_to_columns(rows):
+    keys = set(key for row in rows for key in row)
+    return dict((key, [row[key] for row in rows]) for key in keys)
+
+
+def test_agrees_with_row_validation():
+    rows = [
+        {'sensor': 'ab', 'value': 0.5, 'n': 2, 'kind': 'a', 'is_ok': True, 'nothing': None},
+        {'sensor': 'a', 'value': 0.5, 'n': 2, 'kind': 'a', 'is_ok': True, 'nothing': None},
+        {'sensor': 'abcde', 'value': 0.5, 'n': 2, 'kind': 'a', 'is_ok': True, 'nothing': None},
+        {'sensor': 'AB', 'value': 0.5, 'n': 2, 'kind': 'a', 'is_ok': True, 'nothing': None},
+        {'sensor': 1, 'value': 0.5, 'n': 2, 'kind': 'a', 'is_ok': True, 'nothing': None},
+        {'sensor': 'ab', 'value': 100, 'n': 2, 'kind': 'a', 'is_ok': True, 'nothing': None},
+        {'sensor': 'ab', 'value': 0.3, 'n': 2, 'kind': 'a', 'is_ok': True, 'nothing': None},
+        {'sensor': 'ab', 'value': 'x', 'n': 2, 'kind': 'a', 'is_ok': True, 'nothing': None},
+        {'sensor': 'ab', 'value': 0.5, 'n': 3, 'kind': 'a', 'is_ok': True, 'nothing': None},
+        {'sensor': 'ab', 'value': 0.5, 'n': 0, 'kind': 'a', 'is_ok': True, 'nothing': None},
+        {'sensor': 'ab', 'value': 0.5, 'n': 2.0, 'kind': 'a', 'is_ok': True, 'nothing': None},
+        {'sensor': 'ab', 'value': 0.5, 'n': 2, 'kind': 'c', 'is_ok': True, 'nothing': None},
+        {'sensor': 'ab', 'value': 0.5, 'n': 2, 'kind': 'a', 'is_ok': 1, 'nothing': None},
+        {'sensor': 'ab', 'value': 0.5, 'n': 2, 'kind': 'a', 'is_ok': True, 'nothing': 0},
+    ]
+    validator = Measurement.get_validator()
+    expected = [not validator.is_valid(row) for row in rows]
+    assert expected == [False] + [True] * (len(rows) - 1)
+
+    result = ColumnarValidator(Measurement).validate(rows_to_columns(rows))
+    assert list(result.invalid_rows) == expected
+    assert result.invalid_count == len(rows) - 1
+    assert not result.is_valid
+    assert result.violations == {
+        'sensor': 4, 'value': 3, 'n': 3, 'kind': 1, 'is_ok': 1, 'nothing': 1}
+
+
+def test_typed_columns():
+    validator = ColumnarValidator(Measurement)
+    result = validator.validate({
+        'sensor': numpy.array(['ab', 'abc', 'x']),
+        'value': numpy.array([1.0, 99.5, 100.0]),
+        'n': numpy.array([2, 4, 5]),
+        'is_ok': numpy.array([True, False, True]),
+    })
+    assert list(result.invalid_rows) == [False, False, True]
+    assert result.violations == {'sensor': 1, 'value': 1, 'n': 1}
+
+    result = validator.validate({'sensor': ['ab', 'cd'], 'n': numpy.array([2.0, 4.0])})
+    assert list(result.invalid_rows) == [True, True]
+    assert result.violations == {'n': 2}
+
+    result = validator.validate({'sensor': numpy.array(['ab', 'cd']), 'is_ok': [1, 0]})
+    assert result.violations == {'is_ok': 2}
+
+    result = validator.validate({'n': [2]})
+    assert result.violations == {'sensor': 1}
+
+    result = validator.validate({'sensor': ['ab'], 'unknown': [1]})
+    assert result.violations == {'unknown': 1}
+
+    with pytest.raises(ValueError):
+        validator.validate({'sensor': ['ab'], 'n': [2, 4]})
+    with pytest.raises(ValueError):
+        validator.validate({})
+
+
+def test_roles_and_unsupported_documents():
+    class A(Document):
+        a = Var({'role': IntField(maximum=1)}, default=StringField())
+
+    assert ColumnarValidator(A).validate({'a': ['x', 'y']}).is_valid
+    assert ColumnarValidator(A, role='role').validate({'a': [1, 2]}).violations == {'a': 1}
+
+    class B(Document):
+        b = ArrayField(IntField())
+
+    class C(Document):
+        c = DocumentField(A)
+
+    for document_cls in (B, C):
+        with pytest.raises(TypeError):
+            ColumnarValidator(document_cls)
+
+
+def test_enum_types():
+    class Flags(Document):
+        flag = BooleanField(enum=[1, False])
+        number = NumberField(enum=[True, 2, '3'])
+        name = StringField(enum=['1', 2])
+
+    rows = [
+        {'flag': True, 'number': 1, 'name': '2'},
+        {'flag': False, 'number': 2, 'name': '1'},
+        {'flag': True, 'number': 3, 'name': '3'},
+    ]
+    row_validator = Flags.get_validator()
+    expected = [not row_validator.is_valid(row) for row in rows]
+    assert expected == [True, False, True]
+
+    validator = ColumnarValidator(Flags)
+    assert list(validator.validate(rows_to_columns(rows)).invalid_rows) == expected
+    result = validator.validate({
+        'flag': numpy.array([True, False, True]),
+        'number': numpy.array([1, 2, 3]),
+        'name': numpy.array(['2', '1', '3']),
+    })
+    assert list(result.invalid_rows) == expected
+    assert result.violations == {'flag': 2, 'number': 2, 'name': 2}
+
@@ -0,0 +1,114 @@
+# coding: utf-8
+from jsl import (Document, StringField, IntField, ArrayField, DictField, DocumentField,
+                 Null, Var, Scope, ALL_OF, ANY_OF, RECURSIVE_REFERENCE_CONSTANT)
+from jsl.defaults import compile_defaults
+
+
+class Counter(object):
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class Settings(Document):
+    theme = StringField(default='light')
+    tags = ArrayField(StringField(), default=['a'])
+    parent = StringField(default=Null, name='parent-id')
+
+
+class User(Document):
+    login = StringField(required=True)
+    rating = IntField(default=Var({'db': 0}))
+    settings = DocumentField(Settings)
+    history = ArrayField(DocumentField(Settings))
+    meta = DictField(properties={'version': IntField(default=1)})
+
+    with Scope('db') as db:
+        db.flag = StringField(default='x')
+
+
+def test_apply_defaults():
+    instance = {'login': 'a', 'settings': {'theme': 'dark'},
+                'history': [{}, {'tags': []}, 1], 'meta': {}}
+    assert User.apply_defaults(instance) is instance
+    assert instance == {
+        'login': 'a',
+        'settings': {'theme': 'dark', 'tags': ['a'], 'parent-id': None},
+        'history': [{'theme': 'light', 'tags': ['a'], 'parent-id': None},
+                    {'theme': 'light', 'tags': [], 'parent-id': None},
+                    1],
+        'meta': {'version': 1},
+    }
+    # mutable defaults are not shared
+    assert instance['history'][0]['tags'] is not instance['settings']['tags']
+
+    assert User.apply_defaults({'login': 'a'}, role='db') == {'login': 'a', 'rating': 0,
+                                                              'flag': 'x'}
+    assert User.apply_defaults('not an object') == 'not an object'
+
+
+def test_callable_defaults():
+    counter = Counter(5)
+
+    class A(Document):
+        a = IntField(default=counter)
+        b = IntField(default=lambda: Null)
+
+    assert A.apply_defaults({'a': 1}) == {'a': 1, 'b': None}
+    assert counter.calls == 0
+    assert A.apply_defaults({}) == {'a': 5, 'b': None}
+    assert counter.calls == 1
+
+    class B(Document):
+        a = IntField(default=lambda: None)
+
+    assert B.apply_defaults({}) == {}
+    assert 'default' not in B.get_schema()['properties']['a']
+
+
+def test_recursive_document():
+    class Node(Document):
+        name = StringField(default='node')
+        children = ArrayField(DocumentField(RECURSIVE_REFERENCE_CONSTANT))
+
+    assert Node.apply_defaults({'children': [{'children': [{}]}]}) == {
+        'name': 'node',
+        'children': [{'name': 'node', 'children': [{'name': 'node'}]}],
+    }
+
+
+def test_inheritance():
+    class Base(Document):
+        a = IntField(default=1)
+
+    class AllOf(Base):
+        class Options(object):
+            inheritance_mode = ALL_OF
+        b = IntField(default=2)
+
+    class AnyOf(Base):
+        class Options(object):
+            inheritance_mode = ANY_OF
+        b = IntField(default=2)
+
+    class Inline(Base):
+        b = IntField(default=2)
+
+    assert AllOf.apply_defaults({}) == {'a': 1, 'b': 2}
+    assert Inline.apply_defaults({}) == {'a': 1, 'b': 2}
+    assert AnyOf.apply_defaults({}) == {'b': 2}
+
+
+def test_compile_defaults():
+    field = ArrayField([IntField(), DocumentField(Settings)])
+    instance = [1, {}, {}]
+    compile_defaults(field).apply(instance)
+    assert instance == [1, {'theme': 'light', 'tags': ['a'], 'parent-id': None}, {}]
+
+    instance = {}
+    compile_defaults(StringField(default='a')).apply(instance)
+    assert instance == {}
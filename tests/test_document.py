@@ -456,3 +456,75 @@ def test_resolve_field():
     assert X.resolve_field('name', 'xxx') == Resolution(None, 'xxx')
     assert X.resolve_field('name', 'role_1') == Resolution(X.s_1.name, 'role_1')
     assert X.resolve_field('name', 'role_2') == Resolution(X.s_2.name, 'role_2')
+
+
+def _walk_recursively(document_cls, visited_documents=frozenset()):
+    # the recursive implementation walk used to have
+    for field in document_cls.iter_fields():
+        for field_ in _walk_field_recursively(field, visited_documents):
+            yield field_
+
+
+def _walk_field_recursively(field, visited_documents):
+    yield field
+    if isinstance(field, DocumentField):
+        document_cls = field.document_cls
+        if document_cls not in visited_documents:
+            for field_ in _walk_recursively(document_cls,
+                                            visited_documents | set([document_cls])):
+                yield field_
+    else:
+        for field_ in field.iter_fields():
+            for field__ in _walk_field_recursively(field_, visited_documents):
+                yield field__
+
+
+def test_walk_through_document_fields():
+    class Address(Document):
+        street = StringField()
+
+    class Person(Document):
+        name = StringField()
+        home = DocumentField(Address)
+        work = DocumentField(Address)
+        friends = ArrayField(DocumentField('self'))
+
+    fields = list(Person.walk(through_document_fields=True))
+    # every reference is descended into, but not a document into itself
+    assert fields == [Person.name, Person.home, Address.street, Person.work, Address.street,
+                      Person.friends, Person.friends.items,
+                      Person.name, Person.home, Address.street, Person.work, Address.street,
+                      Person.friends, Person.friends.items]
+    assert fields == list(_walk_recursively(Person))
+    fields = list(Person.walk(through_document_fields=True, visited_documents=set([Person])))
+    assert fields == [Person.name, Person.home, Address.street, Person.work, Address.street,
+                      Person.friends, Person.friends.items]
+    assert list(Person.resolve_and_walk(through_document_fields=True,
+                                        visited_documents=set([Person]))) == fields
+    assert list(Person.walk()) == [Person.name, Person.home, Person.work,
+                                   Person.friends, Person.friends.items]
+
+
+def test_walk_diamond():
+    class D(Document):
+        value = StringField()
+        parent = DocumentField('A')
+
+    class B(Document):
+        d = DocumentField(D)
+
+    class C(Document):
+        d = DocumentField(D)
+        ds = ArrayField(DocumentField(D))
+
+    class A(Document):
+        b = DocumentField(B)
+        c = DocumentField(C)
+        d = DocumentField(D)
+
+    fields = list(A.walk(through_document_fields=True))
+    assert fields == list(_walk_recursively(A))
+    assert fields.count(D.value) == 4
+    assert list(A.resolve_and_walk(through_document_fields=True)) == fields
+    fields = list(A.walk(through_document_fields=True, visited_documents=set([A])))
+    assert fields == list(_walk_recursively(A, frozenset([A])))
@@ -0,0 +1,99 @@
+# coding: utf-8
+from jsl import (Document, StringField, EmailField, IntField, ArrayField, DictField,
+                 DocumentField, OneOfField, NotField, Scope, Var, ALL_OF)
+from jsl.fieldindex import compile_field_index
+
+
+class Address(Document):
+    street = StringField()
+    contact = EmailField()
+
+
+class Person(Document):
+    name = StringField(name='full_name')
+    email = StringField(format='email')
+    home = DocumentField(Address)
+    work = DocumentField('Address')
+    tags = ArrayField(StringField())
+    pair = ArrayField([IntField(), Var({'admin': IntField()}), StringField()])
+    extra = DictField(pattern_properties={'^x-': IntField()},
+                      additional_properties=NotField(IntField()))
+    id = OneOfField([StringField(), IntField()])
+    friends = ArrayField(DocumentField('self'))
+
+    with Scope('admin') as admin:
+        admin.secret = StringField()
+
+
+def test_paths():
+    index = Person.get_field_index()
+    assert [path for path, _ in index] == [
+        '/full_name', '/email', '/home', '/home/street', '/home/contact',
+        '/work', '/work/street', '/work/contact', '/tags', '/tags/*',
+        '/pair', '/pair/0', '/pair/1', '/extra', '/extra/*', '/extra/*', '/extra/*',
+        '/id', '/id', '/id', '/friends', '/friends/*',
+    ]
+    assert index.get_fields('/full_name') == (Person.name,)
+    assert index.get_fields('/id') == (Person.id,) + tuple(Person.id.fields)
+    assert index.get_fields('/missing') == ()
+    assert index.get_paths(Address.street) == ('/home/street', '/work/street')
+    assert len(index) == 22
+
+    admin_index = Person.get_field_index(role='admin')
+    assert [path for path, _ in admin_index][11:14] == ['/pair/0', '/pair/1', '/pair/2']
+    assert admin_index.get_paths(Person.admin.secret) == ('/secret',)
+    assert Person.get_field_index() is index
+
+
+def test_get_by_type():
+    index = Person.get_field_index()
+    assert [path for path, _ in index.get_by_type(DocumentField)] == [
+        '/home', '/work', '/friends/*']
+    emails = [path for path, field in index.get_by_type(StringField)
+              if isinstance(field, EmailField) or field.format == 'email']
+    assert emails == ['/email', '/home/contact', '/work/contact']
+    assert index.get_by_type((IntField, EmailField)) == (
+        ('/home/contact', Address.contact), ('/work/contact', Address.contact),
+        ('/pair/0', Person.pair.items[0]),
+        ('/extra/*', Person.extra.pattern_properties['^x-']),
+        ('/extra/*', Person.extra.additional_properties.field),
+        ('/id', Person.id.fields[1]))
+
+
+def test_recursion_and_inheritance():
+    class Node(Document):
+        value = IntField()
+        child = DocumentField('self')
+
+    class Child(Node):
+        class Options(object):
+            inheritance_mode = ALL_OF
+        extra = StringField()
+
+    assert [path for path, _ in Node.get_field_index()] == ['/value', '/child']
+    # the fields of a parent document share the paths with the fields of the document
+    assert [path for path, _ in Child.get_field_index()] == ['/extra', '/value', '/child']
+
+
+def test_invalidation():
+    class Target(Document):
+        a = StringField()
+
+    class Source(Document):
+        target = DocumentField('Target')
+
+    index = Source.get_field_index()
+    assert index.get_fields('/target/a') == (Target.a,)
+
+    class Target(Document):
+        b = StringField()
+
+    new_index = Source.get_field_index()
+    assert new_index is not index
+    assert new_index.get_fields('/target/b') == (Target.b,)
+    assert Source.get_field_index() is new_index
+
+
+def test_field():
+    field = ArrayField(DictField(properties={'a/b~c': StringField()}))
+    assert [path for path, _ in compile_field_index(field)] == ['', '/*', '/*/a~1b~0c']
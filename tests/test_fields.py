@@ -2,9 +2,10 @@
 import mock
 import pytest
 
-from jsl import fields, Null
+from jsl import fields, Null, registry as jsl_registry
 from jsl.fields.base import NullSentinel
 from jsl.document import Document
+from jsl.roles import DEFAULT_ROLE
 from jsl._compat import OrderedDict
 
 from util import normalize
@@ -218,6 +219,17 @@ def test_array_field_walk():
     assert path == expected_path
 
 
+def test_deep_walk():
+    leaf = fields.StringField()
+    field = leaf
+    for _ in range(5000):
+        field = fields.ArrayField(field)
+    assert len(list(field.walk())) == 5001
+    path = list(field.resolve_and_walk())
+    assert len(path) == 5001
+    assert path[0] is field and path[-1] is leaf
+
+
 def test_dict_field_to_schema():
     f = fields.DictField(title='Hey!', enum=[{'x': 1}, {'y': 2}])
     definitions, schema = f.get_definitions_and_schema()
@@ -346,6 +358,20 @@ def test_document_field():
     assert not definitions
 
 
+def test_document_field_nested_role():
+    class A(Document):
+        pass
+
+    class B(Document):
+        class Options(object):
+            roles_to_propagate = ['db']
+        a = fields.DocumentField(A)
+
+    assert fields.DocumentField(A).get_nested_role('response') == 'response'
+    assert B.a.get_nested_role('db') == 'db'
+    assert B.a.get_nested_role('response') == DEFAULT_ROLE
+
+
 def test_recursive_document_field():
     class Tree(Document):
         node = fields.OneOfField([
@@ -422,3 +448,27 @@ def test_ref_field():
     pointer = '#/definitions/User'
     f = fields.RefField(pointer=pointer)
     assert f.get_definitions_and_schema() == ({}, {'$ref': pointer})
+
+
+def test_document_field_resolution_cache():
+    class Target(Document):
+        pass
+
+    field = fields.DocumentField('Target')
+    field.owner_cls = Target
+    with mock.patch.object(jsl_registry.DEFAULT_REGISTRY, 'get_document',
+                           wraps=jsl_registry.DEFAULT_REGISTRY.get_document) as get_document:
+        assert field.document_cls is Target
+        call_count = get_document.call_count
+        assert call_count
+        assert field.document_cls is Target
+        assert get_document.call_count == call_count
+
+    old_target = Target
+
+    class Target(Document):
+        pass
+
+    assert field.document_cls is Target is not old_target
+    assert field._resolved is not None
+    assert field.__getstate__()['_resolved'] is None
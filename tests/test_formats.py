@@ -0,0 +1,102 @@
+# coding: utf-8
+import pytest
+
+from jsl import formats
+from jsl.fields import StringField, EmailField, IPv4Field, DateTimeField, UriField
+from jsl.roles import Var
+
+
+@pytest.mark.parametrize('value,expected', [
+    ('2016-05-11T12:30:00Z', (2016, 5, 11, 12, 30, 0, 0, 0)),
+    ('2016-05-11t12:30:00z', (2016, 5, 11, 12, 30, 0, 0, 0)),
+    ('2016-02-29T23:59:60.5+03:30', (2016, 2, 29, 23, 59, 60, 500000, 210)),
+    ('2016-05-11T12:30:00.1234567-01:00', (2016, 5, 11, 12, 30, 0, 123456, -60)),
+    ('2015-02-29T00:00:00Z', None),
+    ('2016-13-01T00:00:00Z', None),
+    ('2016-04-31T00:00:00Z', None),
+    ('2016-05-11T24:00:00Z', None),
+    ('2016-05-11T12:30:00', None),
+    ('2016-05-11T12:30:00.Z', None),
+    ('2016-05-11T12:30:00.123', None),
+    ('2016-05-11 12:30:00Z', None),
+    ('2016-05-11T12:30:00+0300', None),
+    ('2016-05-11T12:30:00+24:00', None),
+    ('2016-05-11T12:30:00Zjunk', None),
+    (u'２016-05-11T12:30:00Z', None),
+    ('', None),
+])
+def test_parse_date_time(value, expected):
+    assert formats.parse_date_time(value) == expected
+    assert formats.check_date_time(value) == (expected is not None)
+
+
+@pytest.mark.parametrize('value,expected', [
+    ('127.0.0.1', True),
+    ('0.0.0.0', True),
+    ('255.255.255.255', True),
+    ('256.0.0.1', False),
+    ('1.2.3', False),
+    ('1.2.3.4.5', False),
+    ('1..3.4', False),
+    ('1.2.3.', False),
+    ('.1.2.3', False),
+    ('01.2.3.4', False),
+    ('1.2.3.a', False),
+    ('1.2.3.4 ', False),
+    ('1000.2.3.4', False),
+])
+def test_check_ipv4(value, expected):
+    assert formats.check_ipv4(value) is expected
+
+
+@pytest.mark.parametrize('value,expected', [
+    ('user@example.com', True),
+    ('"a@b"@example.com', True),
+    ('@example.com', False),
+    ('user@', False),
+    ('user', False),
+    ('us er@example.com', False),
+])
+def test_check_email(value, expected):
+    assert formats.check_email(value) is expected
+
+
+@pytest.mark.parametrize('value,expected', [
+    ('http://example.com/path?q=1#frag', True),
+    ('urn:isbn:0451450523', True),
+    ('svn+ssh://example.com', True),
+    ('/relative/path', False),
+    ('://example.com', False),
+    ('1http://example.com', False),
+    ('ht tp://example.com', False),
+    ('http://example.com/a b', False),
+    ('http://example.com/<a>', False),
+])
+def test_check_uri(value, expected):
+    assert formats.check_uri(value) is expected
+
+
+def test_format_checker_registry():
+    assert StringField().get_format_checker() is None
+    assert StringField(format='unknown').get_format_checker() is None
+    assert EmailField().get_format_checker() is formats.check_email
+    assert IPv4Field().get_format_checker() is formats.check_ipv4
+    assert DateTimeField().get_format_checker() is formats.check_date_time
+    assert UriField().get_format_checker() is formats.check_uri
+
+    def check_hex(value):
+        return all(c in '0123456789abcdef' for c in value)
+
+    formats.register_format_checker('hex', check_hex)
+    try:
+        field = StringField(format=Var({'hex_role': 'hex'}))
+        assert field.get_format_checker() is None
+        assert field.get_format_checker(role='hex_role') is check_hex
+    finally:
+        formats.unregister_format_checker('hex')
+    assert formats.get_format_checker('hex') is None
+
+    with pytest.raises(TypeError):
+        formats.register_format_checker('hex', None)
+    with pytest.raises(TypeError):
+        formats.register_format_checker(None, check_hex)
@@ -0,0 +1,88 @@
+# coding: utf-8
+from jsl import Document, StringField, DocumentField, ArrayField, Scope, ALL_OF
+from jsl.graph import DocumentGraph, get_graph, resolve_all_references
+
+
+class Country(Document):
+    name = StringField()
+
+
+class Address(Document):
+    country = DocumentField(Country)
+
+
+class Person(Document):
+    home = DocumentField('Address')
+    friends = ArrayField(DocumentField('self'))
+
+    with Scope('admin') as admin:
+        admin.manager = DocumentField('Manager')
+
+
+class Manager(Person):
+    class Options(object):
+        inheritance_mode = ALL_OF
+
+
+def test_graph():
+    graph = DocumentGraph([Country, Address, Person, Manager])
+    assert len(graph) == 4
+    assert Person in graph
+    assert graph.get_dependencies(Person) == frozenset([Address, Manager])
+    assert graph.get_dependencies(Manager) == frozenset([Person])
+    assert graph.get_dependencies(Address, transitive=True) == frozenset([Country])
+    assert graph.get_dependents(Country) == frozenset([Address])
+    assert graph.get_dependents(Country, transitive=True) == \
+        frozenset([Address, Person, Manager])
+    assert graph.get_dependents(Manager, transitive=True) == frozenset([Person])
+
+    order = graph.topological_order()
+    assert order.index(Country) < order.index(Address) < order.index(Person)
+    assert graph.topological_order([Person, Country, Address]) == [Country, Address, Person]
+
+    graph.remove(Address)
+    assert Address not in graph
+    assert graph.get_dependents(Country) == frozenset()
+    assert graph.get_dependents(Address) == frozenset([Person])
+
+
+def test_get_graph():
+    class Target(Document):
+        pass
+
+    class Source(Document):
+        target = DocumentField('Target')
+        missing = DocumentField('MissingDocument')
+
+    graph = get_graph()
+    assert graph.get_dependencies(Source) == frozenset([Target])
+    assert graph.unresolved[Source] == set(['MissingDocument'])
+    assert graph.get_dependents(Country) >= frozenset([Address])
+
+    old_target = Target
+
+    class Target(Document):
+        pass
+
+    class MissingDocument(Document):
+        pass
+
+    graph = get_graph()
+    assert old_target not in graph
+    assert graph.get_dependencies(Source) == frozenset([Target, MissingDocument])
+    assert Source not in graph.unresolved
+    assert graph.get_dependents(Target) == frozenset([Source])
+
+
+def test_resolve_all_references():
+    class Target(Document):
+        pass
+
+    class Source(Document):
+        target = DocumentField('Target')
+        with Scope('admin') as admin:
+            admin.missing = DocumentField('NoSuchDocument')
+
+    assert resolve_all_references([Source]) == [(Source, Source.admin.missing)]
+    assert (Source, Source.admin.missing) in resolve_all_references()
+    assert resolve_all_references([Target]) == []
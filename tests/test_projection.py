@@ -0,0 +1,116 @@
+# coding: utf-8
+import pytest
+
+from jsl import (Document, StringField, IntField, ArrayField, DictField, DocumentField,
+                 Var, Scope, ALL_OF, RECURSIVE_REFERENCE_CONSTANT)
+from jsl.projection import compile_projection
+
+
+class Address(Document):
+    city = StringField()
+
+    with Scope('db') as db:
+        db.geohash = StringField()
+
+
+class User(Document):
+    class Options(object):
+        roles_to_propagate = ['db', 'response']
+
+    login = StringField()
+    password = Var({'db': StringField(name='password-hash')})
+    address = DocumentField(Address)
+    addresses = ArrayField(DocumentField(Address))
+    extra = DictField(properties={'hidden': Var({'db': IntField()})},
+                      pattern_properties={'^x-': StringField()},
+                      additional_properties=False)
+    meta = DictField(properties={'secret': Var({'db': IntField()})})
+
+    with Scope('response') as response:
+        response.id = IntField()
+
+
+INSTANCE = {
+    'login': 'a',
+    'password-hash': 'x',
+    'password': 'y',
+    'unknown': 1,
+    'address': {'city': 'c', 'geohash': 'g'},
+    'addresses': [{'city': 'c', 'geohash': 'g'}, 1],
+    'extra': {'hidden': 1, 'x-a': 'a', 'b': 2},
+    'meta': {'secret': 1, 'other': 2},
+    'id': 1,
+}
+
+
+def test_project():
+    assert User.project(INSTANCE, role='response') == {
+        'login': 'a',
+        'address': {'city': 'c'},
+        'addresses': [{'city': 'c'}, 1],
+        'extra': {'x-a': 'a'},
+        'meta': {'other': 2},
+        'id': 1,
+    }
+    assert User.project(INSTANCE, role='db') == {
+        'login': 'a',
+        'password-hash': 'x',
+        'address': {'city': 'c', 'geohash': 'g'},
+        'addresses': [{'city': 'c', 'geohash': 'g'}, 1],
+        'extra': {'hidden': 1, 'x-a': 'a'},
+        'meta': {'secret': 1, 'other': 2},
+    }
+    # the instance is not modified
+    assert INSTANCE['address'] == {'city': 'c', 'geohash': 'g'}
+    assert User.project(None) is None
+
+
+def test_project_many():
+    projection = compile_projection(User, role='response')
+    assert projection.project_many([INSTANCE, INSTANCE]) == [User.project(INSTANCE, 'response')] * 2
+
+
+def test_recursive_document():
+    class Node(Document):
+        name = StringField()
+        children = ArrayField(DocumentField(RECURSIVE_REFERENCE_CONSTANT))
+
+    assert Node.project({'name': 'a', 'x': 1, 'children': [{'y': 1, 'children': []}]}) == {
+        'name': 'a', 'children': [{'children': []}],
+    }
+
+
+def test_inheritance():
+    class Base(Document):
+        a = IntField()
+
+    class Child(Base):
+        class Options(object):
+            inheritance_mode = ALL_OF
+        b = Var({'db': IntField()})
+
+    assert Child.project({'a': 1, 'b': 2, 'c': 3}) == {'a': 1}
+    assert Child.project({'a': 1, 'b': 2, 'c': 3}, role='db') == {'a': 1, 'b': 2}
+
+    # a parent that refers to its subclass
+    class Node(Document):
+        class Options(object):
+            inheritance_mode = ALL_OF
+        children = ArrayField(DocumentField('Leaf'))
+
+    class Leaf(Node):
+        class Options(object):
+            inheritance_mode = ALL_OF
+        value = IntField()
+
+    instance = {'children': [{'value': 1, 'children': [], 'x': 2}], 'value': 3}
+    assert Node.project(instance) == {'children': [{'value': 1, 'children': []}]}
+    assert Leaf.project(instance) == {'children': [{'value': 1, 'children': []}], 'value': 3}
+
+
+def test_compile_projection():
+    field = ArrayField([IntField(), DocumentField(Address)])
+    assert compile_projection(field).project([1, {'geohash': 'g'}, {'geohash': 'g'}]) == \
+        [1, {}, {'geohash': 'g'}]
+    with pytest.raises(TypeError):
+        compile_projection(StringField())
@@ -0,0 +1,119 @@
+# coding: utf-8
+import pickle
+
+import pytest
+
+from jsl import (Document, StringField, IntField, ArrayField, DocumentField, DictField,
+                 Scope, ALL_OF, RECURSIVE_REFERENCE_CONSTANT)
+from jsl.records import Record, compile_record_class
+
+
+class Address(Document):
+    city = StringField()
+    zip_code = StringField(name='zip-code')
+
+
+class User(Document):
+    login = StringField(required=True)
+    address = DocumentField(Address)
+    addresses = ArrayField(DocumentField(Address))
+    matrix = ArrayField(ArrayField(DocumentField(Address)))
+    tags = ArrayField(StringField())
+    meta = DictField()
+
+    with Scope('db') as db:
+        db.id = IntField()
+
+
+INSTANCE = {
+    'login': 'a',
+    'address': {'city': 'c', 'zip-code': '1'},
+    'addresses': [{'city': 'd'}],
+    'matrix': [[{'zip-code': '2'}], []],
+    'tags': ['x'],
+    'meta': {'a': {'b': 1}},
+}
+
+
+def test_record_class():
+    UserRecord = User.record_class()
+    assert UserRecord is User.record_class()
+    assert issubclass(UserRecord, Record)
+    assert UserRecord.__name__ == 'UserRecord'
+    assert UserRecord._fields == ('login', 'address', 'addresses', 'matrix', 'tags', 'meta')
+    assert UserRecord._document_cls is User
+
+    user = UserRecord.from_dict(INSTANCE)
+    assert not hasattr(user, '__dict__')
+    assert user.login == 'a'
+    assert user.address == Address.record_class()(city='c', zip_code='1')
+    assert user.addresses[0].city == 'd'
+    assert user.addresses[0].zip_code is None
+    assert user.matrix[0][0].zip_code == '2'
+    assert user.tags == ['x']
+    assert user.to_dict() == INSTANCE
+
+    with pytest.raises(AttributeError):
+        user.unknown = 1
+
+
+def test_roles():
+    UserRecord = User.record_class(role='db')
+    assert UserRecord is not User.record_class()
+    assert UserRecord._fields[-1] == 'id'
+    user = UserRecord.from_dict({'login': 'a', 'id': 1})
+    assert (user.id, user.address) == (1, None)
+    assert user.to_dict() == {'login': 'a', 'id': 1}
+
+
+def test_record():
+    AddressRecord = Address.record_class()
+    address = AddressRecord(city='c')
+    assert repr(address) == "AddressRecord(city='c', zip_code=None)"
+    assert address != AddressRecord(city='d')
+    with pytest.raises(TypeError):
+        AddressRecord(street='s')
+    assert pickle.loads(pickle.dumps(address, 2)) == address
+
+
+def test_recursive_document():
+    class Node(Document):
+        name = StringField()
+        children = ArrayField(DocumentField(RECURSIVE_REFERENCE_CONSTANT))
+
+    instance = {'name': 'a', 'children': [{'name': 'b', 'children': []}]}
+    node = Node.record_class().from_dict(instance)
+    assert type(node.children[0]) is Node.record_class()
+    assert node.to_dict() == instance
+
+
+def test_inheritance():
+    class Base(Document):
+        a = IntField()
+
+    class Child(Base):
+        class Options(object):
+            inheritance_mode = ALL_OF
+        b = IntField()
+
+    assert Child.record_class()._fields == ('b', 'a')
+    assert Child.record_class().from_dict({'a': 1, 'b': 2}).to_dict() == {'a': 1, 'b': 2}
+
+    class GrandChild(Child):
+        class Options(object):
+            inheritance_mode = ALL_OF
+        c = IntField()
+
+    assert GrandChild.record_class()._fields == ('c', 'b', 'a')
+    instance = {'a': 1, 'b': 2, 'c': 3}
+    assert GrandChild.record_class().from_dict(instance).to_dict() == instance
+
+
+def test_invalid_names():
+    class A(Document):
+        to_dict = StringField()
+
+    with pytest.raises(ValueError):
+        A.record_class()
+    with pytest.raises(TypeError):
+        compile_record_class(StringField())
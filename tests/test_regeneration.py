@@ -0,0 +1,91 @@
+# coding: utf-8
+import json
+
+from jsl import Document, StringField, IntField, DocumentField, regeneration
+from jsl.regeneration import get_schema, get_schema_bytes, get_stale, mark_stale, regenerate_stale
+
+
+def test_get_schema():
+    class Point(Document):
+        x = IntField()
+
+    schema = get_schema(Point)
+    assert schema == Point.get_schema()
+    assert get_schema(Point) is schema
+    schema_bytes = get_schema_bytes(Point)
+    assert json.loads(schema_bytes.decode('utf-8')) == schema
+    assert get_schema_bytes(Point) is schema_bytes
+
+
+def test_regenerate_stale():
+    regenerate_stale()
+
+    class Country(Document):
+        name = StringField()
+
+    class Address(Document):
+        street = StringField()
+
+    class Person(Document):
+        address = DocumentField('Address')
+
+    class Company(Document):
+        owner = DocumentField(Person)
+
+    class Unrelated(Document):
+        name = StringField()
+
+    for document_cls in (Country, Address, Person, Company, Unrelated):
+        get_schema_bytes(document_cls)
+    get_schema_bytes(Company, role='admin')
+    validator = Unrelated.get_validator()
+    unrelated_bytes = get_schema_bytes(Unrelated)
+    country_bytes = get_schema_bytes(Country)
+    old_address = Address
+
+    class Address(Document):
+        street = StringField()
+        zip = StringField()
+
+    assert get_stale() == frozenset([Address, Person, Company])
+    assert Person._cache and Company._cache
+
+    regenerated = regenerate_stale()
+    assert regenerated == [Address, Person, Company]
+    assert get_stale() == frozenset()
+    assert 'zip' in json.loads(get_schema_bytes(Company).decode('utf-8'))[
+        'properties']['owner']['properties']['address']['properties']
+    # the roles cached before are regenerated
+    assert ('schema_bytes', 'admin') in Company._cache
+    # the cached schemas of the old document are carried over to the new one
+    assert ('schema_bytes', 'default') in Address._cache
+    assert ('schema', 'default') in old_address._cache
+
+    assert get_schema_bytes(Unrelated) is unrelated_bytes
+    assert get_schema_bytes(Country) is country_bytes
+    assert Unrelated.get_validator() is validator
+
+    mark_stale(Person)
+    assert get_stale() == frozenset([Person, Company])
+    assert regenerate_stale() == [Person, Company]
+
+
+def test_repeated_redefinitions():
+    regenerate_stale()
+
+    class Tenant(Document):
+        name = StringField()
+
+    class Account(Document):
+        tenant = DocumentField('Tenant')
+
+    first_tenant = Tenant
+    for _ in range(10):
+        class Tenant(Document):
+            name = StringField()
+
+    # the redefinitions of a name are collapsed
+    assert len(regeneration._redefinitions) == 1
+    assert get_stale() == frozenset([Tenant, Account])
+    assert first_tenant not in get_stale()
+    regenerate_stale()
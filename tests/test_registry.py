@@ -1,7 +1,11 @@
 # coding: utf-8
+import sys
+
 import pytest
 
-from jsl import registry
+from jsl import Document, StringField, DocumentField, registry
+from jsl.graph import get_graph
+from jsl.registry import Registry, _is_missing
 
 
 def test_registry():
@@ -27,3 +31,169 @@ def test_registry():
         registry.remove_document('A')
 
     registry.remove_document('A', module='qwe.rty')
+
+
+def test_version():
+    version = registry.get_version()
+    registry.put_document('C', object())
+    assert registry.get_version() != version
+    version = registry.get_version()
+    registry.remove_document('C')
+    assert registry.get_version() != version
+
+
+def test_isolated_registries():
+    import gc
+    import weakref
+
+    tenant_registry = Registry()
+
+    class Address(Document):
+        class Options(object):
+            registry = tenant_registry
+        street = StringField()
+
+    class Person(Document):
+        class Options(object):
+            registry = tenant_registry
+        address = DocumentField('Address')
+
+    class Employee(Person):
+        pass
+
+    assert Employee._options.registry is tenant_registry
+    assert set(tenant_registry.iter_documents()) == set([Address, Person, Employee])
+    assert Person.address.document_cls is Address
+    with pytest.raises(KeyError):
+        registry.get_document('Address', module=Address.__module__)
+
+    other_registry = Registry()
+
+    class OtherAddress(Document):
+        class Options(object):
+            registry = other_registry
+            definition_id = 'address'
+        city = StringField()
+
+    other_registry.put_document('Address', OtherAddress, module=Address.__module__)
+    assert tenant_registry.get_document('Address', module=Address.__module__) is Address
+    assert get_graph(tenant_registry).get_dependents(Address) == frozenset([Person, Employee])
+    assert get_graph(other_registry).get_dependents(Address) == frozenset()
+    assert 'graph' in tenant_registry.cache
+
+    document = weakref.ref(Person)
+    del Address, Person, Employee, tenant_registry
+    gc.collect()
+    assert document() is None
+
+
+def test_weak_registry():
+    import gc
+    import weakref
+
+    from jsl.regeneration import get_schema_bytes, mark_stale, get_stale, track
+
+    weak_registry = Registry(weak=True)
+    track(weak_registry)
+
+    class Address(Document):
+        class Options(object):
+            registry = weak_registry
+        street = StringField()
+
+    def create_document():
+        class Person(Document):
+            class Options(object):
+                registry = weak_registry
+            address = DocumentField('Address')
+        return Person
+
+    Person = create_document()
+    assert set(weak_registry.iter_documents()) == set([Address, Person])
+    assert weak_registry.get_document('Person', module=Person.__module__) is Person
+    get_schema_bytes(Person)
+    Person.get_validator()
+    Person.get_field_index()
+    assert get_graph(weak_registry).get_dependents(Address) == frozenset([Person])
+    mark_stale(Address)
+    assert Person in get_stale()
+
+    version = weak_registry.get_version()
+    document = weakref.ref(Person)
+    create_document()  # a redefinition
+    del Person
+    gc.collect()
+    assert document() is None
+    assert weak_registry.get_version() != version
+    assert set(weak_registry.iter_documents()) == set([Address])
+    with pytest.raises(KeyError):
+        weak_registry.get_document('Person', module=Address.__module__)
+    assert get_graph(weak_registry).get_dependents(Address) == frozenset()
+    assert get_stale() == frozenset([Address])
+
+
+def test_lazy_registry(tmpdir, monkeypatch):
+    package = tmpdir.mkdir('lazy_schemas')
+    package.join('__init__.py').write('')
+    package.join('users.py').write(
+        'from jsl import Document, StringField, DocumentField\n'
+        'from jsl.registry import DEFAULT_REGISTRY\n'
+        'class User(Document):\n'
+        '    name = StringField()\n'
+        '    group = DocumentField("lazy_schemas.groups.Group")\n')
+    package.join('groups.py').write(
+        'from jsl import Document, StringField\n'
+        'class Group(Document):\n'
+        '    title = StringField()\n')
+    package.join('broken.py').write('import lazy_schemas.no_such_module\n')
+    monkeypatch.syspath_prepend(str(tmpdir))
+    monkeypatch.setattr(registry.DEFAULT_REGISTRY, 'lazy', True)
+
+    class Account(Document):
+        user = DocumentField('lazy_schemas.users.User')
+        group = DocumentField('Group')
+
+    with pytest.raises(KeyError):
+        Account.group.document_cls
+
+    assert 'lazy_schemas.users' not in sys.modules
+    user_cls = Account.user.document_cls
+    assert user_cls.__name__ == 'User'
+    assert 'lazy_schemas.users' in sys.modules
+    assert 'lazy_schemas.groups' not in sys.modules
+    assert user_cls.group.document_cls.__name__ == 'Group'
+
+    manifest = registry.get_manifest()
+    assert manifest['lazy_schemas.users.User'] == 'lazy_schemas.users.User'
+    assert manifest['Group'] == 'lazy_schemas.groups.Group'
+    monkeypatch.setattr(registry.DEFAULT_REGISTRY, 'manifest', {'Group': manifest['Group']})
+    assert Account.group.document_cls is user_cls.group.document_cls
+
+    with pytest.raises(KeyError):
+        registry.get_document('lazy_schemas.missing.Document')
+    with pytest.raises(ImportError):
+        registry.get_document('lazy_schemas.broken.Document')
+    package.join('raising.py').write('raise ImportError("not a missing module")\n')
+    with pytest.raises(ImportError):
+        registry.get_document('lazy_schemas.raising.Document')
+    monkeypatch.setattr(registry.DEFAULT_REGISTRY, 'lazy', False)
+    with pytest.raises(KeyError):
+        registry.get_document('Group')
+
+
+def test_is_missing():
+    def error(message, name=None):
+        e = ImportError(message)
+        e.name = name
+        return e
+
+    assert _is_missing('a.b', error("No module named 'a'", name='a'))
+    assert _is_missing('a.b', error("No module named 'a.b'", name='a.b'))
+    assert not _is_missing('a.b', error("No module named 'c'", name='c'))
+    # Python 2 messages
+    assert _is_missing('a.b.c', error('No module named b.c'))
+    assert _is_missing('a.b.c', error('No module named a'))
+    assert _is_missing('a.b.c', error('No module named c'))
+    assert not _is_missing('a.b.c', error('No module named d'))
+    assert not _is_missing('a.b.c', error('cannot import name x'))
+    assert not _is_missing('a.b.c', error('not a missing module'))
@@ -1,11 +1,13 @@
 # coding: utf-8
+import pickle
+
 import pytest
 
 from jsl import (Document, BaseSchemaField, StringField, ArrayField,
                  DocumentField, IntField, DateTimeField, NumberField,
                  DictField, NotField, AllOfField, AnyOfField, OneOfField,
                  DEFAULT_ROLE)
-from jsl.roles import Var, Scope, not_, Resolution
+from jsl.roles import Var, Scope, not_, Resolution, construct_matcher
 from jsl.exceptions import SchemaGenerationException
 
 from util import normalize, sort_required_keys
@@ -442,3 +444,37 @@ def test_document():
 
     assert A.get_definition_id(role='role_1') == 'a'
     assert A.get_definition_id(role='role_2').endswith(A.__name__)
+
+
+class PicklableDocument(Document):
+    with Scope(not_('response')) as not_response:
+        not_response.id = IntField(required=True)
+    name = Var({
+        'request': StringField(min_length=1),
+        ('response', 'db'): StringField(),
+    }, propagate=['db'])
+
+
+def test_matchers_are_picklable():
+    for matcher in (construct_matcher('a'), construct_matcher(['a', 'b']), not_('a', 'b')):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            restored = pickle.loads(pickle.dumps(matcher, protocol))
+            assert restored == matcher
+            assert hash(restored) == hash(matcher)
+            for role in ('a', 'b', 'c'):
+                assert restored(role) == matcher(role)
+    assert construct_matcher('a') != construct_matcher(['a'])
+    assert construct_matcher(['a', 'b']) == construct_matcher(('b', 'a'))
+
+
+def test_field_tree_is_picklable():
+    fields = pickle.loads(pickle.dumps(PicklableDocument._fields, pickle.HIGHEST_PROTOCOL))
+    for role in ('request', 'response', 'db', DEFAULT_ROLE):
+        for key, field in fields.items():
+            resolution = field.resolve(role)
+            expected = PicklableDocument._fields[key].resolve(role)
+            assert resolution.role == expected.role
+            if expected.value is None:
+                assert resolution.value is None
+            else:
+                assert resolution.value.get_schema(role=role) == expected.value.get_schema(role=role)
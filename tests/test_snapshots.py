@@ -0,0 +1,82 @@
+# coding: utf-8
+import mock
+
+from jsl import Document, StringField
+from jsl._compat import OrderedDict
+from jsl.snapshots import SnapshotCache
+
+
+def test_snapshot_cache(tmpdir, monkeypatch):
+    package = tmpdir.mkdir('snapshot_schemas')
+    package.join('__init__.py').write('')
+    package.join('places.py').write(
+        'from jsl import Document, StringField\n'
+        'class Address(Document):\n'
+        '    street = StringField()\n'
+        '    city = StringField()\n')
+    package.join('people.py').write(
+        'from jsl import Document, StringField, DocumentField, Scope\n'
+        'from snapshot_schemas.places import Address\n'
+        'class Person(Document):\n'
+        '    name = StringField()\n'
+        '    address = DocumentField(Address)\n'
+        '    with Scope("admin") as admin:\n'
+        '        admin.notes = StringField()\n')
+    monkeypatch.syspath_prepend(str(tmpdir))
+    from snapshot_schemas.people import Person
+
+    cache = SnapshotCache(str(tmpdir.join('cache')))
+    schema = cache.get_schema(Person)
+    assert schema == Person.get_schema()
+    assert len(tmpdir.join('cache').listdir()) == 1
+
+    with mock.patch.object(Person, 'get_schema') as get_schema:
+        assert cache.get_schema(Person) == schema
+        # another process
+        assert SnapshotCache(str(tmpdir.join('cache'))).get_schema(Person) == schema
+        assert not get_schema.called
+
+    assert cache.get_key(Person, role='admin') != cache.get_key(Person)
+    assert cache.get_key(Person, ordered=True) != cache.get_key(Person)
+    ordered_schema = cache.get_schema(Person, ordered=True)
+    assert isinstance(ordered_schema, OrderedDict)
+    assert list(ordered_schema) == list(Person.get_schema(ordered=True))
+    assert 'notes' in cache.get_schema(Person, role='admin')['properties']
+
+    # editing a module the document depends on invalidates the snapshots, and the
+    # process that imported it before the edit doesn't use them anymore
+    key = cache.get_key(Person)
+    package.join('places.py').write('# edited\n', mode='a')
+    assert cache.get_key(Person) is None
+
+    cache.clear()
+    assert tmpdir.join('cache').listdir() == []
+
+
+def test_module_edited_after_import(tmpdir, monkeypatch):
+    tmpdir.join('snapshot_edited.py').write(
+        'from jsl import Document, StringField\n'
+        'class A(Document):\n'
+        '    x = StringField()\n')
+    monkeypatch.syspath_prepend(str(tmpdir))
+    from snapshot_edited import A
+
+    path = tmpdir.join('snapshot_edited.py')
+    path.write(path.read().replace('x =', 'y ='))
+    path.setmtime(A._created + 1)
+    cache = SnapshotCache(str(tmpdir.join('cache')))
+    assert cache.get_key(A) is None
+    # the schema of the imported class is not saved under the digest of the new source
+    assert list(cache.get_schema(A)['properties']) == ['x']
+    assert not tmpdir.join('cache').check()
+
+
+def test_no_source(tmpdir):
+    class Local(Document):
+        name = StringField()
+
+    Local.__module__ = '__no_such_module__'
+    cache = SnapshotCache(str(tmpdir))
+    assert cache.get_key(Local) is None
+    assert cache.get_schema(Local) == Local.get_schema()
+    assert tmpdir.listdir() == []
@@ -0,0 +1,95 @@
+# coding: utf-8
+import io
+import json
+
+import pytest
+
+from jsl import (Document, ArrayField, DocumentField, StringField, IntField,
+                 ValidationError)
+from jsl.exceptions import ItemStep, AttributeStep
+from jsl.streaming import iter_array_items, StreamingValidator
+from jsl.validation import compile_validator
+
+
+class Item(Document):
+    name = StringField(required=True)
+    count = IntField(minimum=0)
+
+
+ITEMS = [{'name': 'a', 'count': 1}, {'name': u'ü' * 10}, {'name': 'c', 'count': 1234567}]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 1024])
+@pytest.mark.parametrize('binary', [False, True])
+def test_iter_array_items(chunk_size, binary):
+    values = [1, 12345, -1.5e10, 'x' * 30, None, True, [], {}, [[1, {'a': [2]}]], u'ü"\\']
+    data = json.dumps(values, ensure_ascii=False)
+    fp = io.BytesIO(data.encode('utf-8')) if binary else io.StringIO(data)
+    assert list(iter_array_items(fp, chunk_size=chunk_size)) == values
+
+    data = u'  [ 1 ,\n 2 ]  \n'
+    assert list(iter_array_items(io.StringIO(data), chunk_size=chunk_size)) == [1, 2]
+    assert list(iter_array_items(io.StringIO(u'[ ]'), chunk_size=chunk_size)) == []
+
+
+def test_iter_array_items_split_numbers():
+    data = u'[1.5e10, 2.25, 3, -0.5E-3]'
+    for chunk_size in range(1, len(data) + 1):
+        assert list(iter_array_items(io.StringIO(data), chunk_size=chunk_size)) == \
+            [1.5e10, 2.25, 3, -0.5E-3]
+
+    for padding in (1, 7):
+        data = u'[' + u' ' * padding + u', '.join([u'1.25'] * 20000) + u']'
+        assert list(iter_array_items(io.StringIO(data))) == [1.25] * 20000
+
+
+@pytest.mark.parametrize('data', [u'', u'{}', u'[1', u'[1,]', u'[1 2]', u'[1] 2', u'[tru]'])
+def test_iter_array_items_invalid(data):
+    with pytest.raises(ValueError):
+        list(iter_array_items(io.StringIO(data), chunk_size=2))
+
+
+def test_iter_array_items_is_lazy():
+    fp = io.StringIO(u'[1, 2, {')
+    items = iter_array_items(fp, chunk_size=1)
+    assert next(items) == 1
+    assert next(items) == 2
+    with pytest.raises(ValueError):
+        next(items)
+
+
+@pytest.mark.parametrize('chunk_size', [3, 1024])
+def test_streaming_validator(chunk_size):
+    field = ArrayField(DocumentField(Item), min_items=2, max_items=3)
+    validator = StreamingValidator(field, chunk_size=chunk_size)
+    assert validator.is_valid(io.StringIO(json.dumps(ITEMS)))
+    validator.validate(io.StringIO(json.dumps(ITEMS)))
+
+    items = ITEMS + [{'name': 1, 'count': -1}]
+    errors = list(validator.iter_errors(io.StringIO(json.dumps(items))))
+    paths = list(tuple(s.entity for s in e.steps if isinstance(s, (ItemStep, AttributeStep)))
+                   for e in errors)
+    assert sorted(paths, key=str) == [('max_items',), (3, 'count', 'minimum'), (3, 'name')]
+    assert not validator.is_valid(io.StringIO(json.dumps(items)))
+    with pytest.raises(ValidationError):
+        validator.validate(io.StringIO(json.dumps(items)))
+
+    errors = list(validator.iter_errors(io.StringIO(u'[]')))
+    assert [e.steps[-1].entity for e in errors] == ['min_items']
+
+
+def test_streaming_validator_agrees_with_validator():
+    field = ArrayField([IntField(), StringField()], additional_items=False)
+    validator = StreamingValidator(field)
+    assert validator.field is field
+    for value in ([], [1], [1, 'a'], ['a'], [1, 'a', None]):
+        errors = validator.iter_errors(io.StringIO(json.dumps(value)))
+        expected = compile_validator(field).get_errors(value)
+        assert [list(e.steps) for e in errors] == [list(e.steps) for e in expected]
+
+
+def test_streaming_validator_errors():
+    with pytest.raises(TypeError):
+        StreamingValidator(DocumentField(Item))
+    with pytest.raises(ValueError):
+        StreamingValidator(ArrayField(IntField(), unique_items=True))
@@ -0,0 +1,104 @@
+# coding: utf-8
+import itertools
+import re
+
+import pytest
+
+from jsl import (Document, StringField, IntField, NumberField, BooleanField, NullField,
+                 ArrayField, DictField, DocumentField, OneOfField, AnyOfField, NotField,
+                 DateTimeField, EmailField, IPv4Field, UriField, Scope,
+                 RECURSIVE_REFERENCE_CONSTANT)
+from jsl.synthetic import InstanceGenerator
+
+
+class Address(Document):
+    street = StringField(required=True, min_length=3, max_length=5)
+    zip = StringField(pattern='^[a-z]')
+
+
+class User(Document):
+    login = StringField(required=True, max_length=8)
+    email = EmailField(name='e-mail', required=True)
+    created_at = DateTimeField()
+    ip = IPv4Field()
+    website = UriField()
+    age = IntField(minimum=0, maximum=150, exclusive_maximum=True)
+    rating = NumberField(minimum=0.5, maximum=1.0, exclusive_minimum=True)
+    score = NumberField(multiple_of=0.25, maximum=-10)
+    level = IntField(multiple_of=3, minimum=1, maximum=10)
+    is_active = BooleanField()
+    nothing = NullField()
+    kind = StringField(enum=['a', 'b', 1])
+    tags = ArrayField(StringField(), min_items=1, max_items=3, unique_items=True)
+    pair = ArrayField([IntField(), StringField()], additional_items=False)
+    address = DocumentField(Address)
+    contact = OneOfField([IntField(), StringField(min_length=1)])
+    any_of = AnyOfField([NullField(), BooleanField()])
+    not_int = NotField(IntField())
+    meta = DictField(min_properties=2, max_properties=3)
+
+    with Scope('db') as db:
+        db.id = IntField(required=True, minimum=1)
+
+
+class Node(Document):
+    name = StringField(required=True)
+    children = ArrayField(DocumentField(RECURSIVE_REFERENCE_CONSTANT), required=True)
+
+
+@pytest.mark.parametrize('document_cls,role', [(User, 'default'), (User, 'db'),
+                                               (Node, 'default')])
+def test_instances_are_valid(document_cls, role):
+    validator = document_cls.get_validator(role=role)
+    for instance in InstanceGenerator(document_cls, role=role, seed=1).iter_instances(300):
+        assert validator.get_errors(instance) == ()
+
+
+def test_roles():
+    instances = InstanceGenerator(User, role='db', seed=1).iter_instances(10)
+    assert all('id' in instance for instance in instances)
+    instances = InstanceGenerator(User, seed=1).iter_instances(10)
+    assert not any('id' in instance for instance in instances)
+
+
+def test_seed():
+    first = list(InstanceGenerator(User, seed=42).iter_instances(20))
+    assert list(InstanceGenerator(User, seed=42).iter_instances(20)) == first
+    assert list(InstanceGenerator(User, seed=43).iter_instances(20)) != first
+
+    generator = InstanceGenerator(User, seed=42)
+    generator.generate()
+    generator.seed(42)
+    assert generator.generate() == first[0]
+
+
+def test_streaming():
+    generator = InstanceGenerator(IntField(minimum=5, maximum=5))
+    assert list(itertools.islice(generator, 3)) == [5, 5, 5]
+
+
+def test_max_depth():
+    for instance in InstanceGenerator(Node, seed=1, max_depth=0).iter_instances(10):
+        assert instance['children'] == []
+
+
+def test_unsatisfiable_constraints():
+    for field in (StringField(min_length=3, max_length=2), IntField(minimum=1, maximum=0),
+                  IntField(multiple_of=5, minimum=1, maximum=4),
+                  ArrayField(IntField(), min_items=3, max_items=2),
+                  DictField(properties={'a': IntField()}, min_properties=2,
+                            additional_properties=False),
+                  StringField(enum=[1, 2])):
+        with pytest.raises(ValueError):
+            InstanceGenerator(field)
+    generator = InstanceGenerator(StringField(pattern='^(?=a)b'))
+    with pytest.raises(ValueError):
+        generator.generate()
+
+
+@pytest.mark.parametrize('pattern', ['^[0-9]{5}$', r'^(ab|c\d)+-?[^x]*$', r'\w\s.', '^$'])
+def test_patterns(pattern):
+    field = StringField(pattern=pattern, max_length=20)
+    generator = InstanceGenerator(field, seed=1)
+    for value in generator.iter_instances(50):
+        assert re.search(pattern, value) and len(value) <= 20
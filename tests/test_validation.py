@@ -0,0 +1,394 @@
+# coding: utf-8
+import pickle
+
+import jsonschema
+import pytest
+
+from jsl import (Document, StringField, IntField, NumberField, BooleanField, NullField,
+                 ArrayField, DictField, DocumentField, OneOfField, AnyOfField, NotField,
+                 DateTimeField, EmailField, RefField, Var, Scope, ONE_OF, ALL_OF,
+                 RECURSIVE_REFERENCE_CONSTANT)
+from jsl.exceptions import (ValidationError, SchemaGenerationException,
+                            DocumentStep, AttributeStep, ItemStep)
+from jsl.fields import BaseSchemaField
+from jsl.formats import check_date_time
+from jsl.validation import (compile_validator, ValidationCache, SamplingValidator,
+                            FAIL_FAST, COLLECT_ALL)
+
+
+class Address(Document):
+    street = StringField(required=True, min_length=1)
+    zip = StringField(pattern='^[0-9]{5}$')
+
+
+class User(Document):
+    class Options(object):
+        additional_properties = False
+
+    login = StringField(required=True, max_length=8)
+    email = EmailField(name='e-mail')
+    age = IntField(minimum=0, maximum=150, exclusive_maximum=True)
+    rating = NumberField(multiple_of=0.5)
+    is_active = BooleanField()
+    created_at = DateTimeField()
+    tags = ArrayField(StringField(max_length=3), unique_items=True, max_items=3)
+    address = DocumentField(Address)
+    status = StringField(enum=['active', 'banned'])
+    deleted_at = OneOfField([NullField(), DateTimeField()])
+    with Scope('db') as db:
+        db.id = IntField(required=True)
+
+
+VALID_USER = {
+    'login': 'john',
+    'e-mail': 'john@example.com',
+    'age': 30,
+    'rating': 4.5,
+    'is_active': True,
+    'created_at': '2016-05-11T12:30:00Z',
+    'tags': ['a', 'b'],
+    'address': {'street': 'Main', 'zip': '12345'},
+    'status': 'active',
+    'deleted_at': None,
+}
+
+INVALID_USERS = [
+    {},
+    dict(VALID_USER, login='too long login'),
+    dict(VALID_USER, login=1),
+    dict(VALID_USER, **{'e-mail': 'john'}),
+    dict(VALID_USER, age=150),
+    dict(VALID_USER, age=-1),
+    dict(VALID_USER, age=1.0),
+    dict(VALID_USER, age=True),
+    dict(VALID_USER, rating=4.3),
+    dict(VALID_USER, is_active=1),
+    dict(VALID_USER, created_at='2016-05-11'),
+    dict(VALID_USER, tags=['a', 'a']),
+    dict(VALID_USER, tags=['a', 'b', 'c', 'd']),
+    dict(VALID_USER, tags=['abcd']),
+    dict(VALID_USER, address={'zip': '12345'}),
+    dict(VALID_USER, address={'street': 'Main', 'zip': '123'}),
+    dict(VALID_USER, status='deleted'),
+    dict(VALID_USER, deleted_at='yesterday'),
+    dict(VALID_USER, unknown=1),
+    [],
+    None,
+]
+
+
+def test_is_valid_agrees_with_jsonschema():
+    format_checker = jsonschema.FormatChecker()
+    format_checker.checks('date-time')(check_date_time)
+    for role in ('default', 'db'):
+        validator = User.get_validator(role=role)
+        schema_validator = jsonschema.Draft4Validator(
+            User.get_schema(role=role), format_checker=format_checker)
+        for instance in [VALID_USER, dict(VALID_USER, id=1)] + INVALID_USERS:
+            assert validator.is_valid(instance) == schema_validator.is_valid(instance), instance
+            assert bool(validator.get_errors(instance)) == (not validator.is_valid(instance))
+
+
+def test_roles():
+    assert User.get_validator().is_valid(VALID_USER)
+    assert not User.get_validator().is_valid(dict(VALID_USER, id=1))
+    assert not User.get_validator(role='db').is_valid(VALID_USER)
+    assert User.get_validator(role='db').is_valid(dict(VALID_USER, id=1))
+    assert User.get_validator(role='db') is User.get_validator(role='db')
+    assert User.get_validator(role='db') is not User.get_validator()
+
+
+def test_modes():
+    validator = User.get_validator()
+    instance = dict(VALID_USER, login='too long login', tags=['a', 'abcd', 'a'],
+                    address={'zip': '123'})
+    del instance['e-mail']
+
+    assert validator.get_errors(VALID_USER) == ()
+    assert validator.get_errors(VALID_USER, mode=FAIL_FAST) == ()
+
+    errors = validator.get_errors(instance, mode=FAIL_FAST)
+    assert len(errors) == 1
+
+    errors = validator.get_errors(instance, mode=COLLECT_ALL)
+    assert sorted((list(e.steps) for e in errors), key=str) == sorted([
+        [DocumentStep(User), ItemStep('login'), AttributeStep('max_length')],
+        [DocumentStep(User), ItemStep('tags'), AttributeStep('unique_items')],
+        [DocumentStep(User), ItemStep('tags'), ItemStep(1), AttributeStep('max_length')],
+        [DocumentStep(User), ItemStep('address'), DocumentStep(Address), AttributeStep('required')],
+        [DocumentStep(User), ItemStep('address'), DocumentStep(Address),
+         ItemStep('zip'), AttributeStep('pattern')],
+    ], key=str)
+    paths = sorted(e.path for e in errors)
+    assert paths == [('address',), ('address', 'zip'), ('login',), ('tags',), ('tags', 1)]
+
+    assert len(list(validator.iter_errors(instance))) == len(errors)
+
+    with pytest.raises(ValueError):
+        validator.get_errors(instance, mode='unknown')
+    with pytest.raises(ValueError):
+        validator.get_errors(VALID_USER, mode='unknown')
+
+
+def test_validate():
+    validator = User.get_validator()
+    validator.validate(VALID_USER)
+    with pytest.raises(ValidationError) as e:
+        validator.validate(dict(VALID_USER, address={'street': ''}))
+    assert e.value.path == ('address', 'street')
+    assert str(e.value) == (
+        u"'' is too short\n"
+        u"Steps: User['address'] -> Address['street'].min_length")
+
+
+def test_recursive_document():
+    class Node(Document):
+        name = StringField(required=True)
+        children = ArrayField(DocumentField(RECURSIVE_REFERENCE_CONSTANT))
+
+    validator = Node.get_validator()
+    assert validator.is_valid({'name': 'a', 'children': [{'name': 'b', 'children': []}]})
+    instance = {'name': 'a', 'children': [{'name': 'b', 'children': [{}]}]}
+    assert not validator.is_valid(instance)
+    error, = validator.get_errors(instance)
+    assert error.path == ('children', 0, 'children', 0)
+
+
+class Tree(Document):
+    name = StringField(required=True)
+    children = ArrayField(DocumentField(RECURSIVE_REFERENCE_CONSTANT))
+
+
+def describe_errors(validator, instance):
+    return [(e.message, list(e.steps)) for e in validator.get_errors(instance)]
+
+
+def test_pickling():
+    trees = [
+        {'name': 'a', 'children': [{'name': 'b', 'children': []}]},
+        {'name': 'a', 'children': [{'name': 'b', 'children': [{}]}]},
+    ]
+    for document_cls, role, instances in [(User, 'default', [VALID_USER] + INVALID_USERS),
+                                          (User, 'db', [VALID_USER] + INVALID_USERS),
+                                          (Tree, 'default', trees)]:
+        validator = document_cls.get_validator(role=role)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            restored = pickle.loads(pickle.dumps(validator, protocol))
+            assert restored.role == role
+            for instance in instances:
+                assert describe_errors(restored, instance) == describe_errors(validator, instance)
+
+
+def test_inheritance():
+    class Base(Document):
+        class Options(object):
+            additional_properties = True
+        kind = StringField(required=True)
+
+    class A(Base):
+        class Options(object):
+            inheritance_mode = ONE_OF
+        a = IntField(required=True)
+
+    validator = A.get_validator()
+    schema_validator = jsonschema.Draft4Validator(A.get_schema())
+    for instance in [{'kind': 'x', 'a': 1}, {'a': 1}, {'kind': 'x'}, {'kind': 'x', 'a': 'b'}]:
+        assert validator.is_valid(instance) == schema_validator.is_valid(instance), instance
+    assert not validator.is_valid({'kind': 'x', 'a': 1})
+    assert validator.is_valid({'a': 1})
+
+
+def test_fields():
+    validator = compile_validator(ArrayField([IntField(), StringField()], additional_items=False))
+    assert validator.is_valid([1, 'a'])
+    assert validator.is_valid([1])
+    assert not validator.is_valid([1, 'a', 2])
+    assert not validator.is_valid(['a'])
+
+    validator = compile_validator(
+        ArrayField([IntField()], additional_items=StringField(), min_items=1))
+    assert validator.is_valid([1, 'a', 'b'])
+    assert not validator.is_valid([])
+    error, = validator.get_errors([1, 'a', 2])
+    assert error.path == (2,)
+
+    validator = compile_validator(DictField(
+        properties={'a': IntField(required=True)},
+        pattern_properties={'^x-': StringField()},
+        additional_properties=BooleanField(),
+        min_properties=1, max_properties=3))
+    assert validator.is_valid({'a': 1, 'x-b': 'c', 'd': True})
+    assert not validator.is_valid({'a': 1, 'x-b': 1})
+    assert not validator.is_valid({'a': 1, 'd': 1})
+    assert not validator.is_valid({'a': 1, 'b': True, 'c': True, 'd': True})
+    assert not validator.is_valid({'b': True})
+
+    validator = compile_validator(AnyOfField([IntField(), NullField()]))
+    assert validator.is_valid(1)
+    assert validator.is_valid(None)
+    assert not validator.is_valid('a')
+
+    validator = compile_validator(NotField(StringField()))
+    assert validator.is_valid(1)
+    assert not validator.is_valid('a')
+    error, = validator.get_errors('a')
+    assert list(error.steps) == [AttributeStep('field')]
+
+    validator = compile_validator(IntField(enum=lambda: [1, 2]))
+    assert validator.is_valid(1)
+    assert not validator.is_valid(3)
+    assert not validator.is_valid(True)
+
+    validator = compile_validator(ArrayField(unique_items=True))
+    assert validator.is_valid([1, True, {'a': 1}, {'a': 2}])
+    assert not validator.is_valid([{'a': 1}, {'a': 1}])
+
+    validator = compile_validator(NumberField(minimum=0, exclusive_minimum=True, maximum=1))
+    assert validator.is_valid(1)
+    assert not validator.is_valid(0)
+
+    assert compile_validator(RefField('#/definitions/a')).is_valid(object())
+
+    with pytest.raises(TypeError):
+        compile_validator(BaseSchemaField())
+
+
+def test_compilation_errors():
+    with pytest.raises(SchemaGenerationException):
+        compile_validator(ArrayField(items=1))
+    with pytest.raises(SchemaGenerationException) as e:
+        compile_validator(DictField(properties={'a': 1}))
+    assert list(e.value.steps) == [AttributeStep('properties'), ItemStep('a')]
+    with pytest.raises(SchemaGenerationException):
+        compile_validator(DictField(properties=Var({'role': 1})), role='role')
+
+
+def test_validation_cache():
+    cache = ValidationCache(User, maxsize=2)
+    assert cache.hit_rate == 0.0
+
+    assert cache.is_valid(VALID_USER)
+    assert cache.is_valid(dict(VALID_USER))
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.hit_rate == 0.5
+
+    # the role is a part of the key
+    assert not cache.is_valid(VALID_USER, role='db')
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    # 1 and True are told apart
+    assert cache.is_valid(dict(VALID_USER, age=1))
+    assert not cache.is_valid(dict(VALID_USER, age=True))
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 4)
+
+    # the least recently used result is evicted
+    assert cache.is_valid(dict(VALID_USER, age=1))
+    assert cache.is_valid(VALID_USER)
+    assert (cache.hits, cache.misses) == (2, 5)
+    assert cache.is_valid(dict(VALID_USER, age=1))
+    assert (cache.hits, cache.misses) == (3, 5)
+
+    assert cache.get_errors(VALID_USER) == ()
+    error, = cache.get_errors(dict(VALID_USER, age=True))
+    assert error.path == ('age',)
+    cache.validate(VALID_USER)
+    with pytest.raises(ValidationError):
+        cache.validate(dict(VALID_USER, age=True))
+
+    # unhashable objects bypass the cache
+    hits, misses = cache.hits, cache.misses
+    assert not cache.is_valid(dict(VALID_USER, is_active=set()))
+    assert (cache.hits, cache.misses) == (hits, misses)
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hit_rate == 0.0
+
+    with pytest.raises(ValueError):
+        ValidationCache(User, maxsize=0)
+
+
+def test_partial_validation():
+    class Patch(Document):
+        class Options(object):
+            min_properties = 2
+
+        login = StringField(required=True, max_length=8)
+        address = DocumentField(Address, required=True)
+        status = StringField(enum=['active', 'banned'])
+
+    validator = Patch.get_validator()
+    assert not validator.is_valid({'status': 'active'})
+    assert validator.is_valid({'status': 'active'}, partial=True)
+    assert validator.is_valid({}, partial=True)
+    assert not validator.is_valid({'status': 'deleted'}, partial=True)
+    assert not validator.is_valid({'unknown': 1}, partial=True)
+    assert not validator.is_valid([], partial=True)
+    # nested values are validated in full
+    assert not validator.is_valid({'address': {'zip': '12345'}}, partial=True)
+
+    assert validator.get_errors({'status': 'active'}, partial=True) == ()
+    errors = validator.get_errors({'login': 'too long login', 'address': {}}, partial=True)
+    assert sorted(e.path for e in errors) == [('address',), ('login',)]
+    with pytest.raises(ValidationError) as e:
+        validator.validate({'status': 'deleted'}, partial=True)
+    assert e.value.path == ('status',)
+
+    cache = ValidationCache(Patch)
+    assert not cache.is_valid({'status': 'active'})
+    assert cache.is_valid({'status': 'active'}, partial=True)
+    assert cache.misses == 2
+
+
+def test_partial_validation_with_inheritance():
+    class Base(Document):
+        class Options(object):
+            additional_properties = True
+        kind = StringField(required=True)
+
+    class A(Base):
+        class Options(object):
+            inheritance_mode = ALL_OF
+        a = IntField(required=True)
+
+    validator = A.get_validator()
+    assert not validator.is_valid({'a': 1})
+    assert validator.is_valid({'a': 1}, partial=True)
+    assert not validator.is_valid({'a': 'b'}, partial=True)
+    error, = validator.get_errors({'kind': 1}, partial=True)
+    assert list(error.steps) == [DocumentStep(A), DocumentStep(Base), ItemStep('kind')]
+
+
+def test_sampling_validator():
+    validator = User.get_validator()
+    instances = [VALID_USER, dict(VALID_USER, age=-1), dict(VALID_USER, age=-1, login=1)] * 4
+
+    sampler = SamplingValidator(validator, every=3)
+    results = [sampler.check(instance) for instance in instances]
+    assert results == [True] * 12
+    assert (sampler.seen, sampler.sampled, sampler.invalid) == (12, 4, 0)
+
+    sampler = SamplingValidator(validator, every=1)
+    results = [sampler.check(instance) for instance in instances]
+    assert results == [True, False, False] * 4
+    assert (sampler.seen, sampler.sampled, sampler.invalid) == (12, 12, 8)
+    assert sampler.violations == {('age',): 8, ('login',): 4}
+    assert sampler.most_common(1) == [(('age',), 8)]
+
+    sampler.reset()
+    assert (sampler.seen, sampler.sampled, sampler.invalid) == (0, 0, 0)
+    assert sampler.most_common() == []
+
+    sampler = SamplingValidator(validator, fraction=0.5, seed=1)
+    for instance in instances * 100:
+        sampler.check(instance)
+    assert sampler.seen == 1200
+    assert 500 < sampler.sampled < 700
+    assert sampler.invalid == sampler.violations[('age',)]
+
+    assert SamplingValidator(validator, fraction=0).check(dict(VALID_USER, age=-1))
+
+    for kwargs in [{}, {'fraction': 0.5, 'every': 2}, {'fraction': 2}, {'every': 0}]:
+        with pytest.raises(ValueError):
+            SamplingValidator(validator, **kwargs)